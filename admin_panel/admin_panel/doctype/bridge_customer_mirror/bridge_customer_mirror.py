@@ -0,0 +1,16 @@
+# Copyright (c) 2026, Flash and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class BridgeCustomerMirror(Document):
+	"""Local copy of one Bridge.xyz customer, read by the bridge-kyc page.
+
+	Written only by the `admin_panel.api.bridge_kyc` mirror sync (incremental
+	on a short schedule, full reconcile on a slower one). `payload_json` holds
+	the raw Bridge customer so the overview join runs unchanged on it; the
+	scalar fields exist for list-view browsing and the sync's change check.
+	"""
+
+	pass
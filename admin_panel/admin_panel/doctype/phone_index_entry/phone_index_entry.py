@@ -0,0 +1,16 @@
+# Copyright (c) 2026, Flash and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class PhoneIndexEntry(Document):
+	"""One normalized phone from mongo `users` or an ERPNext Customer.
+
+	Written only by `admin_panel.api.phone_index` (scheduled incremental sync,
+	daily rebuild, and write-through on Customer save). `phone_e164` and
+	`phone_suffix` are the indexed lookup keys; `source_ref` is the
+	kratosUserId (Flash User) or Customer name the phone belongs to.
+	"""
+
+	pass
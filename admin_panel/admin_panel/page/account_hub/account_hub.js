@@ -48,6 +48,9 @@ const ACCOUNT_LEVELS = {
 	THREE: "THREE",
 };
 
+// Mongo stores the account level as a number; the typeahead passes it through.
+const TYPEAHEAD_LEVELS = [ACCOUNT_LEVELS.ZERO, ACCOUNT_LEVELS.ONE, ACCOUNT_LEVELS.TWO, ACCOUNT_LEVELS.THREE];
+
 const ACCOUNT_STATUSES = {
 	NEW: "NEW",
 	PENDING: "PENDING",
@@ -691,12 +694,22 @@ class AccountHub {
 			}
 		}, 600);
 
+		// Prefix suggestions from the typeahead index — cheap enough to run
+		// on a much shorter debounce than the exact search.
+		const debouncedTypeahead = debounce(() => {
+			const val = this.$.searchInput.val().trim();
+			if (val) {
+				this.fetch_typeahead(val);
+			}
+		}, 150);
+
 		this.$.searchInput.on("input", () => {
 			const val = this.$.searchInput.val().trim();
 			// Filter local default list in real-time
 			this.filter_local_list(val);
 			// Debounce remote search if there's a query
 			if (val) {
+				debouncedTypeahead();
 				debouncedSearch();
 			}
 		});
@@ -814,9 +827,36 @@ class AccountHub {
 			);
 		});
 
+		this.local_matches = filtered;
 		this.render_result_list(filtered);
 	}
 
+	fetch_typeahead(query) {
+		frappe.call({
+			method: "admin_panel.api.typeahead.search_accounts_typeahead",
+			args: { query: query, limit: 10 },
+			callback: (res) => {
+				const result = res.message;
+				// Drop answers for a query the operator has already typed past.
+				if (!result || !result.success || this.$.searchInput.val().trim() !== query) return;
+				const seen = new Set((this.local_matches || []).map((r) => r.username).filter(Boolean));
+				const suggestions = (result.matches || [])
+					.filter((m) => !m.username || !seen.has(m.username))
+					.map((m) => ({
+						name: m.uuid || m.account_id,
+						username: m.username,
+						phone_number: m.phone,
+						requested_level: TYPEAHEAD_LEVELS[m.level] || m.level,
+						status: m.status,
+					}));
+				if (suggestions.length) {
+					this.$.searchEmpty.hide();
+					this.render_result_list((this.local_matches || []).concat(suggestions));
+				}
+			},
+		});
+	}
+
 	on_result_click(account, itemEl) {
 		this.$.searchResultsList.find(".ah-result-item").removeClass("active");
 		itemEl.addClass("active");
@@ -836,8 +876,8 @@ class AccountHub {
 			createdAt: null,
 		};
 
-		if (account.username) {
-			this.fetch_account_details(account.username, fallback);
+		if (account.username || account.phone_number) {
+			this.fetch_account_details(account.username || account.phone_number, fallback);
 		} else {
 			this.show_account(fallback);
 		}
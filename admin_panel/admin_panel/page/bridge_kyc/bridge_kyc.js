@@ -3,6 +3,10 @@
 // the flash backend + the Bridge dashboard.
 const BK_VIEW_ROLES = ["System Manager", "Accounts Manager", "Flash Admin"];
 
+// While a fresh site's first mirror sync runs in the background, the overview
+// comes back empty and flagged `syncing`; reload on this interval until it lands.
+const BK_SYNC_POLL_MS = 5000;
+
 const BK_BUCKET_LABELS = {
 	all: "All",
 	approved: "Approved",
@@ -173,7 +177,7 @@ class BridgeKyc {
 		this.filter = "all";
 		this.query = "";
 		this.render_shell();
-		this.load();
+		this.load(false);
 	}
 
 	render_shell() {
@@ -182,7 +186,8 @@ class BridgeKyc {
             <div class="bridge-kyc-page">
                 <div class="bk-toolbar">
                     <button class="bk-btn" data-act="refresh">Refresh</button>
-                    <span class="bk-meta" id="bk-meta">Loading live status from Bridge…</span>
+                    <button class="bk-btn" data-act="sync">Sync from Bridge</button>
+                    <span class="bk-meta" id="bk-meta">Loading KYC status…</span>
                     <span class="bk-spacer"></span>
                     <input class="bk-search" id="bk-search" type="search"
                         placeholder="Filter by name, email, username…" />
@@ -191,7 +196,8 @@ class BridgeKyc {
                 <div class="bk-card"><div id="bk-table"></div></div>
             </div>
         `);
-		this.page.main.find('[data-act="refresh"]').on("click", () => this.load());
+		this.page.main.find('[data-act="refresh"]').on("click", () => this.load(true));
+		this.page.main.find('[data-act="sync"]').on("click", () => this.sync());
 		this.page.main.find("#bk-search").on("input", (e) => {
 			this.query = String(e.currentTarget.value || "")
 				.trim()
@@ -200,13 +206,17 @@ class BridgeKyc {
 		});
 	}
 
-	load() {
+	// refresh=false may be served from the shared server-side overview cache;
+	// Refresh and post-sync reloads force a recompute.
+	load(refresh) {
+		clearTimeout(this.sync_poll);
 		const meta = this.page.main.find("#bk-meta");
 		const btn = this.page.main.find('[data-act="refresh"]');
-		meta.removeClass("err").text("Loading live status from Bridge…");
+		meta.removeClass("err").text("Loading KYC status…");
 		btn.prop("disabled", true);
 		frappe.call({
 			method: "admin_panel.api.bridge_kyc.get_kyc_overview",
+			args: { refresh: refresh ? 1 : 0 },
 			callback: (res) => {
 				btn.prop("disabled", false);
 				const d = res.message;
@@ -217,7 +227,17 @@ class BridgeKyc {
 					return;
 				}
 				this.data = d;
-				meta.text(`Live from Bridge · ${d.now} · ${d.summary.total} customers`);
+				if (d.syncing) {
+					meta.text("First sync from Bridge in progress…");
+					this.render_tiles();
+					this.render_table();
+					this.sync_poll = setTimeout(() => this.load(false), BK_SYNC_POLL_MS);
+					return;
+				}
+				const synced = d.synced_at ? bkAgo(d.synced_at, d.now) : "never";
+				const c = d.cache;
+				const age = c && c.age_seconds >= 1 ? ` (${Math.round(c.age_seconds)}s old)` : "";
+				meta.text(`Bridge mirror · synced ${synced} · ${d.summary.total} customers${age}`);
 				this.render_tiles();
 				this.render_table();
 			},
@@ -228,6 +248,32 @@ class BridgeKyc {
 		});
 	}
 
+	sync() {
+		// Full reconcile on demand — picks up edits to older customers now
+		// instead of at the next scheduled reconcile.
+		const meta = this.page.main.find("#bk-meta");
+		const btn = this.page.main.find('[data-act="sync"]');
+		meta.removeClass("err").text("Syncing customers from Bridge…");
+		btn.prop("disabled", true);
+		frappe.call({
+			method: "admin_panel.api.bridge_kyc.sync_kyc_mirror",
+			args: { full: 1 },
+			callback: (res) => {
+				btn.prop("disabled", false);
+				const d = res.message;
+				if (!d || d.success === false) {
+					meta.addClass("err").text((d && d.error) || "Bridge sync failed.");
+					return;
+				}
+				this.load(true);
+			},
+			error: () => {
+				btn.prop("disabled", false);
+				meta.addClass("err").text("Bridge sync failed.");
+			},
+		});
+	}
+
 	render_tiles() {
 		const s = this.data.summary;
 		const tiles = [
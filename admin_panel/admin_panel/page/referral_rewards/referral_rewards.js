@@ -80,6 +80,9 @@ const RR_CSS = `
     .referral-rewards-page .rr-card { background: var(--rr-surface); border: 1px solid var(--rr-line); border-radius: 14px;
           box-shadow: var(--rr-shadow); overflow: hidden; }
     .referral-rewards-page .rr-count { color: var(--rr-ink3); font-size: 12px; padding: 12px 18px 0; }
+    .referral-rewards-page .rr-pager { display: flex; align-items: center; justify-content: flex-end; gap: 10px;
+          padding: 10px 18px; border-top: 1px solid var(--rr-line-soft); color: var(--rr-ink2); font-size: 12.5px; }
+    .referral-rewards-page .rr-btn:disabled { opacity: 0.45; cursor: default; border-color: var(--rr-line); }
     .referral-rewards-page table.rr-table { width: 100%; border-collapse: collapse; font-size: 13px; margin: 8px 0 0; }
     .referral-rewards-page table.rr-table th { text-align: left; font-size: 11px; letter-spacing: 0.05em; text-transform: uppercase;
           color: var(--rr-ink2); font-weight: 650; padding: 10px 18px; border-bottom: 1px solid var(--rr-line); white-space: nowrap; }
@@ -159,19 +162,27 @@ frappe.pages["referral-rewards"].on_page_show = function (wrapper) {
 // fires immediately after on_page_load, which already kicked off a load.
 const RR_RELOAD_AFTER_MS = 15000;
 
+// Rows per table page. The server pages and filters (get_referral_rows) — the
+// browser never holds more than one page of invites.
+const RR_PAGE_SIZE = 50;
+
 class ReferralRewards {
 	constructor(page) {
 		this.page = page;
 		this.rows = [];
+		this.rows_total = 0;
+		this.page_no = 1;
 		this.summary = {};
 		this.funnel = [];
 		this.now = null;
 		this.active_bucket = "all";
+		this.filters = { inviter: "", tier: "", date_from: "", date_to: "" };
 		this._loading = false;
+		this._rows_seq = 0; // latest rows request; stale responses are dropped
 		this._loaded_at = null; // performance.now() timestamp (monotonic, not wall clock)
-		this.page.set_primary_action("Refresh", () => this.load(), "refresh");
+		this.page.set_primary_action("Refresh", () => this.load(true), "refresh");
 		this.render_shell();
-		this.load();
+		this.load(false);
 	}
 
 	maybe_reload() {
@@ -180,7 +191,7 @@ class ReferralRewards {
 		if (this._loading) return;
 		if (this._loaded_at !== null && performance.now() - this._loaded_at < RR_RELOAD_AFTER_MS)
 			return;
-		this.load();
+		this.load(false);
 	}
 
 	render_shell() {
@@ -191,21 +202,54 @@ class ReferralRewards {
                 <div id="rr-summary" class="rr-tiles"></div>
                 <div id="rr-funnel" class="rr-funnel"></div>
                 <div id="rr-buckets" class="rr-chips"></div>
+                <div class="rr-toolbar">
+                    <input id="rr-f-inviter" class="rr-input" placeholder="Inviter (username / phone / id)">
+                    <select id="rr-f-tier" class="rr-input"><option value="">Any tier</option></select>
+                    <input id="rr-f-from" class="rr-input" type="date" title="Created from">
+                    <input id="rr-f-to" class="rr-input" type="date" title="Created to">
+                    <button id="rr-f-apply" class="rr-btn primary">Apply</button>
+                    <button id="rr-f-clear" class="rr-btn">Clear</button>
+                </div>
                 <div id="rr-table"></div>
             </div>
         `);
+		const main = this.page.main;
+		main.find("#rr-f-apply").on("click", () => this.apply_filters());
+		main.find("#rr-f-inviter").on("keydown", (e) => {
+			if (e.key === "Enter") this.apply_filters();
+		});
+		main.find("#rr-f-clear").on("click", () => {
+			main.find("#rr-f-inviter, #rr-f-tier, #rr-f-from, #rr-f-to").val("");
+			this.apply_filters();
+		});
 	}
 
 	set_status(text) {
 		this.page.main.find("#rr-status").html(text);
 	}
 
-	load() {
+	apply_filters() {
+		const main = this.page.main;
+		this.filters = {
+			inviter: (main.find("#rr-f-inviter").val() || "").trim(),
+			tier: main.find("#rr-f-tier").val() || "",
+			date_from: main.find("#rr-f-from").val() || "",
+			date_to: main.find("#rr-f-to").val() || "",
+		};
+		this.page_no = 1;
+		this.load_rows();
+	}
+
+	// refresh=false may be served from the shared server-side cache (the
+	// overview is recomputed for everyone at most once a minute); the Refresh
+	// button forces a recompute.
+	load(refresh) {
 		if (this._loading) return; // dedupe double-clicks / stacked triggers
 		this._loading = true;
 		this.set_status("Loading referral rewards…");
 		frappe.call({
 			method: "admin_panel.api.referral_rewards.get_referral_rewards",
+			args: { refresh: refresh ? 1 : 0 },
 			callback: (res) => {
 				this._loading = false;
 				this._loaded_at = performance.now();
@@ -218,30 +262,23 @@ class ReferralRewards {
 					);
 					return;
 				}
-				this.rows = d.rows || [];
 				this.summary = d.summary || {};
 				this.funnel = d.funnel || [];
 				this.now = d.now || null;
-				const rowsTotal =
-					this.summary.rows_total === undefined
-						? this.rows.length
-						: this.summary.rows_total;
-				const rowsShown =
-					this.summary.rows_shown === undefined
-						? this.rows.length
-						: this.summary.rows_shown;
-				const capNote =
-					rowsShown < rowsTotal ? ` (showing latest ${rowsShown} of ${rowsTotal})` : "";
+				// Data age against the server clock: computed_at vs served_at
+				// from the cache block (absent = computed for this request).
+				const c = d.cache || {};
+				const refreshing = c.refreshing ? " Refreshing in the background…" : "";
 				this.set_status(
-					`Live view — ${rowsTotal} invites${capNote}. Updated ${rr_ago(
-						this.now,
-						this.now
-					)}.`
+					`Live view — ${Number(this.summary.total_invites || 0)} invites. Updated ${rr_ago(
+						c.computed_at || this.now,
+						c.served_at || this.now
+					)}.${refreshing}`
 				);
 				this.render_summary();
 				this.render_funnel();
 				this.render_buckets();
-				this.render_table();
+				this.render_tier_options();
 			},
 			error: () => {
 				this._loading = false;
@@ -249,6 +286,42 @@ class ReferralRewards {
 				this.set_status(`<span class="err">Failed to load referral rewards.</span>`);
 			},
 		});
+		this.load_rows();
+	}
+
+	load_rows() {
+		const seq = ++this._rows_seq;
+		this.page.main.find("#rr-table .rr-count").text("Loading…");
+		frappe.call({
+			method: "admin_panel.api.referral_rewards.get_referral_rows",
+			args: {
+				reward_status: this.active_bucket,
+				tier: this.filters.tier,
+				date_from: this.filters.date_from,
+				date_to: this.filters.date_to,
+				inviter: this.filters.inviter,
+				page: this.page_no,
+				page_size: RR_PAGE_SIZE,
+			},
+			callback: (res) => {
+				if (seq !== this._rows_seq) return; // a newer filter/page won
+				const d = res.message || {};
+				if (d.success === false) {
+					this.rows = [];
+					this.rows_total = 0;
+					this.render_table(d.error || "Failed to load rows");
+					return;
+				}
+				this.rows = d.rows || [];
+				this.rows_total = d.total || 0;
+				if (d.now) this.now = d.now;
+				this.render_table();
+			},
+			error: () => {
+				if (seq !== this._rows_seq) return;
+				this.render_table("Failed to load rows");
+			},
+		});
 	}
 
 	render_summary() {
@@ -330,30 +403,38 @@ class ReferralRewards {
 		);
 	}
 
+	render_tier_options() {
+		// Every tier that has paid out, plus the current one — the amounts the
+		// tier filter can usefully select.
+		const s = this.summary;
+		const amounts = new Set((s.disbursed_by_tier || []).map((t) => Number(t.amount_dollars)));
+		if (s.current_tier_dollars) amounts.add(Number(s.current_tier_dollars));
+		const el = this.page.main.find("#rr-f-tier");
+		const selected = el.val() || this.filters.tier;
+		el.html(
+			`<option value="">Any tier</option>` +
+				[...amounts]
+					.sort((a, b) => b - a)
+					.map((a) => `<option value="${Number(a)}">${rr_money(a)}</option>`)
+					.join("")
+		);
+		el.val(selected);
+	}
+
 	render_buckets() {
-		// All chip counts come from the SUMMARY (full dataset) so every badge
-		// shares one basis; the row list is capped for paid/unrewarded but always
-		// contains every actionable row, so actionable filters show all of them.
+		// Chip counts come from the SUMMARY (every invite, not the loaded page),
+		// so each badge is the total the server-side filter will page through.
 		const s = this.summary;
 		const counts = {
-			all: s.rows_total === undefined ? this.rows.length : s.rows_total,
+			all: s.total_invites || 0,
 			paid: s.paid || 0,
 			pending: s.pending || 0,
 			partial: s.partial || 0,
 			failed: s.failed || 0,
 			processing: s.processing || 0,
-			unrewarded:
-				s.unrewarded === undefined
-					? this.rows.filter((r) => r.reward_status === "unrewarded").length
-					: s.unrewarded,
-			sent:
-				s.invites_sent_open === undefined
-					? this.rows.filter((r) => r.reward_status === "sent").length
-					: s.invites_sent_open,
-			expired:
-				s.invites_expired === undefined
-					? this.rows.filter((r) => r.reward_status === "expired").length
-					: s.invites_expired,
+			unrewarded: s.unrewarded || 0,
+			sent: s.invites_sent_open || 0,
+			expired: s.invites_expired || 0,
 		};
 		const html = RR_BUCKETS.map((b) => {
 			const active = b.key === this.active_bucket ? " active" : "";
@@ -365,18 +446,14 @@ class ReferralRewards {
 		el.html(html);
 		el.find(".rr-bucket").on("click", (e) => {
 			this.active_bucket = e.currentTarget.dataset.bucket;
+			this.page_no = 1;
 			this.render_buckets();
-			this.render_table();
+			this.load_rows();
 		});
 	}
 
-	filtered_rows() {
-		if (this.active_bucket === "all") return this.rows;
-		return this.rows.filter((r) => r.reward_status === this.active_bucket);
-	}
-
-	render_table() {
-		const rows = this.filtered_rows();
+	render_table(error) {
+		const rows = this.rows;
 		const esc = (v) =>
 			frappe.utils.escape_html(String(v === null || v === undefined || v === "" ? "—" : v));
 		const paidMark = (b) =>
@@ -409,11 +486,16 @@ class ReferralRewards {
             </tr>`;
 			})
 			.join("");
+		const pages = Math.max(1, Math.ceil(this.rows_total / RR_PAGE_SIZE));
+		const plural = this.rows_total === 1 ? "" : "s";
+		const prevOff = this.page_no <= 1 ? " disabled" : "";
+		const nextOff = this.page_no >= pages ? " disabled" : "";
+		const empty = error
+			? `<span class="rr-err">${esc(error)}</span>`
+			: "No referrals match these filters";
 		this.page.main.find("#rr-table").html(`
             <div class="rr-card">
-                <div class="rr-count">Showing ${rows.length} invite${
-			rows.length === 1 ? "" : "s"
-		}</div>
+                <div class="rr-count">${Number(this.rows_total)} invite${plural} match — newest first</div>
                 <div style="overflow-x:auto">
                     <table class="rr-table">
                         <thead><tr>
@@ -423,10 +505,26 @@ class ReferralRewards {
                         </tr></thead>
                         <tbody>${
 							body ||
-							'<tr><td colspan="8" style="text-align:center;color:var(--rr-ink3)">No referrals</td></tr>'
+							`<tr><td colspan="8" style="text-align:center;color:var(--rr-ink3)">${empty}</td></tr>`
 						}</tbody>
                     </table>
                 </div>
+                <div class="rr-pager">
+                    <button class="rr-btn rr-prev"${prevOff}>‹ Prev</button>
+                    <span>Page ${Number(this.page_no)} of ${Number(pages)}</span>
+                    <button class="rr-btn rr-next"${nextOff}>Next ›</button>
+                </div>
             </div>`);
+		const table = this.page.main.find("#rr-table");
+		table.find(".rr-prev").on("click", () => {
+			if (this.page_no <= 1) return;
+			this.page_no -= 1;
+			this.load_rows();
+		});
+		table.find(".rr-next").on("click", () => {
+			if (this.page_no >= pages) return;
+			this.page_no += 1;
+			this.load_rows();
+		});
 	}
 }
@@ -176,7 +176,7 @@ class SystemAccounts {
 			frappe.session.user === "Administrator" ||
 			frappe.user_roles.includes("System Manager");
 		this.render_shell();
-		this.load();
+		this.load(false);
 	}
 
 	render_shell() {
@@ -205,14 +205,19 @@ class SystemAccounts {
 		this.page.main.find('[data-act="watch"]').on("click", () => this.open_watch_dialog());
 	}
 
-	load() {
+	// refresh=false lets the first paint share a recent cached sweep; every
+	// other caller (Refresh button, post-mutation reloads) forces a recompute.
+	load(refresh = true) {
 		const meta = this.page.main.find("#sa-meta");
 		meta.removeClass("err").text("Loading live balances…");
 		frappe.call({
 			method: "admin_panel.api.system_accounts.get_system_accounts",
+			args: { refresh: refresh ? 1 : 0 },
 			callback: (res) => {
 				this.data = res.message;
-				meta.text(`Live from IBEX · ${this.data.now}`);
+				const c = this.data.cache;
+				const age = c && c.age_seconds >= 1 ? ` (${Math.round(c.age_seconds)}s old)` : "";
+				meta.text(`Live from IBEX · ${this.data.now}${age}`);
 				this.render();
 			},
 			error: () => meta.addClass("err").text("Could not load system accounts."),
@@ -76,6 +76,7 @@ const WC_CSS = `
     .wallet-census .wc-tile-value { font-size: 27px; font-weight: 650; letter-spacing: -0.015em;
           line-height: 1.1; color: var(--wc-ink); }
     .wallet-census .wc-tile-sub { color: var(--wc-ink3); font-size: 12px; margin-top: auto; }
+    .wallet-census .wc-dist-bar { height: 8px; border-radius: 4px; background: var(--wc-accent); min-width: 2px; }
     .wallet-census .wc-chips { display: flex; flex-wrap: wrap; gap: 8px; margin-bottom: 14px; }
     .wallet-census .wc-bucket { border: 1px solid var(--wc-line); background: var(--wc-surface);
           color: var(--wc-ink2); border-radius: 999px; padding: 5px 13px; font-size: 12.5px;
@@ -139,6 +140,7 @@ const WC_CSS = `
 `;
 
 const WC_PAGE_SIZE = 200;
+const WC_POLL_MS = 15000;
 const WC_PAGE_STEP = 500;
 
 const BUCKETS = [
@@ -173,6 +175,7 @@ class WalletCensus {
 		this.sort_key = "balance";
 		this.sort_dir = "desc";
 		this.poll_timer = null;
+		this.watched_snapshot = null;
 
 		this.run_btn = this.page.set_primary_action(
 			"Run Census",
@@ -196,13 +199,17 @@ class WalletCensus {
                 <div id="wc-detail" style="display:none"></div>
                 <div id="wc-census">
                     <div id="wc-status" class="wc-meta"></div>
+                    <div id="wc-partial" style="display:none"></div>
                     <div id="wc-summary" class="wc-tiles"></div>
+                    <div id="wc-distribution"></div>
                     <div id="wc-buckets" class="wc-chips"></div>
                     <div class="wc-toolbar">
                         <input type="text" id="wc-search" class="wc-input" style="min-width:280px"
                             placeholder="Filter loaded rows by username / accountId…">
                         <button class="wc-btn" id="wc-export">Export CSV</button>
+                        <button class="wc-btn" id="wc-trend-btn">Run history</button>
                     </div>
+                    <div id="wc-trend" style="display:none"></div>
                     <div id="wc-table"></div>
                 </div>
             </div>
@@ -217,6 +224,7 @@ class WalletCensus {
 			}, 200)
 		);
 		this.page.main.find("#wc-export").on("click", () => this.export_csv());
+		this.page.main.find("#wc-trend-btn").on("click", () => this.toggle_trend());
 
 		const lookup = this.page.main.find("#wc-lookup");
 		const doLookup = () => {
@@ -262,16 +270,84 @@ class WalletCensus {
 			method: "admin_panel.api.census.get_census_status",
 			callback: (res) => {
 				const s = res.message || {};
-				this.render_status(s);
+				// The stored count trails the live one (persisted every N
+				// pages) — don't let a poll roll the display back.
+				const behind = s.status === "Running" && (s.scanned_pages || 0) < (this.live_pages || 0);
+				if (!behind) this.render_status(s);
 				if (s.status === "Running") {
-					this.poll_timer = setTimeout(() => this.poll(), 4000);
-				} else if (s.status === "Complete") {
-					this.load_latest();
+					this.watch_partial(s.snapshot);
+					if (s.partial) this.render_partial(s.partial);
+					// Live counts arrive as realtime events; the poll only
+					// notices completion (and covers a dropped socket).
+					this.poll_timer = setTimeout(() => this.poll(), WC_POLL_MS);
+				} else {
+					this.unwatch_partial();
+					if (s.status === "Complete") this.load_latest();
 				}
 			},
 		});
 	}
 
+	// ── Progressive results (realtime, while a run sweeps) ────────
+	watch_partial(snapshot) {
+		if (!snapshot || this.watched_snapshot === snapshot) return;
+		this.unwatch_partial();
+		this.watched_snapshot = snapshot;
+		this.partial_handler = (data) => {
+			if (data && data.snapshot === this.watched_snapshot) this.render_partial(data);
+		};
+		this.progress_handler = (data) => {
+			if (!data || data.snapshot !== this.watched_snapshot) return;
+			this.live_pages = data.scanned_pages || 0;
+			this.render_status(data);
+		};
+		frappe.realtime.doc_subscribe("Wallet Census Snapshot", snapshot);
+		frappe.realtime.on("wallet_census_partial", this.partial_handler);
+		frappe.realtime.on("wallet_census_progress", this.progress_handler);
+	}
+
+	unwatch_partial() {
+		if (!this.watched_snapshot) return;
+		frappe.realtime.off("wallet_census_partial", this.partial_handler);
+		frappe.realtime.off("wallet_census_progress", this.progress_handler);
+		frappe.realtime.doc_unsubscribe("Wallet Census Snapshot", this.watched_snapshot);
+		this.watched_snapshot = null;
+		this.live_pages = 0;
+		this.page.main.find("#wc-partial").hide().empty();
+	}
+
+	render_partial(p) {
+		const t = p.totals || {};
+		const usd = this.fmt_money((t.usd || {}).balance, "USD");
+		const usdt = this.fmt_money((t.usdt || {}).balance, "USDT");
+		const counts = p.bucket_counts || {};
+		const chips = BUCKETS.filter((b) => b.key !== "all")
+			.map((b) => {
+				const label = frappe.utils.escape_html(b.label);
+				const count = counts[b.key] || 0;
+				return `<span class="wc-bucket">${label} <span class="badge">${count}</span></span>`;
+			})
+			.join("");
+		const top = (p.top_funded || [])
+			.map((r) => {
+				const who = frappe.utils.escape_html(r.username || r.account_id || "—");
+				const amount = this.fmt_money(r.balance, r.currency || "");
+				return `<tr><td>${who}</td><td>${frappe.utils.escape_html(amount)}</td></tr>`;
+			})
+			.join("");
+		const accounts = t.accounts || 0;
+		const funded = t.funded || 0;
+		this.page.main.find("#wc-partial").show().html(`
+            <div class="wc-meta">Partial results so far — ${accounts} accounts, ${funded} funded (final figures replace these when the run completes)</div>
+            <div class="wc-tiles">
+                <div class="wc-tile"><div class="wc-tile-label">USD Float (so far)</div><div class="wc-tile-value">${usd}</div></div>
+                <div class="wc-tile"><div class="wc-tile-label">USDT Float (so far)</div><div class="wc-tile-value">${usdt}</div></div>
+            </div>
+            <div class="wc-chips">${chips}</div>
+            <table class="wc-table"><thead><tr><th>Largest balances so far</th><th>Balance</th></tr></thead><tbody>${top}</tbody></table>
+        `);
+	}
+
 	render_status(s) {
 		if (!s || s.status === "None") {
 			this.set_status("No census has been run yet.");
@@ -296,19 +372,46 @@ class WalletCensus {
 
 	// ── Load + render ─────────────────────────────────────────────
 	load_latest() {
-		frappe.call({
-			method: "admin_panel.api.census.get_latest_census",
-			callback: (res) => {
-				const d = res.message || {};
-				if (!d.snapshot) return;
+		// Not frappe.call: its GETs carry a cache-busting `_=` parameter, so
+		// nothing would ever revalidate. Send the last snapshot's ETag
+		// ourselves and reuse the payload we kept when the answer is a 304.
+		const headers = {
+			Accept: "application/json",
+			"X-Frappe-CSRF-Token": frappe.csrf_token,
+		};
+		if (this.latest_etag) headers["If-None-Match"] = this.latest_etag;
+		return fetch("/api/method/admin_panel.api.census.get_latest_census", {
+			headers,
+			cache: "no-store",
+			credentials: "same-origin",
+		})
+			.then((res) => {
+				if (res.status === 304) return this.latest_payload;
+				if (!res.ok) throw new Error(`HTTP ${res.status}`);
+				const etag = res.headers.get("ETag");
+				return res.json().then((body) => {
+					this.latest_etag = etag;
+					this.latest_payload = body.message || {};
+					return this.latest_payload;
+				});
+			})
+			.then((d) => {
+				if (!d || !d.snapshot) return;
 				this.rows = d.rows || [];
 				this.totals = d.totals || {};
 				this.bucket_counts = d.bucket_counts || {};
 				this.render_summary();
+				this.render_distribution();
 				this.render_buckets();
 				this.render_table();
-			},
-		});
+			})
+			.catch((e) =>
+				this.set_status(
+					`<span class="err">Could not load the census: ${frappe.utils.escape_html(
+						e.message
+					)}</span>`
+				)
+			);
 	}
 
 	fmt_money(v, ccy) {
@@ -352,6 +455,33 @@ class WalletCensus {
 			);
 	}
 
+	// Funded-balance quantiles + per-decade histogram, computed by the census
+	// itself (totals.balance_quantiles / balance_histogram).
+	render_distribution() {
+		const q = this.totals.balance_quantiles;
+		const bins = this.totals.balance_histogram || [];
+		const el = this.page.main.find("#wc-distribution");
+		if (!q || !bins.length) {
+			el.empty();
+			return;
+		}
+		const most = Math.max(...bins.map((b) => b.count));
+		const range = (b) =>
+			`${this.fmt_money(b.lower, "")}–${this.fmt_money(b.upper, "")}`.replace(/ /g, "");
+		const rows = bins
+			.map(
+				(b) => `<tr><td>${range(b)}</td><td>${b.count}</td>
+                    <td style="width:60%"><div class="wc-dist-bar" style="width:${(100 * b.count) / most}%"></div></td></tr>`
+			)
+			.join("");
+		el.html(`
+            <div class="wc-meta">Funded balances — median ${this.fmt_money(q.p50, "").trim()},
+                p90 ${this.fmt_money(q.p90, "").trim()}, p99 ${this.fmt_money(q.p99, "").trim()}</div>
+            <table class="wc-table"><thead><tr><th>Balance range</th><th>Wallets</th><th></th></tr></thead>
+                <tbody>${rows}</tbody></table>
+        `);
+	}
+
 	render_buckets() {
 		const html = BUCKETS.map((b) => {
 			const count =
@@ -565,14 +695,16 @@ class WalletCensus {
 				(w) => `<tr>
                 <td>${esc(w.currency)}</td>
                 <td>${esc(w.type)}</td>
-                <td style="text-align:right"><span class="wc-amt out">${Number(
-					w.live_balance || 0
-				).toLocaleString(undefined, {
-					minimumFractionDigits: 2,
-					maximumFractionDigits: 8,
-				})}</span>${
-					w.balance_not_found ? '<span class="wc-fee">(drained)</span>' : ""
-				}</td>
+                <td style="text-align:right">${
+					w.balance_error
+						? `<span class="wc-fee" title="${frappe.utils.escape_html(
+								w.balance_error
+						  )}">unavailable</span>`
+						: `<span class="wc-amt out">${Number(w.live_balance || 0).toLocaleString(
+								undefined,
+								{ minimumFractionDigits: 2, maximumFractionDigits: 8 }
+						  )}</span>`
+				}${w.balance_not_found ? '<span class="wc-fee">(drained)</span>' : ""}</td>
                 <td>${w.is_default ? '<span class="wc-defchip">default</span>' : ""}</td>
                 <td><code>${frappe.utils.escape_html(w.wallet_id || "")}</code></td>
             </tr>`
@@ -624,6 +756,10 @@ class WalletCensus {
             </tr>`;
 					})
 					.join("")
+			: d.transactions_error
+			? `<tr><td colspan="4" style="color:var(--wc-ink3)">Transactions unavailable: ${frappe.utils.escape_html(
+					d.transactions_error
+			  )}</td></tr>`
 			: '<tr><td colspan="4" style="color:var(--wc-ink3)">No recent transactions</td></tr>';
 
 		detail.html(`
@@ -678,6 +814,56 @@ class WalletCensus {
 		});
 	}
 
+	// ── Run history (per-phase timings across snapshots) ──────────
+	toggle_trend() {
+		const el = this.page.main.find("#wc-trend");
+		if (el.is(":visible")) {
+			el.hide();
+			return;
+		}
+		el.show().html(`<div class="wc-meta">Loading run history…</div>`);
+		frappe.call({
+			method: "admin_panel.api.census.get_census_trend",
+			callback: (res) => this.render_trend((res.message || {}).runs || []),
+		});
+	}
+
+	render_trend(runs) {
+		const el = this.page.main.find("#wc-trend");
+		if (!runs.length) {
+			el.html(`<div class="wc-meta">No completed runs with timings yet.</div>`);
+			return;
+		}
+		const secs = (v) => (v === null || v === undefined ? "—" : `${Number(v).toFixed(1)}s`);
+		const num = (v) => (v === null || v === undefined ? "—" : Number(v).toLocaleString());
+		const body = runs
+			.map((r) => {
+				const name = frappe.utils.escape_html(r.name);
+				const when = frappe.utils.escape_html(r.completed_at || "");
+				const flag = r.slow ? ` <span class="err">slow</span>` : "";
+				const retries = `${num(r.ibex_retries)} / ${num(r.ibex_rate_limited)}`;
+				const payloadMb = r.payload_bytes ? (r.payload_bytes / 1048576).toFixed(1) + " MB" : "—";
+				return `<tr>
+                    <td>${name}${flag}</td><td>${when}</td><td>${num(r.total_accounts)}</td>
+                    <td>${secs(r.duration_seconds)}</td><td>${secs(r.ibex_seconds)}</td>
+                    <td>${secs(r.mongo_seconds)}</td><td>${secs(r.build_seconds)}</td>
+                    <td>${secs(r.save_seconds)}</td><td>${num(r.ibex_requests)}</td>
+                    <td>${retries}</td><td>${num(r.peak_rss_mb)}</td><td>${payloadMb}</td>
+                </tr>`;
+			})
+			.join("");
+		el.html(`
+            <table class="wc-table">
+                <thead><tr>
+                    <th>Snapshot</th><th>Completed</th><th>Accounts</th><th>Total</th><th>IBEX</th>
+                    <th>Mongo</th><th>Build</th><th>Save</th><th>Requests</th><th>Retries / 429s</th>
+                    <th>Peak RSS (MB)</th><th>Payload</th>
+                </tr></thead>
+                <tbody>${body}</tbody>
+            </table>
+        `);
+	}
+
 	export_csv() {
 		const rows = this.filtered_rows();
 		const cols = [
@@ -1,6 +1,7 @@
 import frappe
 
 from admin_panel.admin_panel.doctype.allowed_country.seed import seed_allowed_countries
+from admin_panel.api.mongo_reader import check_lookup_indexes
 
 
 def after_migrate():
@@ -10,6 +11,7 @@ def after_migrate():
 	delete_legacy_pages()
 	ensure_desk_home_page()
 	seed_allowed_countries()
+	check_lookup_indexes()
 
 
 def ensure_roles():
@@ -9,6 +9,9 @@ from .common import handle_api_errors
 from .flash_identifiers import is_flash_username_candidate
 from .fygaro_topup_core import rejection_reason
 from .graphql_client import GraphQLClient, GraphQLError
+from .identity import invalidate, lookup_flash_account, resolve_account
+from .mongo_reader import load_payer_identities
+from .phone_index import SOURCE_CUSTOMER, index_flash_user, lookup_phone
 from .transfer_identity_core import (
 	build_payer_fields,
 	collect_lookup_refs,
@@ -43,7 +46,9 @@ def update_account_level(uid, level, erp_party=None):
 	avoid stripping it on a re-level. Creating a brand-new party is the
 	upgrade-request approval flow's job (see _create_erp_records)."""
 	client = GraphQLClient()
-	return client.update_account_level(uid, level, erp_party=erp_party)
+	result = client.update_account_level(uid, level, erp_party=erp_party)
+	invalidate(uid)
+	return result
 
 
 # Columns the Sent Alerts History panel renders, in doctype field order.
@@ -540,6 +545,7 @@ def approve_upgrade_request(request_id):
 		level=req.requested_level,
 		erp_party=erp_party,
 	)
+	invalidate(account["id"], req.phone_number)
 
 	if result.get("errors"):
 		error_messages = [err.get("message", "Unknown error") for err in result["errors"]]
@@ -781,21 +787,23 @@ def search_account_smart(query):
 	try:
 		client = GraphQLClient()
 
+		# Lookups go through the shared identity cache: a repeat search (or one
+		# by another handle of an account already seen) is served from memory.
 		if query.startswith("+") or re.match(r"^\d{7,}$", query):
-			account = client.get_account_by_phone(query)
+			account = lookup_flash_account(client, "phone", query)
 		elif "@" in query:
-			account = client.get_account_by_email(query)
+			account = lookup_flash_account(client, "email", query)
 		# One shared shape guard (see flash_identifiers) — a local copy of the
 		# regex here would drift from the Fee Discount controller's, and the
 		# two would then disagree about the same operator input. Account uuids
 		# are not username-shaped, so they fall through to the by-id branch
 		# below, which is where the None fallback was already sending them.
 		elif is_flash_username_candidate(query):
-			account = client.get_account_by_username(query)
+			account = lookup_flash_account(client, "username", query)
 			if account is None:
-				account = client.get_account_by_id(query)
+				account = lookup_flash_account(client, "id", query)
 		else:
-			account = client.get_account_by_id(query)
+			account = lookup_flash_account(client, "id", query)
 
 		if account is not None:
 			return account
@@ -857,10 +865,34 @@ def update_account_status_api(uid=None, account_uuid=None, username=None, status
 		return {"success": False, "error": "Account UID is required to update status in Flash"}
 
 	result = client.update_account_status(account_uid, status, comment)
+	invalidate(account_uid, username)
 	audit_log("update_status", "Flash Account", account_uid, {"status": status, "comment": comment})
 	return result or {"success": True}
 
 
+def _reindex_account_phone(account_uuid, phone):
+	"""Best-effort phone-index write-through after an Account Hub phone edit."""
+	try:
+		account = resolve_account(account_uuid)
+		if account:
+			index_flash_user(account.get("kratosUserId"), phone)
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Phone index write-through failed")
+
+
+def _current_phone(account_uuid):
+	"""The account's phone before an Account Hub edit (mongo users.phone), best-effort.
+
+	Read uncached: the identity cache may be the very thing holding it stale.
+	"""
+	try:
+		identity = load_payer_identities([account_uuid], []).get(account_uuid)
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Phone lookup before update failed")
+		return None
+	return identity.get("phone") if identity else None
+
+
 @frappe.whitelist()
 @require_admin()
 @handle_api_errors
@@ -881,9 +913,13 @@ def update_user_phone_api(account_uuid=None, phone=None, username=None):
 		frappe.response["http_status_code"] = 400
 		return {"success": False, "error": "Account UUID is required to update phone in Flash"}
 
+	# Entries cached under the old number must go too, on every worker.
+	old_phone = _current_phone(account_uuid)
 	result = client.update_user_phone(account_uuid, phone)
+	invalidate(account_uuid, username, phone, old_phone)
 	if result and result.get("errors"):
 		return result
+	_reindex_account_phone(account_uuid, phone)
 
 	local_updates = _update_local_upgrade_request_phone(username, phone)
 	if isinstance(result, dict):
@@ -1114,23 +1150,17 @@ def search_cashout_account(id: str):
 		frappe.response["http_status_code"] = 400
 		return {"error": "Phone number or Username is required"}
 
-	# Find Customer doctypes matching the query
-	import re as _re
-
-	has_digits = len(_re.sub(r"\D", "", id)) >= 3
-
-	digits_only = _re.sub(r"\D", "", id) if has_digits else ""
-	customer_filters = []
-	if has_digits:
-		customer_filters.append(["mobile_no", "like", f"%{digits_only}%"])
-	customer_filters.append(["customer_name", "like", f"%{id}%"])
-
-	matching_customers = frappe.get_all(
-		"Customer",
-		filters=customer_filters,
-		pluck="name",
-		limit_page_length=50,
-	)
+	# Phone-shaped queries are exact lookups in the normalized phone index
+	# (any formatting, with or without country code); anything else matches
+	# the customer name.
+	matching_customers = lookup_phone(id, source=SOURCE_CUSTOMER)[:50]
+	if not matching_customers:
+		matching_customers = frappe.get_all(
+			"Customer",
+			filters=[["customer_name", "like", f"%{id}%"]],
+			pluck="name",
+			limit_page_length=50,
+		)
 
 	if not matching_customers:
 		frappe.response["http_status_code"] = 404
@@ -1169,9 +1199,10 @@ def _attach_payer_identity(rows):
 	identities = {}
 	if account_refs or usernames:
 		try:
-			from .mongo_reader import load_payer_identities
+			# Cached wrapper around mongo_reader.load_payer_identities.
+			from .identity import resolve_payer_identities
 
-			identities = load_payer_identities(account_refs, usernames)
+			identities = resolve_payer_identities(account_refs, usernames)
 		except Exception:
 			frappe.log_error(frappe.get_traceback(), "Transfer payer identity mongo lookup failed")
 
@@ -1444,19 +1475,19 @@ def _first_cashout_account_match(client, doc):
 	for username in username_candidates:
 		if not _is_flash_username_candidate(username):
 			continue
-		account = client.get_account_by_username(username)
+		account = lookup_flash_account(client, "username", username)
 		if account:
 			return account
 
 	phone = customer_info.get("mobile_no")
 	if phone:
-		account = client.get_account_by_phone(phone)
+		account = lookup_flash_account(client, "phone", phone)
 		if account:
 			return account
 
 	email = customer_info.get("email_id")
 	if email:
-		account = client.get_account_by_email(email)
+		account = lookup_flash_account(client, "email", email)
 		if account:
 			return account
 
@@ -16,9 +16,13 @@ from frappe.utils import cstr
 
 from .auth import audit_log, require_admin
 from .banking_core import slim_external_account, slim_virtual_account
-from .bridge_client import CUSTOMER_ID_RE, BridgeApiError, BridgeClient
+from .bridge_client import CUSTOMER_ID_RE, BridgeClient
 from .common import handle_api_errors
-from .mongo_reader import find_account
+from .fanout import Fanout
+from .identity import resolve_account
+
+# Per-call deadline for the Bridge list reads on the Banking tab.
+BRIDGE_TIMEOUT_SECONDS = 15
 
 
 def _erp_bank_accounts(erp_party):
@@ -43,7 +47,7 @@ def _erp_bank_accounts(erp_party):
 def _bridge_banking(account_ref):
 	"""Bridge side of the payload. Never raises — errors are reported in-band."""
 	try:
-		account = find_account(account_ref)
+		account = resolve_account(account_ref)
 	except Exception as e:  # mongo unconfigured/unreachable — degrade, don't fail the tab
 		return {"linked": False, "error": f"mongo lookup failed: {e}"}
 	if not account or not account.get("bridgeCustomerId"):
@@ -55,18 +59,29 @@ def _bridge_banking(account_ref):
 
 	try:
 		client = BridgeClient()
-		return {
-			"linked": True,
-			"customer_id": customer_id,
-			"kyc_status": account.get("bridgeKycStatus"),
-			"virtual_accounts": [slim_virtual_account(v) for v in client.list_virtual_accounts(customer_id)],
-			"external_accounts": [
-				slim_external_account(e) for e in client.list_external_accounts(customer_id)
-			],
-		}
-	except (BridgeApiError, ValueError) as e:
+	except ValueError as e:
 		return {"linked": True, "customer_id": customer_id, "error": str(e)}
 
+	# The two lists are independent Bridge calls: fetch them side by side and
+	# keep whichever succeeded — the page renders the survivor next to the error.
+	with Fanout(timeout=BRIDGE_TIMEOUT_SECONDS) as reads:
+		reads.submit("virtual_accounts", client.list_virtual_accounts, customer_id)
+		reads.submit("external_accounts", client.list_external_accounts, customer_id)
+		virtuals = reads.get("virtual_accounts", [])
+		externals = reads.get("external_accounts", [])
+		failures = reads.failures()
+
+	result = {
+		"linked": True,
+		"customer_id": customer_id,
+		"kyc_status": account.get("bridgeKycStatus"),
+		"virtual_accounts": [slim_virtual_account(v) for v in virtuals],
+		"external_accounts": [slim_external_account(e) for e in externals],
+	}
+	if failures:
+		result["error"] = "; ".join(f"{name}: {msg}" for name, msg in failures.items())
+	return result
+
 
 @frappe.whitelist()
 @require_admin()
@@ -1,7 +1,7 @@
 """Read-only client for the Bridge.xyz API (KYC customers).
 
-Used by the bridge-kyc desk page to list every Bridge customer and read one
-customer's full KYC/KYB state (endorsements, missing requirements). Auth is a
+Used by the bridge-kyc customer mirror sync to list every Bridge customer and
+by the desk page to read one customer's full KYC/KYB state (endorsements, missing requirements). Auth is a
 static ``Api-Key`` header. Endpoints used (verified against prod 2026-07-31):
 
   * bulk list   GET {api_url}/customers?limit=100[&starting_after=<id>]
@@ -78,9 +78,13 @@ class BridgeClient:
 			raise BridgeApiError(f"Bridge GET {path} failed: {resp.status_code} {resp.text[:200]}")
 		return resp.json()
 
-	def list_customers(self) -> list:
-		"""Every Bridge customer, newest first. Terminates only on an empty page."""
-		customers = []
+	def iter_customer_pages(self):
+		"""Yield successive pages of Bridge customers, newest first.
+
+		Terminates only on an empty page. A generator so callers that only
+		need the head of the list (the KYC mirror's incremental sync) can stop
+		early without paying for the full sweep.
+		"""
 		starting_after = None
 		for _ in range(MAX_PAGES):
 			params = {"limit": PAGE_LIMIT}
@@ -88,13 +92,17 @@ class BridgeClient:
 				params["starting_after"] = starting_after
 			batch = self._get("/customers", params).get("data") or []
 			if not batch:
-				return customers
-			customers.extend(batch)
+				return
+			yield batch
 			starting_after = batch[-1].get("id")
 			if not starting_after:
 				raise BridgeApiError("Bridge customer page contained an entry without an id")
 		raise BridgeApiError(f"Bridge customer pagination exceeded {MAX_PAGES} pages")
 
+	def list_customers(self) -> list:
+		"""Every Bridge customer, newest first. Terminates only on an empty page."""
+		return [customer for batch in self.iter_customer_pages() for customer in batch]
+
 	def get_customer(self, customer_id: str) -> dict:
 		"""One customer's full record, including endorsements/requirements.
 
@@ -1,42 +1,196 @@
 """Bridge.xyz KYC status endpoints for the bridge-kyc desk page.
 
-On-demand, live reads: every call hits Bridge + mongo directly (no snapshot
-doctype — current volume is ~40 customers, one page). The overview joins
-Bridge customers (source of truth for KYC state) to Flash accounts by
-bridgeCustomerId; the detail endpoint returns one customer's full endorsement
-and missing-requirements breakdown.
+The overview reads a local mirror of Bridge customers (`Bridge Customer
+Mirror`) instead of paging through Bridge on every load, then joins it to
+Flash accounts by bridgeCustomerId. The mirror is kept current by two
+scheduled jobs (see hooks.scheduler_events):
+
+  * sync_customer_mirror — incremental. Pages newest-first and stops at the
+    first already-mirrored customer whose updated_at is unchanged, so a
+    quiet interval costs one request.
+  * reconcile_customer_mirror — full sweep on a slower schedule. Rewrites
+    every changed customer (catching late edits to older ones the
+    incremental stop skips) and drops customers Bridge no longer returns.
+
+Only the detail endpoint goes live; it also writes the fresh record back
+into the mirror.
 """
 
+import json
 from datetime import datetime, timezone
 
 import frappe
-from frappe.utils import cstr
+from frappe.utils import cint, cstr
 
 from .auth import require_admin
 from .bridge_client import CUSTOMER_ID_RE, BridgeClient
-from .bridge_kyc_core import build_detail, build_overview
+from .bridge_kyc_core import build_detail, build_overview, plan_mirror_page
 from .common import handle_api_errors
+from .endpoint_cache import swr_cached
+from .fanout import Fanout
 from .mongo_reader import load_bridge_accounts
 
+MIRROR_DOCTYPE = "Bridge Customer Mirror"
+
+# Global defaults holding the last successful sync stamps (UTC ISO).
+_SYNCED_AT_KEY = "bridge_customer_mirror_synced_at"
+_RECONCILED_AT_KEY = "bridge_customer_mirror_reconciled_at"
+
 
 def _now_iso():
 	"""UTC ISO stamp, comparable to Bridge's Z timestamps client-side."""
 	return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
+# ── Customer mirror ────────────────────────────────────────────────────────
+
+
+def _mirrored_updated_at():
+	"""customer id -> the Bridge updated_at currently stored in the mirror."""
+	return dict(frappe.get_all(MIRROR_DOCTYPE, fields=["name", "bridge_updated_at"], as_list=True))
+
+
+def _write_mirror(customer):
+	"""Upsert one Bridge customer into the mirror (raw payload + list fields)."""
+	customer_id = customer.get("id")
+	values = {
+		"status": customer.get("status"),
+		"customer_type": customer.get("type"),
+		"email": customer.get("email"),
+		"bridge_created_at": customer.get("created_at"),
+		"bridge_updated_at": customer.get("updated_at"),
+		"synced_at": frappe.utils.now_datetime(),
+		"payload_json": json.dumps(customer),
+	}
+	if frappe.db.exists(MIRROR_DOCTYPE, customer_id):
+		frappe.db.set_value(MIRROR_DOCTYPE, customer_id, values, update_modified=False)
+		return
+	doc = frappe.new_doc(MIRROR_DOCTYPE)
+	doc.customer_id = customer_id
+	doc.update(values)
+	doc.insert(ignore_permissions=True)
+
+
+def _run_mirror_sync(full):
+	"""Sync the mirror from Bridge. Returns {pages, written, removed}."""
+	client = BridgeClient()
+	mirrored = _mirrored_updated_at()
+	seen = set()
+	pages = 0
+	written = 0
+	for batch in client.iter_customer_pages():
+		pages += 1
+		seen.update(c.get("id") for c in batch)
+		changed, reached_unchanged = plan_mirror_page(batch, mirrored, stop_at_unchanged=not full)
+		for customer in changed:
+			_write_mirror(customer)
+			written += 1
+		frappe.db.commit()
+		if reached_unchanged and not full:
+			break
+
+	removed = 0
+	if full:
+		# Only a complete sweep proves absence — an incremental stop never deletes.
+		stale = [name for name in mirrored if name not in seen]
+		if stale:
+			frappe.db.delete(MIRROR_DOCTYPE, {"name": ("in", stale)})
+			removed = len(stale)
+
+	stamp = _now_iso()
+	frappe.db.set_default(_SYNCED_AT_KEY, stamp)
+	if full:
+		frappe.db.set_default(_RECONCILED_AT_KEY, stamp)
+	frappe.db.commit()
+	return {"pages": pages, "written": written, "removed": removed}
+
+
+def sync_customer_mirror():
+	"""Scheduled incremental mirror sync. No-op where Bridge isn't configured."""
+	if not frappe.conf.get("bridge_api_key"):
+		return
+	_run_mirror_sync(full=False)
+
+
+def reconcile_customer_mirror():
+	"""Scheduled full mirror reconcile. No-op where Bridge isn't configured."""
+	if not frappe.conf.get("bridge_api_key"):
+		return
+	_run_mirror_sync(full=True)
+
+
+def _mirrored_customers():
+	rows = frappe.get_all(MIRROR_DOCTYPE, fields=["payload_json"], as_list=True)
+	return [json.loads(payload) for (payload,) in rows if payload]
+
+
+# ── Whitelisted endpoints ─────────────────────────────────────────────────
+
+
 @frappe.whitelist()
 @require_admin()
 @handle_api_errors
+@swr_cached(fresh_seconds=30)
 def get_kyc_overview():
-	"""All Bridge customers (live) joined to Flash accounts, plus status tallies."""
-	customers = BridgeClient().list_customers()
-	accounts = load_bridge_accounts()
+	"""All mirrored Bridge customers joined to Flash accounts, plus status tallies.
+
+	A site that has never synced (fresh deploy) gets an empty overview flagged
+	`syncing` while one full reconcile runs in the background; every later
+	load is a local read.
+	"""
+	if not frappe.db.get_default(_RECONCILED_AT_KEY):
+		return _syncing_overview()
+	# The mongo account load runs beside the mirror read; the mirror uses
+	# frappe.db, so it stays on the request thread.
+	with Fanout() as reads:
+		reads.submit("accounts", load_bridge_accounts)
+		customers = _mirrored_customers()
+		accounts = reads.result("accounts")
 	overview = build_overview(customers, accounts)
 	overview["success"] = True
 	overview["now"] = _now_iso()
+	overview["synced_at"] = frappe.db.get_default(_SYNCED_AT_KEY)
+	overview["reconciled_at"] = frappe.db.get_default(_RECONCILED_AT_KEY)
 	return overview
 
 
+def _syncing_overview():
+	"""Enqueue the first full reconcile and answer with an empty overview.
+
+	The reconcile pages through every Bridge customer and commits as it goes,
+	which has no place inside a GET; the page polls until it lands. Repeat
+	loads while it runs share the one deduplicated job, and swr_cached never
+	stores a `syncing` answer.
+	"""
+	if not frappe.conf.get("bridge_api_key"):
+		raise ValueError("bridge_api_key is not configured in site_config.json")
+	frappe.enqueue(
+		"admin_panel.api.bridge_kyc.reconcile_customer_mirror",
+		queue="long",
+		timeout=1800,
+		job_id="admin_panel:bridge_kyc:first_reconcile",
+		deduplicate=True,
+	)
+	overview = build_overview([], [])
+	overview["success"] = True
+	overview["syncing"] = True
+	overview["now"] = _now_iso()
+	overview["synced_at"] = None
+	overview["reconciled_at"] = None
+	return overview
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def sync_kyc_mirror(full=0):
+	"""Operator-triggered mirror sync (the page's "Sync from Bridge" button)."""
+	result = _run_mirror_sync(full=bool(cint(full)))
+	result["success"] = True
+	result["synced_at"] = frappe.db.get_default(_SYNCED_AT_KEY)
+	return result
+
+
 @frappe.whitelist()
 @require_admin()
 @handle_api_errors
@@ -46,4 +200,11 @@ def get_kyc_customer(customer_id):
 	if not CUSTOMER_ID_RE.fullmatch(customer_id):
 		frappe.throw("customer_id must be a Bridge customer UUID")
 	customer = BridgeClient().get_customer(customer_id)
+	# Write-through: the live read is the freshest copy there is.
+	if customer.get("id") == customer_id:
+		try:
+			_write_mirror(customer)
+			frappe.db.commit()
+		except Exception as exc:
+			frappe.logger().warning(f"bridge kyc: mirror write-through failed for {customer_id}: {exc}")
 	return {"success": True, "now": _now_iso(), "customer": build_detail(customer)}
@@ -205,6 +205,34 @@ def build_overview(customers, accounts):
 	}
 
 
+def plan_mirror_page(batch, mirrored, stop_at_unchanged=True):
+	"""Split one page of Bridge customers against the local mirror.
+
+	`mirrored` maps customer id -> the Bridge `updated_at` last stored. Returns
+	(changed, reached_unchanged): the customers to (re)write, and whether the
+	page hit an already-mirrored customer whose updated_at is unchanged. A
+	customer without an updated_at can never be proven unchanged.
+
+	Bridge lists newest-first by creation, so with `stop_at_unchanged` (the
+	incremental sync) the scan stops at the first unchanged customer —
+	everything past it was seen by an earlier sync, and late edits to older
+	customers are left to the periodic full reconcile, which passes False to
+	sweep the whole page.
+	"""
+	changed = []
+	reached_unchanged = False
+	for customer in batch:
+		customer_id = customer.get("id")
+		updated_at = customer.get("updated_at")
+		if customer_id in mirrored and updated_at and mirrored[customer_id] == updated_at:
+			reached_unchanged = True
+			if stop_at_unchanged:
+				break
+			continue
+		changed.append(customer)
+	return changed, reached_unchanged
+
+
 def build_detail(customer):
 	"""Full per-customer drill-down for the detail drawer."""
 	row = build_row(customer)
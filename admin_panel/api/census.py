@@ -11,25 +11,78 @@ the latest snapshot and can trigger a fresh run.
 `build_census` is a pure function (no IO) — all join / bucket / totals logic
 lives there and is unit-tested against fixtures. The IO-bound `run_census_job`
 just gathers inputs (IBEX + mongo), calls it, and persists the result.
+
+Site config `census_shards` (default 1) splits the IBEX sweep across that
+many `long`-queue jobs (run_census_shard), each striding its share of the
+page space into the snapshot's spool; reduce_census then merges the spooled
+pages exactly as a single-job run would.
+
+A "Totals" run (start_census(mode="Totals"), or run_scheduled_totals_census
+every `census_totals_minutes`) refreshes just the float: it streams the
+IBEX pages through a totals-only CensusBuilder, looks up account role /
+status / username only, and stores the scalar summary, totals and bucket
+counts. Totals runs are kept apart from full runs everywhere rows matter
+(latest snapshot, diff, trend, retention).
 """
 
+import hashlib
+import heapq
 import json
+import resource
 import time
+from collections import deque
 
 import frappe
 
 from .auth import require_admin
-from .census_core import build_census
+from .census_core import (
+	ARCHIVED_STATUS,
+	DIFF_TOP_N,
+	GROUP_MEASURES,
+	CensusBuilder,
+	PayloadLRU,
+	RunMetrics,
+	build_census,
+	build_group_cube,
+	decode_payload_sized,
+	diff_census,
+	encode_payload,
+	flag_slow_runs,
+	group_cube,
+	join_keys,
+	merge_spooled_pages,
+	resume_point,
+	retention_plan,
+	shard_start_page,
+)
+from .census_history import prune_census_history, record_census_history
+from .census_spool import CensusSpool
 from .common import handle_api_errors
+from .fanout import Fanout
 from .ibex_client import IbexClient
-from .mongo_reader import load_accounts, load_migrations, load_wallets
+from .mongo_reader import (
+	count_btc_wallets,
+	load_account_statuses_by_ids,
+	load_accounts_by_ids,
+	load_migrations,
+	load_wallets_by_ids,
+)
 
 __all__ = [
 	"build_census",
+	"get_census_accounts",
+	"get_census_diff",
+	"get_census_groups",
 	"get_census_status",
+	"get_census_trend",
 	"get_latest_census",
+	"reduce_census",
+	"resume_stalled_census",
 	"run_census_job",
 	"run_census_now",
+	"run_census_shard",
+	"run_scheduled_totals_census",
+	"run_totals_census_job",
 	"start_census",
 ]
 
@@ -37,10 +90,88 @@ __all__ = [
 # timeout) — mark it Failed instead of blocking new scans forever.
 STALE_RUN_SECONDS = 2700
 
-# How many snapshots to retain; older ones are purged after a successful run
-# (rows_json holds the full per-account table, so rows are large).
+# A Running snapshot whose checkpoint spool hasn't heartbeated for this long
+# lost its worker; it is re-enqueued to resume from its last committed page
+# (up to MAX_RESUMES times) instead of waiting out STALE_RUN_SECONDS.
+HEARTBEAT_STALE_SECONDS = 300
+MAX_RESUMES = 3
+
+# Progressive results: while a run sweeps, its running totals / buckets / top
+# balances are published at most this often on PARTIAL_EVENT to the
+# snapshot's doc room (subscribers need read access to the snapshot), and
+# kept in the cache so a page opened mid-run can show the latest one.
+PARTIAL_EVENT = "wallet_census_partial"
+PROGRESS_EVENT = "wallet_census_progress"
+PARTIAL_INTERVAL_SECONDS = 2
+PARTIAL_TTL_SECONDS = 3600
+
+# Mongo reads run side by side with the IBEX sweep (see _JoinFeed) on this
+# many threads. A read still running after MONGO_LOAD_TIMEOUT_SECONDS fails
+# the run.
+JOIN_LOAD_WORKERS = 4
+MONGO_LOAD_TIMEOUT_SECONDS = 1200
+
+# Progress goes out as a realtime event on every page; the snapshot row (one
+# write transaction) is only updated every this many pages.
+PROGRESS_PERSIST_PAGES = 25
+
+# Performance fields a finished run records (see _metric_fields), as served
+# by get_census_trend.
+TREND_FIELDS = (
+	"ibex_seconds",
+	"mongo_seconds",
+	"build_seconds",
+	"save_seconds",
+	"ibex_requests",
+	"ibex_retries",
+	"ibex_rate_limited",
+	"peak_rss_mb",
+	"payload_bytes",
+)
+
+# Completed snapshots are immutable: _cached_snapshot keeps parsed payloads
+# in a per-worker LRU in front of a redis copy of the stored fields, both
+# keyed by snapshot name. The LRU is bounded by the payloads' decoded JSON
+# size (the parsed objects take a few times that); a "rows" payload larger
+# than the whole budget is decoded per request instead of kept.
+SNAPSHOT_CACHE_SECONDS = 24 * 3600
+SNAPSHOT_LRU_BYTES = 64 * 1024 * 1024
+
+# Cached forms of a snapshot: the summary plus these payload fields.
+SNAPSHOT_VARIANTS = {
+	"summary": (),
+	"rows": ("rows",),
+	"accounts": ("account_rollup",),
+	"groups": ("group_cube",),
+}
+
+# get_census_accounts: largest account exposures returned by default / at most.
+DEFAULT_ACCOUNT_LIMIT = 100
+MAX_ACCOUNT_LIMIT = 1000
+
+# Upper bound on get_census_diff's per-list top_n.
+MAX_DIFF_TOP_N = 200
+
+# How many snapshots to retain in full; older ones are archived or deleted
+# after a successful run (rows_json holds the full per-account table, so rows
+# are large). See _purge_old_snapshots.
 KEEP_SNAPSHOTS = 20
 
+# Snapshot modes: a full census, or a totals-only float refresh (see the
+# module docstring). Totals runs get their own, longer retention: each is a
+# single small row.
+FULL_MODE = "Full"
+TOTALS_MODE = "Totals"
+KEEP_TOTALS_SNAPSHOTS = 288
+
+# run_scheduled_totals_census ticks every 5 minutes; a run counts as due
+# this much early so tick jitter doesn't skip every other interval.
+TOTALS_SCHEDULE_SLACK_SECONDS = 60
+
+# get_all filters matching full runs only (rows predating `mode` are full).
+_FULL_RUNS = {"mode": ("!=", TOTALS_MODE)}
+
+_snapshot_lru = PayloadLRU(max_bytes=SNAPSHOT_LRU_BYTES, ttl_seconds=SNAPSHOT_CACHE_SECONDS)
 
 # ── Whitelisted endpoints ─────────────────────────────────────────────────
 
@@ -48,28 +179,28 @@ KEEP_SNAPSHOTS = 20
 @frappe.whitelist()
 @require_admin()
 @handle_api_errors
-def start_census():
+def start_census(mode=FULL_MODE):
 	"""Create a snapshot row and enqueue the long-running scan. Returns its name.
 
 	If a run is already in flight, return it instead of starting a duplicate
 	(the scan takes minutes and hits the IBEX API for every account).
+	`mode="Totals"` starts a totals-only run instead (see the module docstring).
 	"""
-	running = _resolve_running_snapshot()
+	mode = mode or FULL_MODE
+	if mode not in (FULL_MODE, TOTALS_MODE):
+		return {"success": False, "error": f"Unknown census mode: {mode}"}
+	running = _resolve_running_snapshot(totals=mode == TOTALS_MODE)
 	if running:
 		return {"snapshot": running, "status": "Running", "already_running": True}
 
-	snapshot = frappe.new_doc("Wallet Census Snapshot")
-	snapshot.status = "Running"
-	snapshot.started_at = frappe.utils.now_datetime()
-	snapshot.insert(ignore_permissions=True)
-	frappe.db.commit()
+	if mode == TOTALS_MODE:
+		return {"snapshot": _start_totals_census(), "status": "Running"}
+	snapshot = _new_snapshot(FULL_MODE)
 
-	frappe.enqueue(
-		"admin_panel.api.census.run_census_job",
-		queue="long",
-		timeout=1800,
-		snapshot_name=snapshot.name,
-	)
+	shard_count = frappe.utils.cint(frappe.conf.get("census_shards")) or 1
+	if shard_count > 1:
+		CensusSpool.for_snapshot(snapshot.name).update_meta(shard_count=shard_count)
+	_enqueue_census(snapshot.name)
 	return {"snapshot": snapshot.name, "status": "Running"}
 
 
@@ -88,11 +219,7 @@ def run_census_now():
 	if running:
 		return get_census_status(running)
 
-	snapshot = frappe.new_doc("Wallet Census Snapshot")
-	snapshot.status = "Running"
-	snapshot.started_at = frappe.utils.now_datetime()
-	snapshot.insert(ignore_permissions=True)
-	frappe.db.commit()
+	snapshot = _new_snapshot(FULL_MODE)
 	run_census_job(snapshot.name)
 	return get_census_status(snapshot.name)
 
@@ -114,31 +241,394 @@ def get_census_status(snapshot=None):
 		"scanned_pages": doc.scanned_pages,
 		"scanned_accounts": doc.scanned_accounts,
 		"error": doc.error,
+		"partial": frappe.cache().get_value(_partial_key(doc.name)) if doc.status == "Running" else None,
 	}
 
 
 @frappe.whitelist()
 @require_admin()
 @handle_api_errors
-def get_latest_census():
-	"""Return the most recent completed snapshot's full result payload."""
+def get_latest_census(include_rows=1):
+	"""Return the most recent completed snapshot's result payload.
+
+	Pass include_rows=0 for totals and bucket counts only: the per-account
+	rows (by far the largest field) are then neither read nor decompressed.
+
+	A completed snapshot never changes, so the payload comes from
+	_cached_snapshot and carries a strong ETag; a request with a matching
+	If-None-Match gets a bodiless 304. The census page sends its last ETag
+	itself (frappe.call's cache-busted GETs never revalidate).
+	"""
 	name = _latest_snapshot_name(status="Complete")
 	if not name:
 		return {"snapshot": None}
-	doc = frappe.get_doc("Wallet Census Snapshot", name)
+	entry = _cached_snapshot(name, "rows" if frappe.utils.cint(include_rows) else "summary")
+	frappe.local.response_headers.set("ETag", entry["etag"])
+	frappe.local.response_headers.set("Cache-Control", "private, no-cache")
+	if _etag_matches(frappe.get_request_header("If-None-Match"), entry["etag"]):
+		frappe.response["http_status_code"] = 304
+		return None
+	return entry["payload"]
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def get_census_diff(before=None, after=None, top_n=DIFF_TOP_N):
+	"""diff_census between two completed snapshots (default: the latest two).
+
+	Computed server-side from the cached payloads, so only the counts and
+	top-N lists reach the browser.
+	"""
+	if not before or not after:
+		latest = frappe.get_all(
+			"Wallet Census Snapshot",
+			filters={"status": "Complete", **_FULL_RUNS},
+			order_by="creation desc",
+			limit=2,
+			pluck="name",
+		)
+		after = after or (latest[0] if latest else None)
+		before = before or (latest[1] if len(latest) > 1 else None)
+	if not before or not after:
+		return {"success": False, "error": "Two completed snapshots are needed for a diff"}
+	for name in (before, after):
+		if frappe.db.get_value("Wallet Census Snapshot", name, "status") != "Complete":
+			return {"success": False, "error": f"Snapshot {name} is not a completed census"}
+	top_n = max(1, min(frappe.utils.cint(top_n) or DIFF_TOP_N, MAX_DIFF_TOP_N))
+	rows = {name: _cached_snapshot(name, "rows")["payload"]["rows"] for name in (before, after)}
 	return {
-		"snapshot": doc.name,
-		"status": doc.status,
-		"started_at": str(doc.started_at) if doc.started_at else None,
-		"completed_at": str(doc.completed_at) if doc.completed_at else None,
-		"totals": json.loads(doc.totals_json or "{}"),
-		"bucket_counts": json.loads(doc.bucket_counts_json or "{}"),
-		"rows": json.loads(doc.rows_json or "[]"),
+		"success": True,
+		"before": before,
+		"after": after,
+		**diff_census(rows[before], rows[after], top_n),
 	}
 
 
-def _latest_snapshot_name(status=None):
-	filters = {"status": status} if status else None
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def get_census_accounts(account_id=None, snapshot=None, limit=DEFAULT_ACCOUNT_LIMIT):
+	"""Account-level rollup of a completed snapshot (default: the latest).
+
+	With `account_id`, that account's entry (a dict lookup on the cached
+	rollup); otherwise the `limit` largest exposures by total balance.
+	Snapshots written before the rollup existed have none.
+	"""
+	name = snapshot or _latest_snapshot_name(status="Complete")
+	if not name:
+		return {"success": True, "snapshot": None, "accounts": []}
+	if frappe.db.get_value("Wallet Census Snapshot", name, "status") != "Complete":
+		return {"success": False, "error": f"Snapshot {name} is not a completed census"}
+	entry = _cached_snapshot(name, "accounts")
+	rollup = entry["payload"]["account_rollup"]
+	if account_id:
+		match = entry["by_account"].get(account_id.strip())
+		accounts = [match] if match else []
+	else:
+		limit = max(1, min(frappe.utils.cint(limit) or DEFAULT_ACCOUNT_LIMIT, MAX_ACCOUNT_LIMIT))
+		accounts = heapq.nlargest(limit, rollup, key=lambda a: a["balance"])
+	return {"success": True, "snapshot": name, "count": len(rollup), "accounts": accounts}
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def get_census_groups(dimensions=None, measures=None, snapshot=None, funded_only=0):
+	"""Group-by over a completed snapshot's rows (default: the latest).
+
+	`dimensions` / `measures` are lists or comma-separated names from
+	census_core.GROUP_DIMENSIONS / GROUP_MEASURES (measures default to all).
+	Rolls up the group cube saved with the snapshot (census_core.
+	build_group_cube), so any combination answers without touching the rows;
+	a snapshot saved before the cube existed is cubed from its rows.
+	"""
+	dimensions, measures = _name_list(dimensions), _name_list(measures) or list(GROUP_MEASURES)
+	if not dimensions:
+		return {"success": False, "error": "At least one dimension is required"}
+	name = snapshot or _latest_snapshot_name(status="Complete")
+	if not name:
+		return {"success": True, "snapshot": None, "groups": []}
+	if frappe.db.get_value("Wallet Census Snapshot", name, "status") != "Complete":
+		return {"success": False, "error": f"Snapshot {name} is not a completed census"}
+	cube = _cached_snapshot(name, "groups")["payload"]["group_cube"]
+	if not cube:
+		cube = build_group_cube(_cached_snapshot(name, "rows")["payload"]["rows"])
+	try:
+		groups = group_cube(cube, dimensions, measures, funded_only=frappe.utils.cint(funded_only))
+	except ValueError as e:
+		return {"success": False, "error": str(e)}
+	return {
+		"success": True,
+		"snapshot": name,
+		"dimensions": dimensions,
+		"measures": measures,
+		"groups": groups,
+	}
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def get_census_trend(limit=20):
+	"""Per-phase timings / upstream counts / size of recent completed runs, newest first.
+
+	Each run carries `slow` when its duration is well above the median of
+	the others (census_core.flag_slow_runs).
+	"""
+	runs = frappe.get_all(
+		"Wallet Census Snapshot",
+		filters={"status": "Complete", **_FULL_RUNS},
+		fields=[
+			"name",
+			"completed_at",
+			"total_accounts",
+			"duration_seconds",
+			*TREND_FIELDS,
+		],
+		order_by="creation desc",
+		limit=min(frappe.utils.cint(limit) or 20, KEEP_SNAPSHOTS),
+	)
+	for run in runs:
+		run["completed_at"] = str(run["completed_at"]) if run["completed_at"] else None
+	return {"runs": flag_slow_runs(runs)}
+
+
+def resume_stalled_census():
+	"""Scheduled: re-enqueue a Running census whose worker died mid-run.
+
+	The resumed job picks up from the snapshot's checkpoint spool (see
+	run_census_job). Returns the snapshot name when one was resumed.
+	"""
+	running = _latest_snapshot_name(status="Running")
+	if running and _resume_if_stalled(running):
+		return running
+	return None
+
+
+def run_scheduled_totals_census():
+	"""Scheduled: start a totals-only run when one is due. Returns its name.
+
+	Off unless site config `census_totals_minutes` is set; then a run starts
+	once that many minutes have passed since the last totals run started
+	(the tick is every 5 minutes, so shorter intervals mean every tick). It
+	is skipped while any census is running: a full run refreshes the float
+	too.
+	"""
+	interval = frappe.utils.cint(frappe.conf.get("census_totals_minutes"))
+	if interval <= 0:
+		return None
+	if _resolve_running_snapshot() or _resolve_running_snapshot(totals=True):
+		return None
+	last = _latest_snapshot_name(totals=True)
+	if last:
+		started_at = frappe.db.get_value("Wallet Census Snapshot", last, "started_at")
+		age = frappe.utils.time_diff_in_seconds(frappe.utils.now_datetime(), started_at)
+		if age < interval * 60 - TOTALS_SCHEDULE_SLACK_SECONDS:
+			return None
+	return _start_totals_census()
+
+
+def _new_snapshot(mode):
+	snapshot = frappe.new_doc("Wallet Census Snapshot")
+	snapshot.status = "Running"
+	snapshot.mode = mode
+	snapshot.started_at = frappe.utils.now_datetime()
+	snapshot.insert(ignore_permissions=True)
+	frappe.db.commit()
+	return snapshot
+
+
+def _start_totals_census():
+	name = _new_snapshot(TOTALS_MODE).name
+	frappe.enqueue(
+		"admin_panel.api.census.run_totals_census_job",
+		queue="long",
+		timeout=1800,
+		snapshot_name=name,
+	)
+	return name
+
+
+def _enqueue_census(snapshot_name):
+	"""Enqueue (or re-enqueue, on resume) the job(s) for a snapshot.
+
+	A sharded run re-enqueues only its unfinished shards, or straight to the
+	reduce when every shard is done — claimed like a finishing shard's, so
+	a reduce that is still running is never started twice.
+	"""
+	spool = CensusSpool.for_snapshot(snapshot_name)
+	shard_count = spool.meta().get("shard_count", 1)
+	if shard_count <= 1:
+		frappe.enqueue(
+			"admin_panel.api.census.run_census_job",
+			queue="long",
+			timeout=1800,
+			snapshot_name=snapshot_name,
+		)
+		return
+	pending = [shard for shard in range(shard_count) if shard not in spool.shards_done()]
+	for shard in pending:
+		frappe.enqueue(
+			"admin_panel.api.census.run_census_shard",
+			queue="long",
+			timeout=1800,
+			snapshot_name=snapshot_name,
+			shard=shard,
+			shard_count=shard_count,
+		)
+	if not pending:
+		if not _claim_reduce(snapshot_name):
+			frappe.logger().warning(f"Wallet census {snapshot_name}: reduce already claimed, not re-enqueued")
+			return
+		frappe.enqueue(
+			"admin_panel.api.census.reduce_census", queue="long", timeout=1800, snapshot_name=snapshot_name
+		)
+
+
+def _resume_if_stalled(snapshot_name):
+	"""Re-enqueue `snapshot_name` if its spool stopped heartbeating. True if resumed.
+
+	A run with no spool never started (still queued) and is left alone, as is
+	one that has used up MAX_RESUMES — STALE_RUN_SECONDS fails it.
+	"""
+	spool = CensusSpool.for_snapshot(snapshot_name)
+	idle = spool.seconds_since_heartbeat()
+	if idle is None or idle < HEARTBEAT_STALE_SECONDS:
+		return False
+	if spool.meta().get("resumes", 0) >= MAX_RESUMES:
+		return False
+	attempt = spool.record_resume()
+	frappe.logger().warning(
+		f"Wallet census {snapshot_name}: no heartbeat for {int(idle)}s — resuming (attempt {attempt})"
+	)
+	_enqueue_census(snapshot_name)
+	return True
+
+
+def _report_progress(snapshot_name, pages, seen):
+	"""Push sweep progress to the page; persist it only every PROGRESS_PERSIST_PAGES.
+
+	The DB copy is the fallback for a page that missed the events (opened
+	mid-run, socket down) — it polls get_census_status.
+	"""
+	frappe.publish_realtime(
+		PROGRESS_EVENT,
+		{"snapshot": snapshot_name, "status": "Running", "scanned_pages": pages, "scanned_accounts": seen},
+		doctype="Wallet Census Snapshot",
+		docname=snapshot_name,
+	)
+	if pages % PROGRESS_PERSIST_PAGES == 0:
+		frappe.db.set_value(
+			"Wallet Census Snapshot",
+			snapshot_name,
+			{"scanned_pages": pages, "scanned_accounts": seen},
+			update_modified=False,
+		)
+		frappe.db.commit()
+
+
+def _peak_rss_mb():
+	"""This process's peak resident set size (ru_maxrss is KiB on Linux)."""
+	return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _metrics_json(metrics, payload):
+	return json.dumps(
+		{
+			**metrics.as_dict(),
+			"peak_rss_mb": _peak_rss_mb(),
+			"payload_bytes": {field: len(value) for field, value in payload.items()},
+		}
+	)
+
+
+def _metric_fields(metrics, payload):
+	"""The snapshot's Performance-section fields for a finished run."""
+	phases, counters = metrics.phases, metrics.counters
+	return {
+		"ibex_seconds": round(phases.get("ibex", 0.0), 3),
+		"mongo_seconds": round(phases.get("mongo", 0.0), 3),
+		"build_seconds": round(phases.get("build", 0.0), 3),
+		"ibex_requests": counters.get("ibex_requests", 0),
+		"ibex_retries": counters.get("ibex_retries", 0),
+		"ibex_rate_limited": counters.get("ibex_rate_limited", 0),
+		"peak_rss_mb": _peak_rss_mb(),
+		"payload_bytes": sum(len(value) for value in payload.values()),
+	}
+
+
+def _partial_key(snapshot_name):
+	return f"admin_panel:census_partial:{snapshot_name}"
+
+
+def _publish_partial(snapshot_name, builder, pages):
+	partial = {"snapshot": snapshot_name, "scanned_pages": pages, **builder.partial()}
+	frappe.cache().set_value(_partial_key(snapshot_name), partial, expires_in_sec=PARTIAL_TTL_SECONDS)
+	frappe.publish_realtime(PARTIAL_EVENT, partial, doctype="Wallet Census Snapshot", docname=snapshot_name)
+
+
+def _name_list(value):
+	"""A list of names from a list or a comma-separated string."""
+	if isinstance(value, str):
+		value = value.split(",")
+	return [str(v).strip() for v in value or () if str(v).strip()]
+
+
+def _cached_snapshot(name, variant):
+	"""{etag, payload} for a completed snapshot: this worker's LRU, else
+	redis (the stored, still-compressed fields), else MariaDB.
+
+	`variant` (a SNAPSHOT_VARIANTS key) picks which large payloads come
+	along with the summary. The "accounts" variant also carries `by_account`,
+	its rollup indexed by account id.
+	"""
+	entry = _snapshot_lru.get((variant, name))
+	if entry is not None:
+		return entry
+	extra = SNAPSHOT_VARIANTS[variant]
+	cache = frappe.cache()
+	key = f"admin_panel:census_snapshot:{variant}:{name}"
+	stored = cache.get_value(key)
+	if stored is None:
+		fields = ["name", "status", "started_at", "completed_at", "totals_json", "bucket_counts_json"]
+		fields += [f"{field}_json" for field in extra]
+		stored = frappe.db.get_value("Wallet Census Snapshot", name, fields, as_dict=True)
+		for field in ("started_at", "completed_at"):
+			stored[field] = str(stored[field]) if stored[field] else None
+		stored["etag"] = '"{}"'.format(
+			hashlib.sha1(json.dumps(stored, sort_keys=True, default=str).encode()).hexdigest()
+		)
+		cache.set_value(key, dict(stored), expires_in_sec=SNAPSHOT_CACHE_SECONDS)
+	payload = {
+		"snapshot": stored["name"],
+		"status": stored["status"],
+		"started_at": stored["started_at"],
+		"completed_at": stored["completed_at"],
+	}
+	size = 0
+	for field, default in (("totals", {}), ("bucket_counts", {}), *((field, []) for field in extra)):
+		payload[field], field_size = decode_payload_sized(stored[f"{field}_json"], default)
+		size += field_size
+	entry = {"etag": stored["etag"], "payload": payload}
+	if variant == "accounts":
+		entry["by_account"] = {a["account_id"]: a for a in payload["account_rollup"]}
+	_snapshot_lru.put((variant, name), entry, size)
+	return entry
+
+
+def _etag_matches(if_none_match, etag):
+	if not if_none_match:
+		return False
+	tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+	return "*" in tags or etag in tags
+
+
+def _latest_snapshot_name(status=None, totals=False):
+	"""The newest full snapshot (a totals-only one with `totals`), optionally of one status."""
+	filters = {"mode": TOTALS_MODE} if totals else dict(_FULL_RUNS)
+	if status:
+		filters["status"] = status
 	names = frappe.get_all(
 		"Wallet Census Snapshot",
 		filters=filters,
@@ -149,18 +639,23 @@ def _latest_snapshot_name(status=None):
 	return names[0] if names else None
 
 
-def _resolve_running_snapshot():
-	"""Return the name of a genuinely live Running snapshot, or None.
+def _resolve_running_snapshot(totals=False):
+	"""Return the name of a genuinely live Running snapshot (of that mode), or None.
 
 	A Running row whose worker died (deploy, OOM, kill) never flips to Failed
-	and would block new runs forever. If the latest Running snapshot is older
-	than STALE_RUN_SECONDS (or has no started_at), mark it Failed so the
-	caller can start a fresh scan.
+	and would block new runs forever. A run that is still heartbeating, or
+	that can be resumed from its checkpoint, stays Running. Otherwise, if the
+	latest Running snapshot is older than STALE_RUN_SECONDS (or has no
+	started_at), mark it Failed so the caller can start a fresh scan.
 	"""
-	running = _latest_snapshot_name(status="Running")
+	running = _latest_snapshot_name(status="Running", totals=totals)
 	if not running:
 		return None
 
+	idle = CensusSpool.for_snapshot(running).seconds_since_heartbeat()
+	if (idle is not None and idle < HEARTBEAT_STALE_SECONDS) or _resume_if_stalled(running):
+		return running
+
 	started_at = frappe.db.get_value("Wallet Census Snapshot", running, "started_at")
 	if started_at:
 		age = frappe.utils.time_diff_in_seconds(frappe.utils.now_datetime(), started_at)
@@ -178,88 +673,481 @@ def _resolve_running_snapshot():
 		update_modified=False,
 	)
 	frappe.db.commit()
+	CensusSpool.for_snapshot(running).remove()
 	return None
 
 
 def _purge_old_snapshots(keep=KEEP_SNAPSHOTS):
-	"""Hard-delete snapshots beyond the newest `keep` to bound table growth."""
-	names = frappe.get_all(
+	"""Apply snapshot retention (census_core.retention_plan) in set-based statements.
+
+	Totals-only runs are kept (KEEP_TOTALS_SNAPSHOTS) apart from full ones.
+	Site config `census_archive_snapshots` (default 0) keeps that many older
+	Complete full snapshots as Archived: the scalar summary, totals, bucket
+	counts and metrics stay, rows and rollup are cleared. Everything else
+	past `keep` is deleted, along with its comments, cache entries and spool.
+	Returns {"archived": n, "deleted": n}.
+	"""
+	snapshots = frappe.get_all(
 		"Wallet Census Snapshot",
+		fields=["name", "status", "mode"],
 		order_by="creation desc",
-		pluck="name",
+		as_list=True,
 	)
-	for name in names[keep:]:
-		frappe.delete_doc(
-			"Wallet Census Snapshot", name, ignore_permissions=True, force=True, delete_permanently=True
+	full = [(name, status) for name, status, mode in snapshots if mode != TOTALS_MODE]
+	totals = [(name, status) for name, status, mode in snapshots if mode == TOTALS_MODE]
+	archive_keep = frappe.utils.cint(frappe.conf.get("census_archive_snapshots"))
+	archive, delete = retention_plan(full, keep, archive_keep)
+	delete += retention_plan(totals, KEEP_TOTALS_SNAPSHOTS)[1]
+	snapshot = frappe.qb.DocType("Wallet Census Snapshot")
+	if archive:
+		(
+			frappe.qb.update(snapshot)
+			.set(snapshot.status, ARCHIVED_STATUS)
+			.set(snapshot.rows_json, None)
+			.set(snapshot.account_rollup_json, None)
+			.set(snapshot.group_cube_json, None)
+			.where(snapshot.name.isin(archive))
+		).run()
+	if delete:
+		frappe.db.delete("Wallet Census Snapshot", {"name": ("in", delete)})
+		frappe.db.delete(
+			"Comment", {"reference_doctype": "Wallet Census Snapshot", "reference_name": ("in", delete)}
 		)
+	_forget_snapshots(archive + delete)
+	for name in delete:
+		CensusSpool.for_snapshot(name).remove()
+	return {"archived": len(archive), "deleted": len(delete)}
+
+
+def _forget_snapshots(names):
+	"""Drop cached payloads and run state of snapshots that changed or are gone."""
+	keys = []
+	for name in names:
+		keys += [f"admin_panel:census_snapshot:{variant}:{name}" for variant in SNAPSHOT_VARIANTS]
+		keys += [_partial_key(name), _shard_key(name)]
+		for variant in SNAPSHOT_VARIANTS:
+			_snapshot_lru.discard((variant, name))
+	if keys:
+		frappe.cache().delete_value(keys)
 
 
 # ── Background job (IO) ───────────────────────────────────────────────────
 
 
 def run_census_job(snapshot_name):
-	"""Gather IBEX + mongo inputs, build the census, persist it to the snapshot."""
+	"""Gather IBEX + mongo inputs, build the census, persist it to the snapshot.
+
+	Mongo is read alongside the sweep rather than after it (see _JoinFeed):
+	the run-wide inputs start loading as soon as the job does, and each
+	swept page's wallet / account rows are fetched by id while the next page
+	is swept, so the job takes roughly max(IBEX, mongo) instead of the sum.
+
+	Every IBEX page and the run-wide mongo inputs are checkpointed to the
+	snapshot's CensusSpool as they arrive. When this runs again for the same
+	snapshot (resume_stalled_census after a worker death), it continues after
+	the last committed page.
+
+	Once the builder exists, its partial result is published
+	(PARTIAL_EVENT) every PARTIAL_INTERVAL_SECONDS. The spool heartbeats for
+	the whole job (CensusSpool.keep_alive), so the join, build and save after
+	the sweep never look like a dead worker.
+	"""
 	doc = frappe.get_doc("Wallet Census Snapshot", snapshot_name)
+	if doc.status != "Running":
+		return  # a late duplicate of a run that already ended
 	started = time.time()
-	try:
-		client = IbexClient()
+	spool = CensusSpool.for_snapshot(snapshot_name)
+	feed = None
+	with spool.keep_alive():
+		try:
+			client = IbexClient()
+			metrics = RunMetrics()
+			spool.heartbeat()
+			feed = _JoinFeed(snapshot_name, spool, metrics)
+
+			last_page = resume_point(spool.committed_pages())
+			scanned_pages, scanned_accounts = last_page, 0
+			if last_page:
+				frappe.logger().info(f"Wallet census {snapshot_name}: resuming after page {last_page}")
+				metrics.count("resumed_pages", last_page)
+				batches = list(spool.read_pages(range(1, last_page + 1)))
+				scanned_accounts = sum(len(batch) for batch in batches)
+				feed.push(merge_spooled_pages(batches))
+			published_at = 0.0
+			pages = client.iter_account_pages(start_page=last_page + 1)
+			while True:
+				with metrics.phase("ibex"):
+					page, batch = next(pages, (None, None))
+				if page is None:
+					break
+				with metrics.phase("spool"):
+					spool.write_page(page, batch)
+				feed.push(batch)
+				scanned_pages, scanned_accounts = page, scanned_accounts + len(batch)
+				_report_progress(snapshot_name, scanned_pages, scanned_accounts)
+				if feed.builder is not None and time.monotonic() - published_at >= PARTIAL_INTERVAL_SECONDS:
+					_publish_partial(snapshot_name, feed.builder, page)
+					published_at = time.monotonic()
+
+			builder = feed.finish()
+			for name, value in client.stats.items():
+				metrics.count(f"ibex_{name}", value)
+			_finish(doc, started, spool, builder, metrics, scanned_pages, scanned_accounts)
+		except Exception as exc:
+			_fail(doc, spool, exc)
+			raise
+		finally:
+			if feed is not None:
+				feed.close()
 
-		def _progress(pages, seen):
-			# Persist progress so the page's status poll can show a live count.
-			frappe.db.set_value(
-				"Wallet Census Snapshot",
+
+def run_census_shard(snapshot_name, shard, shard_count):
+	"""Sweep one shard's stride of IBEX pages into the snapshot's spool.
+
+	Sharded mode (site config `census_shards` > 1): start_census enqueues
+	one of these per shard onto the `long` queue, so the sweep spreads over
+	that many workers. Shard 0 also loads the run-wide mongo inputs,
+	overlapping them with the other shards' sweeps. The last shard to finish
+	runs reduce_census. Sharded runs publish progress but no partial results
+	(no single worker sees every page). Like run_census_job, the spool
+	heartbeats for the whole shard, mongo load included.
+	"""
+	doc = frappe.get_doc("Wallet Census Snapshot", snapshot_name)
+	if doc.status != "Running":
+		return  # a late duplicate of a run that already ended
+	spool = CensusSpool.for_snapshot(snapshot_name)
+	with spool.keep_alive():
+		try:
+			client = IbexClient()
+			metrics = RunMetrics()
+			spool.heartbeat()
+			if shard == 0:
+				feed = _JoinFeed(snapshot_name, spool, metrics)
+				try:
+					feed.load_run_inputs()
+				finally:
+					feed.close()
+			committed = spool.committed_pages()
+			start = shard_start_page(shard, shard_count, committed)
+			# This stride's spooled pages, counted rather than re-listed per page.
+			spooled = sum(1 for page in committed if (page - 1) % shard_count == shard)
+			fetched = accounts_seen = 0
+			pages = client.iter_account_pages(start_page=start, step=shard_count)
+			while True:
+				with metrics.phase("ibex"):
+					page, batch = next(pages, (None, None))
+				if page is None:
+					break
+				spool.write_page(page, batch)
+				fetched, spooled, accounts_seen = fetched + 1, spooled + 1, accounts_seen + len(batch)
+				_record_shard(snapshot_name, shard, {"accounts": accounts_seen, "spooled": spooled})
+				shards = _shard_stats(snapshot_name)
+				_report_progress(
+					snapshot_name,
+					sum(s.get("spooled", 0) for s in shards),
+					sum(s.get("accounts", 0) for s in shards),
+				)
+			_record_shard(
 				snapshot_name,
-				{"scanned_pages": pages, "scanned_accounts": seen},
-				update_modified=False,
+				shard,
+				{
+					"accounts": accounts_seen,
+					"spooled": spooled,
+					"pages": fetched,
+					"ibex_seconds": metrics.phases.get("ibex", 0.0),
+					"mongo_seconds": metrics.phases.get("mongo", 0.0),
+					**{f"ibex_{name}": value for name, value in client.stats.items()},
+				},
+			)
+			spool.mark_shard_done(shard)
+		except Exception as exc:
+			doc.reload()
+			if doc.status == "Running":
+				_fail(doc, spool, exc)
+				raise
+			# A sibling shard already failed the run (and removed the spool).
+			return
+
+	if spool.shards_done() >= set(range(shard_count)) and _claim_reduce(snapshot_name):
+		reduce_census(snapshot_name)
+
+
+def reduce_census(snapshot_name):
+	"""Merge a sharded run's spooled pages into the snapshot (build_census semantics).
+
+	Heartbeats the spool throughout (CensusSpool.keep_alive). A run that is
+	no longer Running, or whose spool holds no pages (another reduce already
+	finished and removed it), is left untouched.
+	"""
+	doc = frappe.get_doc("Wallet Census Snapshot", snapshot_name)
+	started = time.time()
+	spool = CensusSpool.for_snapshot(snapshot_name)
+	pages = spool.committed_pages()
+	if doc.status != "Running" or not pages:
+		frappe.logger().warning(
+			f"Wallet census {snapshot_name}: reduce skipped ({doc.status}, {len(pages)} spooled pages)"
+		)
+		return
+	feed = None
+	try:
+		with spool.keep_alive():
+			metrics = RunMetrics()
+			feed = _JoinFeed(snapshot_name, spool, metrics)
+			if pages != list(range(1, len(pages) + 1)):
+				frappe.logger().warning(f"Wallet census {snapshot_name}: spooled pages are not contiguous")
+			batches = list(spool.read_pages(pages))
+			feed.push(merge_spooled_pages(batches))
+			builder = feed.finish()
+
+			# Shards ran side by side: the sweep took as long as the slowest one.
+			shards = _shard_stats(snapshot_name)
+			metrics.phases["ibex"] = max((s.get("ibex_seconds", 0.0) for s in shards), default=0.0)
+			metrics.phases["mongo"] = metrics.phases.get("mongo", 0.0) + sum(
+				s.get("mongo_seconds", 0.0) for s in shards
 			)
-			frappe.db.commit()
+			for name in ("requests", "retries", "rate_limited"):
+				metrics.count(f"ibex_{name}", sum(s.get(f"ibex_{name}", 0) for s in shards))
+			metrics.count("shards", len(shards))
+			_finish(doc, started, spool, builder, metrics, len(pages), sum(len(batch) for batch in batches))
+	except Exception as exc:
+		_fail(doc, spool, exc)
+		raise
+	finally:
+		if feed is not None:
+			feed.close()
+		frappe.cache().delete_value(_shard_key(snapshot_name))
+
+
+def run_totals_census_job(snapshot_name):
+	"""Sweep IBEX into a totals-only CensusBuilder and store the summary.
+
+	Each page's accounts are looked up for role, status and username only
+	(no wallet, migration or BTC reads); currencies come from IBEX's
+	currencyId. Nothing is spooled: a totals run that dies is simply run
+	again on the next tick.
+	"""
+	doc = frappe.get_doc("Wallet Census Snapshot", snapshot_name)
+	started = time.time()
+	spool = CensusSpool.for_snapshot(snapshot_name)
+	try:
+		client = IbexClient()
+		metrics = RunMetrics()
+		builder = CensusBuilder({}, {}, {}, btc_wallet_count=None, totals_only=True)
+		use_mongo = bool(frappe.conf.get("customer_mongo_uri"))
+		scanned_pages = scanned_accounts = 0
+		pages = client.iter_account_pages()
+		while True:
+			with metrics.phase("ibex"):
+				page, batch = next(pages, (None, None))
+			if page is None:
+				break
+			if use_mongo:
+				with metrics.phase("mongo"):
+					builder.join({}, load_account_statuses_by_ids(join_keys(batch)[1]))
+			with metrics.phase("build"):
+				builder.add(batch)
+			scanned_pages, scanned_accounts = page, scanned_accounts + len(batch)
+			_report_progress(snapshot_name, scanned_pages, scanned_accounts)
+		for name, value in client.stats.items():
+			metrics.count(f"ibex_{name}", value)
+		_finish(doc, started, spool, builder, metrics, scanned_pages, scanned_accounts)
+	except Exception as exc:
+		_fail(doc, spool, exc)
+		raise
+
 
-		ibex_accounts = list(client.iter_all_accounts(progress_cb=_progress))
+class _JoinFeed:
+	"""Feeds swept batches to a CensusBuilder once their mongo rows are in.
 
-		# The mongo join enriches rows with username / status / migration state.
-		# If it isn't configured (e.g. an IBEX-only sandbox smoke test), still
-		# produce the census from IBEX alone — rows just lack those fields.
+	The run-wide inputs (migrations and the BTC wallet count) load once; the
+	wallets and accounts a batch joins on are read by id (`$in`, see
+	mongo_reader.load_wallets_by_ids) for that batch alone, so BTC wallets
+	and accounts IBEX never returned are never transferred. All of it runs
+	on a Fanout while the caller keeps sweeping; batches reach the builder
+	in push order as their rows arrive.
+
+	Without customer_mongo_uri (e.g. an IBEX-only sandbox smoke test) the
+	census is still produced from IBEX alone — rows just lack the username /
+	status / migration join.
+	"""
+
+	def __init__(self, snapshot_name, spool, metrics):
+		self.spool = spool
+		self.metrics = metrics
+		self.builder = None
+		self._inputs = spool.load_inputs()
+		self._pending = deque()  # (fanout branch or None, batch)
+		self._seq = 0
+		self._started = time.perf_counter()
+		self._loads = None
 		if frappe.conf.get("customer_mongo_uri"):
-			wallets = load_wallets()
-			accounts = load_accounts()
-			migrations = load_migrations()
-		else:
+			self._loads = Fanout(timeout=MONGO_LOAD_TIMEOUT_SECONDS, max_workers=JOIN_LOAD_WORKERS)
+			if self._inputs is None:
+				self._loads.submit("migrations", load_migrations)
+				self._loads.submit("btc_wallet_count", count_btc_wallets)
+		elif self._inputs is None:
 			frappe.logger().warning(
 				f"Wallet census {snapshot_name}: customer_mongo_uri not configured — "
 				"running IBEX-only (no username/status/migration join)."
 			)
-			wallets, accounts, migrations = {}, {}, {}
+			self._inputs = {"migrations": {}, "btc_wallet_count": 0}
+
+	def push(self, batch):
+		"""Queue a batch; its join rows start loading right away."""
+		branch = None
+		if self._loads is not None:
+			self._seq += 1
+			branch = f"join-{self._seq}"
+			self._loads.submit(branch, _load_join_rows, batch)
+		self._pending.append((branch, batch))
+		self._drain(wait=False)
+
+	def finish(self):
+		"""Wait for every outstanding load, feed the rest; returns the builder."""
+		with self.metrics.phase("join_wait"):
+			self._drain(wait=True)
+		return self.builder
+
+	def load_run_inputs(self, wait=True):
+		"""The run-wide inputs (checkpointed to the spool), or None if still loading."""
+		if self._inputs is None:
+			if not wait and not self._loads.done("migrations", "btc_wallet_count"):
+				return None
+			self._inputs = {name: self._loads.pop(name) for name in ("migrations", "btc_wallet_count")}
+			self.spool.save_inputs(self._inputs)
+			# Wall time of the overlapped run-wide reads, to page granularity.
+			self.metrics.phases["mongo"] = time.perf_counter() - self._started
+		return self._inputs
+
+	def close(self):
+		if self._loads is not None:
+			self._loads.close()
+
+	def _drain(self, wait):
+		if self.builder is None:
+			inputs = self.load_run_inputs(wait=wait)
+			if inputs is None:
+				return
+			self.builder = CensusBuilder(
+				{}, {}, inputs["migrations"], btc_wallet_count=inputs["btc_wallet_count"]
+			)
+		while self._pending:
+			branch, batch = self._pending[0]
+			if branch is not None:
+				if not wait and not self._loads.done(branch):
+					return
+				self.builder.join(*self._loads.pop(branch))
+			self._pending.popleft()
+			with self.metrics.phase("build"):
+				self.builder.add(batch)
+
+
+def _load_join_rows(batch):
+	"""(wallets, accounts) mongo rows one IBEX batch joins on."""
+	wallet_ids, account_ids = join_keys(batch)
+	return load_wallets_by_ids(wallet_ids), load_accounts_by_ids(account_ids)
 
-		result = build_census(ibex_accounts, wallets, accounts, migrations)
+
+def _finish(doc, started, spool, builder, metrics, scanned_pages, scanned_accounts):
+	"""Persist a finished run's result + metrics, drop its spool, apply retention.
+
+	A totals-only builder stores no rows or rollup and writes no history.
+	A snapshot that is no longer Running (another attempt finished or
+	failed it) is left as it is.
+	"""
+	with metrics.phase("build"):
+		result = builder.result()
 		totals = result["totals"]
+		payload = {
+			"totals_json": encode_payload(totals),
+			"bucket_counts_json": encode_payload(result["bucket_counts"]),
+		}
+		if not builder.totals_only:
+			payload["rows_json"] = encode_payload(result["rows"])
+			payload["account_rollup_json"] = encode_payload(result["account_rollup"])
+			payload["group_cube_json"] = encode_payload(build_group_cube(result["rows"]))
 
-		doc.reload()
-		doc.status = "Complete"
-		doc.completed_at = frappe.utils.now_datetime()
-		doc.total_accounts = totals["accounts"]
-		doc.funded_count = totals["funded"]
-		doc.zero_count = totals["zero"]
-		doc.usd_total = totals["usd"]["balance"]
-		doc.usdt_total = totals["usdt"]["balance"]
-		doc.duration_seconds = round(time.time() - started, 1)
-		doc.totals_json = json.dumps(totals)
-		doc.bucket_counts_json = json.dumps(result["bucket_counts"])
-		doc.rows_json = json.dumps(result["rows"])
+	doc.reload()
+	if doc.status != "Running":
+		frappe.logger().warning(f"Wallet census {doc.name}: already {doc.status}, result not saved")
+		return
+	doc.status = "Complete"
+	doc.completed_at = frappe.utils.now_datetime()
+	doc.scanned_pages = scanned_pages
+	doc.scanned_accounts = scanned_accounts
+	doc.total_accounts = totals["accounts"]
+	doc.funded_count = totals["funded"]
+	doc.zero_count = totals["zero"]
+	doc.usd_total = totals["usd"]["balance"]
+	doc.usdt_total = totals["usdt"]["balance"]
+	# Wall time across every attempt when the run was resumed.
+	doc.duration_seconds = round(
+		frappe.utils.time_diff_in_seconds(doc.completed_at, doc.started_at)
+		if doc.started_at
+		else time.time() - started,
+		1,
+	)
+	doc.update(payload)
+	doc.update(_metric_fields(metrics, payload))
+	with metrics.phase("save"):
 		doc.save(ignore_permissions=True)
 		frappe.db.commit()
+	# The save can't time itself — record it afterwards.
+	frappe.db.set_value(
+		"Wallet Census Snapshot",
+		doc.name,
+		{
+			"save_seconds": round(metrics.phases["save"], 3),
+			"metrics_json": _metrics_json(metrics, payload),
+		},
+		update_modified=False,
+	)
+	frappe.db.commit()
+	spool.remove()
 
-		# Best-effort retention — a purge failure must not fail the run.
-		try:
-			_purge_old_snapshots()
-		except Exception as purge_exc:
-			frappe.logger().warning(f"Wallet census {snapshot_name}: snapshot purge failed: {purge_exc}")
-		frappe.db.commit()
-	except Exception as exc:
-		frappe.logger().error(f"Wallet census {snapshot_name} failed: {exc}")
-		doc.reload()
-		doc.status = "Failed"
-		doc.completed_at = frappe.utils.now_datetime()
-		doc.error = str(exc)[:500]
-		doc.save(ignore_permissions=True)
-		frappe.db.commit()
-		raise
+	# Best-effort, like retention below: the snapshot itself is already saved.
+	try:
+		if not builder.totals_only:
+			record_census_history(doc.name, doc.completed_at, result)
+			prune_census_history()
+	except Exception as history_exc:
+		frappe.logger().warning(f"Wallet census {doc.name}: history write failed: {history_exc}")
+
+	# Best-effort retention — a purge failure must not fail the run.
+	try:
+		_purge_old_snapshots()
+	except Exception as purge_exc:
+		frappe.logger().warning(f"Wallet census {doc.name}: snapshot purge failed: {purge_exc}")
+	frappe.db.commit()
+
+
+def _fail(doc, spool, exc):
+	frappe.logger().error(f"Wallet census {doc.name} failed: {exc}")
+	doc.reload()
+	if doc.status != "Running":
+		return  # never downgrade a run another attempt already finished
+	doc.status = "Failed"
+	doc.completed_at = frappe.utils.now_datetime()
+	doc.error = str(exc)[:500]
+	doc.save(ignore_permissions=True)
+	frappe.db.commit()
+	spool.remove()
+
+
+def _shard_key(snapshot_name):
+	return f"admin_panel:census_shards:{snapshot_name}"
+
+
+def _record_shard(snapshot_name, shard, stats):
+	frappe.cache().hset(_shard_key(snapshot_name), str(shard), stats)
+
+
+def _shard_stats(snapshot_name):
+	return list((frappe.cache().hgetall(_shard_key(snapshot_name)) or {}).values())
+
+
+def _claim_reduce(snapshot_name):
+	"""SET NX so only one of the shards finishing together runs the reduce."""
+	cache = frappe.cache()
+	key = cache.make_key(f"admin_panel:census_reduce:{snapshot_name}")
+	return bool(cache.set(key, 1, nx=True, ex=STALE_RUN_SECONDS))
@@ -6,6 +6,18 @@ mongo) lives in `census.py`, `ibex_client.py`, and `mongo_reader.py`, which
 depend on the constants and `build_census` defined here.
 """
 
+import base64
+import codecs
+import gzip
+import heapq
+import json
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
 # IBEX currencyId -> our wallet currency. IBEX only custodies USD and USDT;
 # BTC balances live on the Lightning side and are not returned by the API.
 CURRENCY_BY_ID = {3: "Usd", 29: "Usdt"}
@@ -25,21 +37,51 @@ MIGRATED_STATUSES = {"completed", "complete", "succeeded", "success", "done"}
 # verifier's dust tolerance.
 FUNDED_EPSILON = 1e-6
 
+# A run this many times slower than the median of its neighbours is flagged
+# in the census trend view.
+SLOW_RUN_FACTOR = 1.5
+
+# Largest balances carried in a progressive (mid-sweep) census result, and
+# in a finished census's totals.
+PARTIAL_TOP_N = 10
+TOP_FUNDED_N = 50
+
+# Funded-balance distribution in the census totals: quantiles from a
+# log-bucketed sketch with this relative accuracy, and a per-decade histogram.
+BALANCE_QUANTILES = (0.5, 0.9, 0.99)
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+
+# Envelope prefix of a compressed snapshot payload: version 1 is
+# base64(gzip(json)). Text without a known prefix is a plain-JSON payload
+# written before compression.
+PAYLOAD_PREFIX = "gz1:"
+
+# Characters of stored / decompressed payload text iter_payload_items
+# handles at a time.
+PAYLOAD_CHUNK_CHARS = 64 * 1024
+
+# Status of a snapshot retention stripped down to its summary (see retention_plan).
+ARCHIVED_STATUS = "Archived"
+
 
 class PageLimitExceeded(Exception):
 	"""sweep_pages hit max_pages — the API is paging forever or the cap is too low."""
 
 
-def sweep_pages(fetch_page, max_pages):
+def sweep_pages(fetch_page, max_pages, start_page=1, step=1):
 	"""Yield (page_number, batch) from successive 1-indexed pages until an EMPTY page.
 
+	`start_page` resumes a checkpointed sweep part-way through; `step` > 1
+	walks one shard's stride of the page space (see shard_start_page).
+
 	Termination must NOT infer "last page" from a short batch: the prod IBEX
 	hub silently caps the page size (requesting limit=100 returns 25 rows), so
 	a short page looks identical to a full one there. That inference truncated
 	the first prod census to 25 of ~8,750 accounts (2026-07-10). Only an empty
 	page ends the sweep — costing exactly one extra request.
 	"""
-	page = 1
+	page = start_page
 	while True:
 		if page > max_pages:
 			raise PageLimitExceeded(f"pagination exceeded {max_pages} pages — aborting sweep")
@@ -47,7 +89,121 @@ def sweep_pages(fetch_page, max_pages):
 		if not batch:
 			return
 		yield page, batch
+		page += step
+
+
+class RunMetrics:
+	"""Per-phase wall time and counters for one census run.
+
+	`phase(name)` accumulates, so a phase interleaved with others (IBEX
+	fetches between per-page build steps) sums to its total share of the run.
+	"""
+
+	def __init__(self, clock=time.perf_counter):
+		self._clock = clock
+		self.phases = {}
+		self.counters = {}
+
+	@contextmanager
+	def phase(self, name):
+		started = self._clock()
+		try:
+			yield
+		finally:
+			self.phases[name] = self.phases.get(name, 0.0) + (self._clock() - started)
+
+	def count(self, name, n=1):
+		self.counters[name] = self.counters.get(name, 0) + n
+
+	def as_dict(self):
+		return {
+			"phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+			"counters": dict(self.counters),
+		}
+
+
+def flag_slow_runs(runs, factor=SLOW_RUN_FACTOR):
+	"""Mark runs (newest first) whose duration exceeds `factor` x the median of the rest.
+
+	Each run dict gains `slow` (bool). Needs at least three runs with a
+	duration to say anything.
+	"""
+	durations = [r.get("duration_seconds") for r in runs]
+	known = [d for d in durations if d]
+	for i, run in enumerate(runs):
+		others = sorted(d for j, d in enumerate(durations) if d and j != i)
+		run["slow"] = False
+		if len(known) >= 3 and durations[i] and others:
+			mid = len(others) // 2
+			median = others[mid] if len(others) % 2 else (others[mid - 1] + others[mid]) / 2
+			run["slow"] = durations[i] > factor * median
+	return runs
+
+
+def retention_plan(snapshots, keep, archive_keep=0):
+	"""(names to archive, names to delete) for [(name, status)] snapshots, newest first.
+
+	The newest `keep` unarchived snapshots stay as they are. Older Complete
+	ones are archived while fewer than `archive_keep` archived snapshots are
+	newer than them; every other older snapshot (Failed, dead Running, or
+	past the archive) is deleted. `archive_keep=0` means no archive tier, so
+	snapshots archived earlier are deleted too.
+	"""
+	kept = 0
+	archive, delete = [], []
+	archived_seen = 0
+	for name, status in snapshots:
+		if status != ARCHIVED_STATUS and kept < keep:
+			kept += 1
+		elif status in ("Complete", ARCHIVED_STATUS) and archived_seen < archive_keep:
+			archived_seen += 1
+			if status != ARCHIVED_STATUS:
+				archive.append(name)
+		else:
+			delete.append(name)
+	return archive, delete
+
+
+def resume_point(committed_pages) -> int:
+	"""The last page of an unbroken 1..n run among checkpointed page numbers.
+
+	A resumed sweep restarts after it; pages past a gap (written out of order
+	before a crash) are fetched again and overwritten.
+	"""
+	committed = set(committed_pages)
+	page = 0
+	while page + 1 in committed:
 		page += 1
+	return page
+
+
+def shard_start_page(shard, shard_count, committed_pages=()):
+	"""Where shard `shard` (0-based) of `shard_count` starts or resumes its sweep.
+
+	Shards stride the 1-indexed page space: shard k owns pages k+1,
+	k+1+shard_count, … Since only pages past the end are empty, each shard
+	can stop at its own first empty page and together they cover every page.
+	A resumed shard skips the pages of its stride already checkpointed.
+	"""
+	committed = set(committed_pages)
+	page = shard + 1
+	while page in committed:
+		page += shard_count
+	return page
+
+
+def merge_spooled_pages(batches):
+	"""Flatten checkpointed page batches into one account list, deduplicated by id.
+
+	Accounts opened between a crash and its resume shift IBEX's page
+	boundaries, so a resumed sweep can see an account on two pages; the later
+	(fresher) copy wins, in first-seen order.
+	"""
+	merged = {}
+	for batch in batches:
+		for account in batch:
+			merged[account.get("id")] = account
+	return list(merged.values())
 
 
 def _is_migrated(migration) -> bool:
@@ -57,6 +213,159 @@ def _is_migrated(migration) -> bool:
 	return status in MIGRATED_STATUSES
 
 
+def join_keys(ibex_accounts):
+	"""(wallet ids, account ids) an IBEX batch joins on, each deduplicated in order.
+
+	IBEX id is the mongo wallet id; IBEX name is the mongo account _id.
+	"""
+	wallet_ids = list(dict.fromkeys(a["id"] for a in ibex_accounts if a.get("id")))
+	account_ids = list(dict.fromkeys(a["name"] for a in ibex_accounts if a.get("name")))
+	return wallet_ids, account_ids
+
+
+def encode_payload(value):
+	"""A snapshot payload field (rows / totals / bucket counts) as stored text."""
+	packed = gzip.compress(json.dumps(value, separators=(",", ":")).encode(), compresslevel=6)
+	return PAYLOAD_PREFIX + base64.b64encode(packed).decode("ascii")
+
+
+def decode_payload(text, default=None):
+	"""encode_payload's inverse; also reads plain-JSON (pre-compression) payloads."""
+	return decode_payload_sized(text, default)[0]
+
+
+def decode_payload_sized(text, default=None):
+	"""(decode_payload(text, default), length of its JSON) — the size PayloadLRU weighs."""
+	if not text:
+		return default, 0
+	if text.startswith(PAYLOAD_PREFIX):
+		raw = gzip.decompress(base64.b64decode(text[len(PAYLOAD_PREFIX) :]))
+	elif text[:1] in "[{":
+		raw = text
+	else:
+		raise ValueError(f"unknown census payload envelope: {text[:8]!r}")
+	return json.loads(raw), len(raw)
+
+
+def iter_payload_items(text, chunk_chars=PAYLOAD_CHUNK_CHARS):
+	"""Yield the elements of a stored JSON-array payload one at a time.
+
+	Decompresses and parses incrementally, so beyond the stored text only
+	about one chunk is in memory at a time (the streaming census export reads
+	rows this way instead of decoding them all). Raises ValueError for a
+	malformed payload.
+	"""
+	if not text:
+		return
+	if text.startswith(PAYLOAD_PREFIX):
+		chunks = _inflate_chunks(text[len(PAYLOAD_PREFIX) :], chunk_chars)
+	elif text[:1] == "[":
+		chunks = (text[i : i + chunk_chars] for i in range(0, len(text), chunk_chars))
+	else:
+		raise ValueError(f"unknown census payload envelope: {text[:8]!r}")
+
+	decoder = json.JSONDecoder()
+	buffer, pos, opened = "", 0, False
+	for chunk in _with_end(chunks):
+		final = chunk is None
+		buffer = buffer[pos:] + (chunk or "")
+		pos = 0
+		while True:
+			while pos < len(buffer) and (buffer[pos].isspace() or (opened and buffer[pos] == ",")):
+				pos += 1
+			if pos == len(buffer):
+				break
+			if not opened:
+				if buffer[pos] != "[":
+					raise ValueError("census payload is not a JSON array")
+				opened, pos = True, pos + 1
+				continue
+			if buffer[pos] == "]":
+				return
+			try:
+				value, end = decoder.raw_decode(buffer, pos)
+			except json.JSONDecodeError:
+				if final:
+					raise ValueError("truncated census payload") from None
+				break  # the element continues in the next chunk
+			if end == len(buffer) and not final:
+				break  # a scalar could still be cut short; decode it with more input
+			yield value
+			pos = end
+	raise ValueError("truncated census payload")
+
+
+def _with_end(chunks):
+	yield from chunks
+	yield None
+
+
+def _inflate_chunks(encoded, chunk_chars):
+	"""The JSON text of a gz1 payload body (base64(gzip)), chunk by chunk."""
+	inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+	text = codecs.getincrementaldecoder("utf-8")()
+	step = max(4, chunk_chars - chunk_chars % 4)  # whole base64 quanta
+	for i in range(0, len(encoded), step):
+		yield text.decode(inflater.decompress(base64.b64decode(encoded[i : i + step])))
+	yield text.decode(inflater.flush(), final=True)
+
+
+class PayloadLRU:
+	"""Least-recently-used cache bounded by the total size of its values.
+
+	Sizes come from the caller (census.py weighs a decoded snapshot by its
+	JSON length), so a few large payloads can't pin unbounded memory in a
+	worker the way a count-bounded cache would. A value larger than the
+	whole budget is not kept. Entries expire after `ttl_seconds`.
+	Thread-safe.
+	"""
+
+	def __init__(self, max_bytes, ttl_seconds, clock=time.monotonic):
+		self.max_bytes = max_bytes
+		self.ttl_seconds = ttl_seconds
+		self._clock = clock
+		self._entries = OrderedDict()  # key -> (value, size, expires_at)
+		self._bytes = 0
+		self._lock = threading.Lock()
+
+	def __len__(self):
+		return len(self._entries)
+
+	@property
+	def size(self):
+		return self._bytes
+
+	def get(self, key):
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return None
+			if self._clock() >= entry[2]:
+				self._drop(key)
+				return None
+			self._entries.move_to_end(key)
+			return entry[0]
+
+	def put(self, key, value, size):
+		with self._lock:
+			if key in self._entries:
+				self._drop(key)
+			if size > self.max_bytes:
+				return
+			self._entries[key] = (value, size, self._clock() + self.ttl_seconds)
+			self._bytes += size
+			while self._bytes > self.max_bytes:
+				self._drop(next(iter(self._entries)))
+
+	def discard(self, key):
+		with self._lock:
+			if key in self._entries:
+				self._drop(key)
+
+	def _drop(self, key):
+		self._bytes -= self._entries.pop(key)[1]
+
+
 def build_census(ibex_accounts, wallets, accounts, migrations) -> dict:
 	"""Join IBEX accounts against mongo, bucket them, and total balances.
 
@@ -68,36 +377,249 @@ def build_census(ibex_accounts, wallets, accounts, migrations) -> dict:
 	                               default_wallet_id, npub, created_at}
 	    migrations: account_id -> {status, run_id, completed_at}
 
-	Returns a dict with `rows`, `totals`, and `bucket_counts` — all
-	JSON-serializable.
+	Returns a dict with `rows` (one per wallet), `totals`, `bucket_counts`
+	and `account_rollup` (one per account, see CensusBuilder.account_rollup)
+	— all JSON-serializable.
 	"""
-	rows = []
-	totals = {
-		"usd": {"balance": 0.0, "funded_count": 0, "zero_count": 0},
-		"usdt": {"balance": 0.0, "funded_count": 0, "zero_count": 0},
-	}
-	buckets = {
-		"active_funded": 0,
-		"active_zero": 0,
-		"closed_with_dust": 0,
-		"unmatched": 0,
-		"migrated": 0,
-		"system": 0,
-		"non_default_wallet": 0,
-	}
+	builder = CensusBuilder(wallets, accounts, migrations)
+	builder.add(ibex_accounts)
+	return builder.result()
 
-	for account in ibex_accounts:
+
+class BalanceSketch:
+	"""Streaming quantiles and a log-scale histogram of positive balances.
+
+	Each balance lands in the logarithmic bucket ceil(log_gamma(x)), with
+	gamma = (1 + a) / (1 - a) for relative accuracy `a` (the DDSketch
+	scheme): a quantile is then within `a` of the true value, and memory
+	grows with the balances' dynamic range, not their count.
+	"""
+
+	def __init__(self, relative_accuracy=SKETCH_RELATIVE_ACCURACY):
+		self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+		self._log_gamma = math.log(self._gamma)
+		self._bins = {}
+		self.count = 0
+
+	def add(self, value):
+		if value <= 0:
+			return
+		index = math.ceil(math.log(value) / self._log_gamma)
+		self._bins[index] = self._bins.get(index, 0) + 1
+		self.count += 1
+
+	def quantile(self, q):
+		"""Estimated q-quantile (0..1), rounded to cents; None when empty."""
+		if not self.count:
+			return None
+		rank = q * (self.count - 1)
+		seen = 0
+		for index in sorted(self._bins):
+			seen += self._bins[index]
+			if seen > rank:
+				return round(2 * self._gamma**index / (self._gamma + 1), 2)
+		return None
+
+	def histogram(self):
+		"""[{lower, upper, count}] per power-of-ten balance range, ascending."""
+		decades = {}
+		for index, n in self._bins.items():
+			# A bin's representative value decides its decade (bins are ~2% wide).
+			decade = math.floor(math.log10(2 * self._gamma**index / (self._gamma + 1)))
+			decades[decade] = decades.get(decade, 0) + n
+		return [
+			{"lower": 10.0**decade, "upper": 10.0 ** (decade + 1), "count": decades[decade]}
+			for decade in sorted(decades)
+		]
+
+
+class CensusBuilder:
+	"""build_census, fed one IBEX page batch at a time.
+
+	The census job adds each page as the sweep delivers it and publishes
+	`partial()` — running totals, bucket counts and the largest balances so
+	far — so operators see a usable float estimate long before the sweep
+	ends. `result()` is exactly build_census's return value.
+
+	A wallet id already added is ignored (a resumed sweep can return an
+	account on two pages).
+
+	With `totals_only`, rows are classified and counted but not kept: the
+	result has totals and bucket counts only (no rows, no rollup), and the
+	buckets a totals-only run can't know without the full join ("migrated",
+	"non_default_wallet") are left out.
+	"""
+
+	def __init__(self, wallets, accounts, migrations, btc_wallet_count=None, totals_only=False):
+		self.wallets = wallets
+		self.accounts = accounts
+		self.migrations = migrations
+		self.totals_only = totals_only
+		self.rows = []
+		self.account_count = 0
+		self.totals = {
+			"usd": {"balance": 0.0, "funded_count": 0, "zero_count": 0},
+			"usdt": {"balance": 0.0, "funded_count": 0, "zero_count": 0},
+		}
+		self.buckets = {
+			"active_funded": 0,
+			"active_zero": 0,
+			"closed_with_dust": 0,
+			"unmatched": 0,
+			"migrated": 0,
+			"system": 0,
+			"non_default_wallet": 0,
+		}
+		self.funded_count = 0
+		# BTC wallets exist in mongo but hold no IBEX balance — report the count so
+		# operators know it's intentional, not a gap. A caller joining only the
+		# wallets IBEX returned (see join) passes the count it got from mongo.
+		if btc_wallet_count is None and not totals_only:
+			btc_wallet_count = sum(1 for w in wallets.values() if (w.get("currency") or "").lower() == "btc")
+		self.btc_wallet_count = btc_wallet_count
+		self._seen = set()
+		self._top = []  # min-heap of (balance, seq, row): the largest balances so far
+		self._seq = 0
+		self._sketch = BalanceSketch()
+		self._rollup = {}  # account_id -> running account-level aggregate
+
+	def join(self, wallets, accounts):
+		"""Merge more join rows in (targeted loads arrive batch by batch).
+
+		Rows must be joined before the batch that references them is added.
+		A totals-only builder keeps just the latest join (nothing outlives
+		the batch it classifies).
+		"""
+		if self.totals_only:
+			self.wallets, self.accounts = dict(wallets), dict(accounts)
+			return
+		self.wallets.update(wallets)
+		self.accounts.update(accounts)
+
+	def add(self, ibex_accounts):
+		for account in ibex_accounts:
+			wallet_id = account.get("id")
+			if wallet_id is not None:
+				if wallet_id in self._seen:
+					continue
+				self._seen.add(wallet_id)
+			row = self._row(account)
+			self.account_count += 1
+			if not self.totals_only:
+				self.rows.append(row)
+				self._roll_up(row)
+			if row["balance"] > FUNDED_EPSILON:
+				self.funded_count += 1
+				self._seq += 1
+				_push_top(self._top, (row["balance"], self._seq, row), TOP_FUNDED_N)
+				self._sketch.add(row["balance"])
+
+	def partial(self):
+		"""Running totals / buckets / top funded accounts over what was added so far."""
+		totals = self._totals_payload()
+		return {
+			"totals": totals,
+			"bucket_counts": self._bucket_counts(),
+			"top_funded": totals["top_funded"][:PARTIAL_TOP_N],
+		}
+
+	def result(self):
+		# Rows stay in sweep order: the page sorts its own table, and the
+		# richest accounts are already in totals["top_funded"].
+		return {
+			"rows": self.rows,
+			"totals": self._totals_payload(),
+			"bucket_counts": self._bucket_counts(),
+			"account_rollup": self.account_rollup(),
+		}
+
+	def account_rollup(self):
+		"""One entry per account across its wallets, in first-seen order.
+
+		`default_wallet_share` is the default wallet's part of the account's
+		balance (None for an empty account); below 1 means money sits on a
+		non-default wallet.
+		"""
+		out = []
+		for entry in self._rollup.values():
+			balance = entry["balance"]
+			out.append(
+				{
+					**entry,
+					"balance": round(balance, 8),
+					"usd": round(entry["usd"], 8),
+					"usdt": round(entry["usdt"], 8),
+					"default_wallet_balance": round(entry["default_wallet_balance"], 8),
+					"default_wallet_share": (
+						round(entry["default_wallet_balance"] / balance, 4)
+						if balance > FUNDED_EPSILON
+						else None
+					),
+				}
+			)
+		return out
+
+	def _roll_up(self, row):
+		account_id = row["account_id"]
+		if not account_id:
+			return
+		entry = self._rollup.get(account_id)
+		if entry is None:
+			entry = self._rollup[account_id] = {
+				"account_id": account_id,
+				"username": row["username"],
+				"level": row["level"],
+				"status": row["status"],
+				"wallet_count": 0,
+				"balance": 0.0,
+				"usd": 0.0,
+				"usdt": 0.0,
+				"default_wallet_id": (self.accounts.get(account_id) or {}).get("default_wallet_id"),
+				"default_wallet_balance": 0.0,
+			}
+		entry["wallet_count"] += 1
+		entry["balance"] += row["balance"]
+		currency = (row["currency"] or "").lower()
+		if currency in ("usd", "usdt"):
+			entry[currency] += row["balance"]
+		if row["wallet_id"] and row["wallet_id"] == entry["default_wallet_id"]:
+			entry["default_wallet_balance"] += row["balance"]
+
+	def _bucket_counts(self):
+		if self.totals_only:
+			return {k: n for k, n in self.buckets.items() if k not in ("migrated", "non_default_wallet")}
+		return dict(self.buckets)
+
+	def _totals_payload(self):
+		# Round accumulated float balances once at the end to avoid drift.
+		return {
+			"usd": {**self.totals["usd"], "balance": round(self.totals["usd"]["balance"], 2)},
+			"usdt": {**self.totals["usdt"], "balance": round(self.totals["usdt"]["balance"], 2)},
+			"btc": {"wallet_count": self.btc_wallet_count, "balance": None},
+			"accounts": self.account_count,
+			"funded": self.funded_count,
+			"zero": self.account_count - self.funded_count,
+			"top_funded": [
+				{k: row[k] for k in ("username", "account_id", "wallet_id", "currency", "balance")}
+				for _, _, row in sorted(self._top, reverse=True)
+			],
+			"balance_quantiles": {f"p{round(q * 100)}": self._sketch.quantile(q) for q in BALANCE_QUANTILES},
+			"balance_histogram": self._sketch.histogram(),
+		}
+
+	def _row(self, account):
+		buckets, totals = self.buckets, self.totals
 		wallet_id = account.get("id")
 		# IBEX account name IS the mongo account _id string — the join key.
 		account_id = account.get("name")
-		wallet = wallets.get(wallet_id) or {}
-		acct_record = accounts.get(account_id)
+		wallet = self.wallets.get(wallet_id) or {}
+		acct_record = self.accounts.get(account_id)
 		acct = acct_record or {}
 		# "matched" = this IBEX account has a mongo account record. When the
 		# census runs IBEX-only (no customer_mongo_uri), nothing is matched;
 		# when mongo is wired, an unmatched account is a genuine anomaly.
 		matched = acct_record is not None
-		migration = migrations.get(account_id)
+		migration = self.migrations.get(account_id)
 
 		raw_balance = account.get("balance")
 		# Round to stored precision BEFORE classifying so "funded" and the
@@ -148,47 +670,216 @@ def build_census(ibex_accounts, wallets, accounts, migrations) -> dict:
 			else:
 				bucket["zero_count"] += 1
 
-		rows.append(
-			{
-				"username": acct.get("username"),
-				"account_id": account_id,
-				"wallet_id": wallet_id,
-				"currency": currency,
-				"balance": balance,
-				"status": status,
-				"level": acct.get("level"),
-				"role": role,
-				"is_system": is_system,
-				"migration_status": migration.get("status") if migration else None,
-				"run_id": migration.get("run_id") if migration else None,
-				"migrated": migrated,
-				"is_default_wallet": (not non_default) if funded else None,
-				"npub": acct.get("npub"),
-				"created_at": acct.get("created_at"),
-				"buckets": row_buckets,
-			}
-		)
+		return {
+			"username": acct.get("username"),
+			"account_id": account_id,
+			"wallet_id": wallet_id,
+			"currency": currency,
+			"balance": balance,
+			"status": status,
+			"level": acct.get("level"),
+			"role": role,
+			"is_system": is_system,
+			"migration_status": migration.get("status") if migration else None,
+			"run_id": migration.get("run_id") if migration else None,
+			"migrated": migrated,
+			"is_default_wallet": (not non_default) if funded else None,
+			"npub": acct.get("npub"),
+			"created_at": acct.get("created_at"),
+			"buckets": row_buckets,
+		}
+
+
+# Status buckets, in the order _row assigns them; a row has at most one.
+STATUS_BUCKETS = ("system", "unmatched", "active_funded", "active_zero", "closed_with_dust")
 
-	rows.sort(key=lambda r: r["balance"], reverse=True)
-	funded_count = sum(1 for r in rows if r["balance"] > FUNDED_EPSILON)
+# Wallets per list (new / closed / gainers / losers) diff_census returns.
+DIFF_TOP_N = 20
 
-	# BTC wallets exist in mongo but hold no IBEX balance — report the count so
-	# operators know it's intentional, not a gap.
-	btc_wallet_count = sum(1 for w in wallets.values() if (w.get("currency") or "").lower() == "btc")
 
-	# Round accumulated float balances once at the end to avoid drift.
-	for ccy in ("usd", "usdt"):
-		totals[ccy]["balance"] = round(totals[ccy]["balance"], 2)
+def diff_census(before_rows, after_rows, top_n=DIFF_TOP_N):
+	"""Compare two snapshots' rows, joined by wallet id in one pass over each.
+
+	Returns the full counts, plus only the `top_n` largest entries of each
+	list, kept in bounded heaps (no full sort):
+	  new / closed        wallets only in `after_rows` / only in `before_rows`
+	  gainers / losers    wallets in both, by balance change
+	  bucket_transitions  {"from->to": count} of status-bucket moves
+	  float_delta         {currency: after total - before total}
+	"""
+	before, float_delta = {}, {}
+	for row in before_rows:
+		_add_float(float_delta, row, -1)
+		if row.get("wallet_id"):
+			before[row["wallet_id"]] = row
+
+	heaps = {"new": [], "closed": [], "gainers": [], "losers": []}
+	counts = dict.fromkeys(heaps, 0)
+	transitions = {}
+	for seq, row in enumerate(after_rows):
+		_add_float(float_delta, row, 1)
+		old = before.pop(row.get("wallet_id"), None) if row.get("wallet_id") else None
+		if old is None:
+			counts["new"] += 1
+			_push_top(heaps["new"], (row["balance"], seq, _mover(None, row)), top_n)
+			continue
+		moved = (_status_bucket(old), _status_bucket(row))
+		if moved[0] != moved[1]:
+			key = f"{moved[0]}->{moved[1]}"
+			transitions[key] = transitions.get(key, 0) + 1
+		delta = round(row["balance"] - old["balance"], 8)
+		if delta:
+			kind = "gainers" if delta > 0 else "losers"
+			counts[kind] += 1
+			_push_top(heaps[kind], (abs(delta), seq, _mover(old, row)), top_n)
+	for seq, row in enumerate(before.values()):
+		counts["closed"] += 1
+		_push_top(heaps["closed"], (row["balance"], seq, _mover(row, None)), top_n)
 
 	return {
-		"rows": rows,
-		"totals": {
-			"usd": totals["usd"],
-			"usdt": totals["usdt"],
-			"btc": {"wallet_count": btc_wallet_count, "balance": None},
-			"accounts": len(rows),
-			"funded": funded_count,
-			"zero": len(rows) - funded_count,
-		},
-		"bucket_counts": buckets,
+		"counts": counts,
+		**{kind: [entry for _, _, entry in sorted(heap, reverse=True)] for kind, heap in heaps.items()},
+		"bucket_transitions": dict(sorted(transitions.items(), key=lambda kv: kv[1], reverse=True)),
+		"float_delta": {ccy: round(total, 2) for ccy, total in float_delta.items()},
 	}
+
+
+def _push_top(heap, entry, n):
+	"""Keep the `n` largest entries seen in a min-heap."""
+	if len(heap) < n:
+		heapq.heappush(heap, entry)
+	elif entry > heap[0]:
+		heapq.heapreplace(heap, entry)
+
+
+def _status_bucket(row):
+	return next((b for b in row.get("buckets") or () if b in STATUS_BUCKETS), "none")
+
+
+def _add_float(totals, row, sign):
+	currency = (row.get("currency") or "").lower()
+	if currency:
+		totals[currency] = totals.get(currency, 0.0) + sign * (row.get("balance") or 0.0)
+
+
+def _mover(before, after):
+	row = after or before
+	return {
+		"wallet_id": row.get("wallet_id"),
+		"account_id": row.get("account_id"),
+		"username": row.get("username"),
+		"currency": row.get("currency"),
+		"before": before["balance"] if before else None,
+		"after": after["balance"] if after else None,
+		"delta": round((after["balance"] if after else 0.0) - (before["balance"] if before else 0.0), 8),
+	}
+
+
+# Dimensions and measures group_census accepts.
+GROUP_DIMENSIONS = ("level", "status", "role", "currency", "bucket", "migration_status", "created_month")
+GROUP_MEASURES = ("count", "funded_count", "sum_balance", "avg_balance")
+
+
+def group_census(rows, dimensions, measures=GROUP_MEASURES, funded_only=False):
+	"""Group census rows by `dimensions` and compute `measures`.
+
+	`bucket` is multi-valued: a row counts once in each of its buckets (and
+	under "none" when it has none), so bucket groups can sum past the row
+	count. Groups come back largest balance first. Raises ValueError for an
+	unknown dimension / measure. Same answer as group_cube over
+	build_group_cube(rows), which is what it computes.
+	"""
+	return group_cube(build_group_cube(rows), dimensions, measures, funded_only)
+
+
+def build_group_cube(rows):
+	"""Pre-aggregate census rows for group_cube, in one pass.
+
+	One cell per distinct combination of every GROUP_DIMENSIONS value (a
+	row's bucket list counts as one value here), in first-seen order:
+	[*dimension values, count, funded_count, sum_balance, funded_sum_balance].
+	Stored with the snapshot, so a group-by rolls up a few hundred cells
+	instead of rescanning every row.
+	"""
+	getters = [_CUBE_GETTERS[d] for d in GROUP_DIMENSIONS]
+	cells = {}
+	for row in rows:
+		balance = row.get("balance") or 0.0
+		funded = balance > FUNDED_EPSILON
+		key = tuple(getter(row) for getter in getters)
+		cell = cells.get(key)
+		if cell is None:
+			cell = cells[key] = [0, 0, 0.0, 0.0]
+		cell[0] += 1
+		cell[2] += balance
+		if funded:
+			cell[1] += 1
+			cell[3] += balance
+	return [[*key, *cell] for key, cell in cells.items()]
+
+
+def group_cube(cube, dimensions, measures=GROUP_MEASURES, funded_only=False):
+	"""group_census over a build_group_cube result instead of the rows."""
+	dimensions, measures = list(dimensions), list(measures)
+	unknown = [d for d in dimensions if d not in GROUP_DIMENSIONS] + [
+		m for m in measures if m not in GROUP_MEASURES
+	]
+	if unknown:
+		raise ValueError(f"unknown census group-by field(s): {', '.join(unknown)}")
+	if len(set(dimensions)) != len(dimensions):
+		raise ValueError("duplicate census group-by dimension")
+
+	positions = [GROUP_DIMENSIONS.index(d) for d in dimensions]
+	width = len(GROUP_DIMENSIONS)
+	groups = {}  # key tuple -> [count, funded_count, balance]
+	for cell in cube:
+		count, funded_count, balance, funded_balance = cell[width:]
+		if funded_only:
+			if not funded_count:
+				continue
+			count, balance = funded_count, funded_balance
+		keys = [()]
+		for position in positions:
+			value = cell[position]
+			values = value if position == _BUCKET_POSITION else (value,)
+			keys = [(*key, v) for key in keys for v in values]
+		for key in keys:
+			acc = groups.get(key)
+			if acc is None:
+				acc = groups[key] = [0, 0, 0.0]
+			acc[0] += count
+			acc[1] += funded_count
+			acc[2] += balance
+
+	out = []
+	for key, (count, funded_count, balance) in sorted(groups.items(), key=lambda kv: kv[1][2], reverse=True):
+		values = {
+			"count": count,
+			"funded_count": funded_count,
+			"sum_balance": round(balance, 2),
+			"avg_balance": round(balance / count, 2),
+		}
+		out.append({**dict(zip(dimensions, key, strict=True)), **{m: values[m] for m in measures}})
+	return out
+
+
+_DIMENSION_GETTERS = {
+	"level": lambda row: (row.get("level"),),
+	"status": lambda row: (row.get("status"),),
+	"role": lambda row: (row.get("role"),),
+	"currency": lambda row: (row.get("currency"),),
+	"bucket": lambda row: row.get("buckets") or ("none",),
+	"migration_status": lambda row: (row.get("migration_status"),),
+	"created_month": lambda row: ((row.get("created_at") or "")[:7] or None,),
+}
+
+
+# One value per dimension for a cube cell: the bucket list stays whole (a
+# tuple, so it can key a dict) and group_cube expands it.
+def _single_valued(getter):
+	return lambda row: getter(row)[0]
+
+
+_CUBE_GETTERS = {dimension: _single_valued(getter) for dimension, getter in _DIMENSION_GETTERS.items()}
+_CUBE_GETTERS["bucket"] = lambda row: tuple(row.get("buckets") or ("none",))
+_BUCKET_POSITION = GROUP_DIMENSIONS.index("bucket")
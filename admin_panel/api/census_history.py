@@ -0,0 +1,180 @@
+"""Long-run wallet census history: per-account balances and the float trend.
+
+Only the last KEEP_SNAPSHOTS Wallet Census Snapshots survive, and each is an
+opaque payload, so "what did this account hold last quarter?" had no cheap
+answer. Every completed census now also writes one compact columnar file
+(census_history_core) under the site's private files:
+
+  sites/<site>/private/census_history/<completed_at>-<snapshot>.cnh
+
+The names sort chronologically. Files older than HISTORY_KEEP_DAYS (site
+config `census_history_days` overrides it) are pruned after each run.
+Reads mmap the files:
+  * get_account_balance_history — binary-searches each file for one account.
+  * get_float_history — reads only each file's header.
+
+backfill_census_history (bench execute) seeds the store from the snapshots
+still retained.
+"""
+
+import mmap
+import os
+from contextlib import contextmanager
+from datetime import timedelta
+
+import frappe
+
+from .auth import require_admin
+from .census_core import decode_payload
+from .census_history_core import HistoryFile, encode_history, read_header
+from .common import handle_api_errors
+
+HISTORY_DIR = "census_history"
+HISTORY_KEEP_DAYS = 400
+
+# Bounds on how many snapshots one history request walks.
+DEFAULT_HISTORY_POINTS = 90
+MAX_HISTORY_POINTS = 400
+
+_STAMP_FORMAT = "%Y%m%dT%H%M%S"
+_SUFFIX = ".cnh"
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def get_account_balance_history(account_id=None, limit=DEFAULT_HISTORY_POINTS):
+	"""One account's funded wallet balances per snapshot, oldest first.
+
+	A snapshot where the account held nothing still appears, with no wallets.
+	"""
+	account_id = (account_id or "").strip()
+	if not account_id:
+		return {"success": False, "error": "account_id is required"}
+	points = []
+	for path in _history_paths(limit):
+		with _mapped(path) as history:
+			wallets = history.lookup(account_id)
+			points.append(
+				{
+					"snapshot": history.meta["snapshot"],
+					"completed_at": history.meta["completed_at"],
+					"usd": round(sum(w["balance"] for w in wallets if w["currency"] == "Usd"), 2),
+					"usdt": round(sum(w["balance"] for w in wallets if w["currency"] == "Usdt"), 2),
+					"wallets": wallets,
+				}
+			)
+	return {"success": True, "account_id": account_id, "points": points}
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def get_float_history(limit=DEFAULT_HISTORY_POINTS):
+	"""USD / USDT float and funded counts per snapshot, oldest first."""
+	points = []
+	for path in _history_paths(limit):
+		header = _read_header(path)
+		totals = header.get("totals") or {}
+		points.append(
+			{
+				"snapshot": header["snapshot"],
+				"completed_at": header["completed_at"],
+				"usd": (totals.get("usd") or {}).get("balance"),
+				"usdt": (totals.get("usdt") or {}).get("balance"),
+				"funded": totals.get("funded"),
+				"accounts": totals.get("accounts"),
+			}
+		)
+	return {"success": True, "points": points}
+
+
+def record_census_history(snapshot_name, completed_at, result):
+	"""Write one completed snapshot's history file (called by the census job)."""
+	meta = {
+		"snapshot": snapshot_name,
+		"completed_at": str(completed_at),
+		"totals": result["totals"],
+		"bucket_counts": result["bucket_counts"],
+	}
+	data = encode_history(result["rows"], meta)
+	root = _history_root()
+	os.makedirs(root, exist_ok=True)
+	path = os.path.join(root, f"{completed_at.strftime(_STAMP_FORMAT)}-{snapshot_name}{_SUFFIX}")
+	tmp = f"{path}.{os.getpid()}.tmp"
+	with open(tmp, "wb") as f:
+		f.write(data)
+	os.replace(tmp, path)
+	return path
+
+
+def prune_census_history(keep_days=None):
+	"""Remove history files older than the retention window; returns how many."""
+	keep_days = frappe.utils.cint(keep_days or frappe.conf.get("census_history_days")) or HISTORY_KEEP_DAYS
+	cutoff = (frappe.utils.now_datetime() - timedelta(days=keep_days)).strftime(_STAMP_FORMAT)
+	removed = 0
+	for name in _history_names():
+		if name[: len(cutoff)] < cutoff:
+			os.remove(os.path.join(_history_root(), name))
+			removed += 1
+	return removed
+
+
+def backfill_census_history():
+	"""Seed the store from every retained Complete snapshot not yet recorded."""
+	recorded = {name.split("-", 1)[1].removesuffix(_SUFFIX) for name in _history_names()}
+	written = 0
+	for row in frappe.get_all(
+		"Wallet Census Snapshot",
+		# Totals-only runs (mode "Totals") store no rows.
+		filters={"status": "Complete", "mode": ("!=", "Totals")},
+		fields=["name", "completed_at"],
+		order_by="completed_at asc",
+	):
+		if row.name in recorded or not row.completed_at:
+			continue
+		stored = frappe.db.get_value(
+			"Wallet Census Snapshot",
+			row.name,
+			["totals_json", "bucket_counts_json", "rows_json"],
+			as_dict=True,
+		)
+		result = {
+			"totals": decode_payload(stored.totals_json, {}),
+			"bucket_counts": decode_payload(stored.bucket_counts_json, {}),
+			"rows": decode_payload(stored.rows_json, []),
+		}
+		record_census_history(row.name, row.completed_at, result)
+		written += 1
+	return {"written": written}
+
+
+def _history_root():
+	return frappe.get_site_path("private", HISTORY_DIR)
+
+
+def _history_names():
+	try:
+		return sorted(n for n in os.listdir(_history_root()) if n.endswith(_SUFFIX))
+	except FileNotFoundError:
+		return []
+
+
+def _history_paths(limit):
+	"""The newest `limit` history files, oldest first."""
+	limit = max(1, min(frappe.utils.cint(limit) or DEFAULT_HISTORY_POINTS, MAX_HISTORY_POINTS))
+	return [os.path.join(_history_root(), name) for name in _history_names()[-limit:]]
+
+
+@contextmanager
+def _mapped(path):
+	"""A HistoryFile over an mmap of `path` (unmapped on exit)."""
+	with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+		with HistoryFile(mapped) as history:
+			yield history
+
+
+def _read_header(path):
+	# mmap is lazy: only the header's pages are read.
+	with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+		return read_header(mapped)[0]
@@ -0,0 +1,157 @@
+"""Pure columnar file format for the wallet census history.
+
+No frappe or IO imports (unit-tested directly). One file per completed
+snapshot keeps that snapshot's funded wallets as columns, so months of
+history fit in little space and a lookup never parses a whole snapshot:
+
+  MAGIC | u32 header length | header JSON | column sections
+
+The header carries the snapshot's name, completion time, totals and bucket
+counts (enough for the aggregate float series on its own) plus each
+column's (offset, length) in the body:
+
+  account_offsets  u32 x (n+1)   into account_blob; rows sorted by account id
+  account_blob     utf-8 account ids, concatenated
+  wallet_offsets   u32 x (n+1)   into wallet_blob
+  wallet_blob      utf-8 wallet ids, concatenated
+  currencies       u8 x n        index into CURRENCIES (0 = unknown)
+  balances         f64 x n
+
+Only funded wallets are stored: a wallet absent from a snapshot held zero
+(or did not exist yet). `HistoryFile` reads the columns in place through
+memoryviews, so it works over an `mmap` of the file and a per-account
+lookup touches only the pages its binary search lands on.
+"""
+
+import json
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .census_core import FUNDED_EPSILON
+
+MAGIC = b"CNH1"
+
+# Currency codes stored in the `currencies` column; index 0 is "unknown".
+CURRENCIES = (None, "Usd", "Usdt")
+
+_LENGTH = struct.Struct("<I")
+
+
+def encode_history(rows, meta):
+	"""The history file bytes for one snapshot's census rows (build_census rows)."""
+	funded = sorted(
+		(r for r in rows if (r.get("balance") or 0) > FUNDED_EPSILON),
+		key=lambda r: (r.get("account_id") or "", r.get("wallet_id") or ""),
+	)
+	codes = {name: code for code, name in enumerate(CURRENCIES) if name}
+	accounts_offsets, accounts_blob = _string_column(r.get("account_id") for r in funded)
+	wallet_offsets, wallet_blob = _string_column(r.get("wallet_id") for r in funded)
+	columns = {
+		"account_offsets": accounts_offsets,
+		"account_blob": accounts_blob,
+		"wallet_offsets": wallet_offsets,
+		"wallet_blob": wallet_blob,
+		"currencies": bytes(codes.get(r.get("currency"), 0) for r in funded),
+		"balances": array("d", (float(r["balance"]) for r in funded)).tobytes(),
+	}
+	body, sections = bytearray(), {}
+	for name, data in columns.items():
+		body += b"\0" * (-len(body) % 8)  # keep numeric columns 8-byte aligned
+		sections[name] = [len(body), len(data)]
+		body += data
+	header = json.dumps(
+		{**meta, "count": len(funded), "byteorder": sys.byteorder, "sections": sections},
+		separators=(",", ":"),
+		default=str,
+	).encode()
+	return MAGIC + _LENGTH.pack(len(header)) + header + bytes(body)
+
+
+def read_header(buffer):
+	"""(header dict, body offset) of a history file held in `buffer`."""
+	if bytes(buffer[:4]) != MAGIC:
+		raise ValueError("not a census history file")
+	(length,) = _LENGTH.unpack_from(buffer, 4)
+	end = 4 + _LENGTH.size + length
+	return json.loads(bytes(buffer[4 + _LENGTH.size : end])), end
+
+
+class HistoryFile:
+	"""Read-only view over one history file (bytes or an mmap).
+
+	Use as a context manager: the column views must be released before an
+	underlying mmap can be closed.
+	"""
+
+	def __init__(self, buffer):
+		self._views = [memoryview(buffer)]
+		self.meta, self._base = read_header(self._views[0])
+		self._account_offsets = self._column("account_offsets", "I")
+		self._account_blob = self._column("account_blob")
+		self._wallet_offsets = self._column("wallet_offsets", "I")
+		self._wallet_blob = self._column("wallet_blob")
+		self._currencies = self._column("currencies")
+		self._balances = self._column("balances", "d")
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.release()
+		return False
+
+	def __len__(self):
+		return self.meta["count"]
+
+	def release(self):
+		for view in reversed(self._views):
+			view.release()
+		self._views = []
+
+	def account(self, index):
+		return self._string(self._account_offsets, self._account_blob, index)
+
+	def lookup(self, account_id):
+		"""[{wallet_id, currency, balance}] of one account's funded wallets."""
+		rows = range(len(self))
+		start = bisect_left(rows, account_id, key=self.account)
+		end = bisect_right(rows, account_id, lo=start, key=self.account)
+		return [
+			{
+				"wallet_id": self._string(self._wallet_offsets, self._wallet_blob, i),
+				"currency": CURRENCIES[self._currencies[i]],
+				"balance": self._balances[i],
+			}
+			for i in range(start, end)
+		]
+
+	def _column(self, name, fmt=None):
+		offset, length = self.meta["sections"][name]
+		start = self._base + offset
+		view = self._views[0][start : start + length]
+		self._views.append(view)
+		if fmt is None:
+			return view
+		if self.meta["byteorder"] != sys.byteorder:
+			# Written on a host of the other endianness: copy and swap once.
+			values = array(fmt, view)
+			values.byteswap()
+			return values
+		view = view.cast(fmt)
+		self._views.append(view)
+		return view
+
+	@staticmethod
+	def _string(offsets, blob, index):
+		return bytes(blob[offsets[index] : offsets[index + 1]]).decode()
+
+
+def _string_column(values):
+	"""(u32 offsets bytes, utf-8 blob) for a column of strings (None -> "")."""
+	offsets, blob = array("I", [0]), bytearray()
+	for value in values:
+		blob += (value or "").encode()
+		offsets.append(len(blob))
+	return offsets.tobytes(), bytes(blob)
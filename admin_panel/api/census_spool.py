@@ -0,0 +1,196 @@
+"""On-disk checkpoint spool for a running wallet census.
+
+A census sweep pages through every IBEX org account for minutes. Without a
+checkpoint, a worker that dies mid-sweep (deploy, OOM, kill) loses every
+page fetched so far. The job now writes each page here as it arrives, under
+the site's private files and keyed by snapshot:
+
+  sites/<site>/private/census_spool/<snapshot>/
+      page-00001.json.gz ...   one gzipped IBEX batch per page
+      inputs.json.gz           the run-wide mongo inputs, once loaded
+      meta.json                shard count and resume count
+      shard-0.done ...         written by each shard of a sharded run
+      heartbeat                touched on every page and phase boundary
+
+Every file is written to a temp name and renamed into place, so a file that
+exists is complete. Shards of a sharded run write disjoint pages into the
+same spool, so nothing is read-modify-written per page. The heartbeat's
+mtime tells a dead worker from a slow one (census.resume_stalled_census).
+
+The spool is removed when the run completes or fails.
+"""
+
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+import frappe
+
+SPOOL_DIR = "census_spool"
+
+# keep_alive's touch interval: well inside census.HEARTBEAT_STALE_SECONDS.
+KEEP_ALIVE_SECONDS = 30
+
+_PAGE_RE = re.compile(r"^page-(\d+)\.json\.gz$")
+_SHARD_RE = re.compile(r"^shard-(\d+)\.done$")
+
+
+class CensusSpool:
+	"""Checkpoint files for one census snapshot (see the module docstring)."""
+
+	def __init__(self, root):
+		self.root = str(root)
+
+	@classmethod
+	def for_snapshot(cls, snapshot_name):
+		return cls(frappe.get_site_path("private", SPOOL_DIR, snapshot_name))
+
+	def exists(self):
+		return os.path.isdir(self.root)
+
+	# ── Meta / heartbeat ──────────────────────────────────────────────────
+
+	def meta(self):
+		try:
+			with open(self._path("meta.json")) as f:
+				return json.load(f)
+		except (FileNotFoundError, ValueError):
+			return {"resumes": 0, "shard_count": 1}
+
+	def update_meta(self, **fields):
+		"""Merge `fields` into meta.json (coordinator / scheduler only, never per page).
+
+		Doesn't heartbeat: a run whose jobs are still queued has no heartbeat.
+		"""
+		os.makedirs(self.root, exist_ok=True)
+		self._write(self._path("meta.json"), json.dumps({**self.meta(), **fields}).encode())
+
+	def heartbeat(self):
+		"""Touch the heartbeat file (creating the spool)."""
+		os.makedirs(self.root, exist_ok=True)
+		with open(self._path("heartbeat"), "a"):
+			pass
+		os.utime(self._path("heartbeat"))
+
+	def touch(self):
+		"""Refresh the heartbeat if the spool still has one; never creates the spool."""
+		try:
+			os.utime(self._path("heartbeat"))
+		except FileNotFoundError:
+			pass
+
+	@contextmanager
+	def keep_alive(self, interval=KEEP_ALIVE_SECONDS):
+		"""Touch the heartbeat every `interval` seconds while the block runs.
+
+		For phases that write no pages (reduce, join, save): without it a
+		long one looks like a dead worker and gets resumed alongside itself.
+		Uses `touch`, so a spool removed inside the block stays removed.
+		"""
+		stop = threading.Event()
+
+		def tick():
+			while not stop.wait(interval):
+				self.touch()
+
+		thread = threading.Thread(target=tick, name="census-heartbeat", daemon=True)
+		thread.start()
+		try:
+			yield self
+		finally:
+			stop.set()
+			thread.join()
+
+	def last_heartbeat(self):
+		"""Epoch seconds of the last heartbeat, or None when there is no spool."""
+		try:
+			return os.path.getmtime(self._path("heartbeat"))
+		except FileNotFoundError:
+			return None
+
+	def seconds_since_heartbeat(self):
+		last = self.last_heartbeat()
+		return None if last is None else time.time() - last
+
+	def record_resume(self):
+		"""Count one resume attempt; returns the new total."""
+		resumes = self.meta().get("resumes", 0) + 1
+		self.update_meta(resumes=resumes)
+		self.heartbeat()
+		return resumes
+
+	# ── IBEX pages ────────────────────────────────────────────────────────
+
+	def committed_pages(self):
+		try:
+			names = os.listdir(self.root)
+		except FileNotFoundError:
+			return []
+		return sorted(int(m.group(1)) for m in map(_PAGE_RE.match, names) if m)
+
+	def write_page(self, page, batch):
+		"""Checkpoint one page.
+
+		Never recreates a removed spool: a run failed by a sibling shard must
+		not leave an orphaned directory behind.
+		"""
+		self._write(self._page_path(page), gzip.compress(json.dumps(batch).encode()))
+		self.heartbeat()
+
+	def read_pages(self, pages):
+		"""Yield the batches of the given page numbers, in that order."""
+		for page in pages:
+			with open(self._page_path(page), "rb") as f:
+				yield json.loads(gzip.decompress(f.read()))
+
+	# ── Shards ────────────────────────────────────────────────────────────
+
+	def mark_shard_done(self, shard):
+		self._write(self._path(f"shard-{shard}.done"), b"")
+		self.heartbeat()
+
+	def shards_done(self):
+		try:
+			names = os.listdir(self.root)
+		except FileNotFoundError:
+			return set()
+		return {int(m.group(1)) for m in map(_SHARD_RE.match, names) if m}
+
+	# ── Mongo inputs ──────────────────────────────────────────────────────
+
+	def save_inputs(self, inputs):
+		"""Checkpoint the run-wide mongo inputs (a JSON-able dict)."""
+		self._write(self._path("inputs.json.gz"), gzip.compress(json.dumps(inputs, default=str).encode()))
+		self.heartbeat()
+
+	def load_inputs(self):
+		"""The inputs an earlier attempt (or shard) saved, or None."""
+		try:
+			with open(self._path("inputs.json.gz"), "rb") as f:
+				return json.loads(gzip.decompress(f.read()))
+		except FileNotFoundError:
+			return None
+
+	def remove(self):
+		shutil.rmtree(self.root, ignore_errors=True)
+
+	# ── Internals ─────────────────────────────────────────────────────────
+
+	def _path(self, name):
+		return os.path.join(self.root, name)
+
+	def _page_path(self, page):
+		return self._path(f"page-{page:05d}.json.gz")
+
+	def _write(self, path, data):
+		tmp = f"{path}.{os.getpid()}.tmp"
+		with open(tmp, "wb") as f:
+			f.write(data)
+			f.flush()
+			os.fsync(f.fileno())
+		os.replace(tmp, path)
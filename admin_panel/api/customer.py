@@ -14,8 +14,10 @@ import frappe
 from .auth import require_admin
 from .census_core import CURRENCY_BY_ID
 from .common import handle_api_errors
+from .fanout import Fanout
 from .ibex_client import IbexClient
-from .mongo_reader import customer_bundle, find_account
+from .identity import resolve_account
+from .mongo_reader import customer_bundle
 
 __all__ = ["get_customer_detail"]
 
@@ -34,26 +36,44 @@ def get_customer_detail(query, tx_limit=25):
 	if not frappe.conf.get("customer_mongo_uri"):
 		return {"found": False, "error": "customer_mongo_uri is not configured"}
 
-	account = find_account(query)
+	account = resolve_account(query)
 	if not account:
 		return {"found": False, "query": query}
 
 	bundle = customer_bundle(account)
 	client = IbexClient()
-
-	# Live IBEX balance per wallet (wallet id == IBEX account id).
-	for wallet in bundle["wallets"]:
-		details = client.get_account_details(wallet["wallet_id"])
-		raw = details.get("balance")
-		wallet["live_balance"] = float(raw) if raw else 0.0
-		wallet["balance_not_found"] = bool(details.get("not_found"))
+	# Fetch the access token once, up front, so the parallel branches below
+	# share it instead of each requesting their own (the client is thread-safe).
+	client.ensure_token()
 
 	# Recent transactions for the default wallet (fall back to the first wallet).
 	default_wallet_id = bundle["identity"].get("default_wallet_id")
 	tx_wallet = default_wallet_id or (bundle["wallets"][0]["wallet_id"] if bundle["wallets"] else None)
-	transactions = []
-	if tx_wallet:
-		for tx in client.get_account_transactions(tx_wallet, limit=tx_limit):
+
+	# Live IBEX balance per wallet (wallet id == IBEX account id) and the
+	# transaction page are independent reads — run them side by side. One
+	# wallet's balance failing no longer blanks the whole panel.
+	with Fanout() as reads:
+		for wallet in bundle["wallets"]:
+			reads.submit(f"balance:{wallet['wallet_id']}", client.get_account_details, wallet["wallet_id"])
+		if tx_wallet:
+			reads.submit("transactions", client.get_account_transactions, tx_wallet, limit=tx_limit)
+
+		for wallet in bundle["wallets"]:
+			branch = f"balance:{wallet['wallet_id']}"
+			error = reads.error(branch)
+			if error is not None:
+				wallet["live_balance"] = None
+				wallet["balance_not_found"] = False
+				wallet["balance_error"] = str(error)
+				continue
+			details = reads.result(branch)
+			raw = details.get("balance")
+			wallet["live_balance"] = float(raw) if raw else 0.0
+			wallet["balance_not_found"] = bool(details.get("not_found"))
+
+		transactions = []
+		for tx in reads.get("transactions", []) if tx_wallet else []:
 			transactions.append(
 				{
 					"id": tx.get("id"),
@@ -64,6 +84,7 @@ def get_customer_detail(query, tx_limit=25):
 					"type_id": tx.get("transactionTypeId"),
 				}
 			)
+		degraded = reads.failures()
 
 	return {
 		"found": True,
@@ -74,4 +95,6 @@ def get_customer_detail(query, tx_limit=25):
 		"contacts": bundle["contacts"],
 		"transactions": transactions,
 		"tx_wallet_id": tx_wallet,
+		"transactions_error": degraded.get("transactions"),
+		"degraded": degraded,
 	}
@@ -0,0 +1,201 @@
+"""Stale-while-revalidate + single-flight caching for live overview endpoints.
+
+Pages like Bridge KYC, Referral Rewards and System Accounts recompute an
+expensive upstream sweep (mongo loads, IBEX balance fan-out) on every load.
+When several operators open them at once, each request used to redo the same
+work. `swr_cached` puts one shared redis entry in front of such an endpoint:
+
+  * fresh entry  — served as-is.
+  * stale entry  — served immediately while ONE background job recomputes it
+                   (the refresh lock keeps concurrent callers from enqueueing
+                   duplicates).
+  * miss / too old / forced — single-flight: the caller holding the lock
+                   computes; concurrent callers wait briefly for its result
+                   instead of starting their own sweep.
+
+Every cached payload carries a `cache` block ({computed_at, served_at,
+age_seconds, stale, refreshing}) so the page can show how old the data is.
+Results with `success: False`, or flagged `syncing` (an endpoint answering
+with a placeholder while its data is first backfilled), are never cached.
+
+Stack it innermost, under the auth + error decorators, so role checks still
+run per call:
+
+    @frappe.whitelist()
+    @require_admin()
+    @handle_api_errors
+    @swr_cached(fresh_seconds=30)
+    def get_overview(): ...
+
+A caller forces a recompute by sending `refresh=1` with the request (read
+from form_dict, so the endpoint signature stays unchanged).
+"""
+
+import functools
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+
+import frappe
+from frappe.utils import cint
+
+_KEY_PREFIX = "admin_panel:swr"
+
+# How long a caller that lost the single-flight race waits for the winner's
+# result before computing on its own (and how often it looks).
+WAIT_SECONDS = 20.0
+WAIT_POLL_SECONDS = 0.25
+
+# Undecorated endpoint bodies, by dotted path — the background refresh job
+# calls these directly so it never re-enters the cache (or auth) wrappers.
+_REGISTRY = {}
+
+
+def entry_state(entry, now, fresh_seconds, max_stale_seconds):
+	"""Classify a cache entry: "miss", "fresh", "stale" (servable) or "expired"."""
+	if not entry:
+		return "miss"
+	age = now - entry["computed_at"]
+	if age < fresh_seconds:
+		return "fresh"
+	if age < max_stale_seconds:
+		return "stale"
+	return "expired"
+
+
+def _iso(ts):
+	return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _cache_key(path, args, kwargs):
+	raw = json.dumps([args, kwargs], sort_keys=True, default=str)
+	return f"{_KEY_PREFIX}:{path}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def _acquire(cache, lock_key, seconds):
+	"""SET NX on the (site-namespaced) lock key — True if this caller owns it."""
+	return bool(cache.set(cache.make_key(lock_key), 1, nx=True, ex=max(1, int(seconds))))
+
+
+def _release(cache, lock_key):
+	cache.delete(cache.make_key(lock_key))
+
+
+def _store(cache, key, payload, max_stale_seconds):
+	entry = {"computed_at": time.time(), "payload": payload}
+	cache.set_value(key, entry, expires_in_sec=int(max_stale_seconds))
+	return entry
+
+
+def _cacheable(payload):
+	if not isinstance(payload, dict):
+		return True
+	return payload.get("success") is not False and not payload.get("syncing")
+
+
+def _with_meta(entry, now, state, refreshing):
+	payload = entry["payload"]
+	if not isinstance(payload, dict):
+		return payload
+	out = dict(payload)
+	out["cache"] = {
+		"computed_at": _iso(entry["computed_at"]),
+		"served_at": _iso(now),
+		"age_seconds": round(max(now - entry["computed_at"], 0.0), 1),
+		"stale": state == "stale",
+		"refreshing": refreshing,
+	}
+	return out
+
+
+def _force_refresh():
+	form_dict = getattr(frappe, "form_dict", None) or {}
+	return bool(cint(form_dict.get("refresh")))
+
+
+def swr_cached(fresh_seconds=30, max_stale_seconds=600, lock_seconds=120):
+	"""Decorator: serve `func` through a shared stale-while-revalidate cache.
+
+	Args:
+	    fresh_seconds: age below which an entry is served without refreshing.
+	    max_stale_seconds: age up to which a stale entry is still served (and
+	        the redis TTL); older entries are recomputed inline.
+	    lock_seconds: single-flight lock TTL — bounds how long a crashed
+	        computation can block others. Keep it above the worst-case runtime.
+	"""
+
+	def decorator(func):
+		path = f"{func.__module__}.{func.__name__}"
+		_REGISTRY[path] = func
+
+		@functools.wraps(func)
+		def wrapper(*args, **kwargs):
+			cache = frappe.cache()
+			key = _cache_key(path, args, kwargs)
+			lock_key = f"{key}:lock"
+			now = time.time()
+			entry = None if _force_refresh() else cache.get_value(key)
+			state = entry_state(entry, now, fresh_seconds, max_stale_seconds)
+
+			if state == "fresh":
+				return _with_meta(entry, now, state, refreshing=False)
+			if state == "stale":
+				refreshing = _acquire(cache, lock_key, lock_seconds)
+				if refreshing:
+					frappe.enqueue(
+						"admin_panel.api.endpoint_cache.refresh_entry",
+						queue="short",
+						path=path,
+						key=key,
+						lock_key=lock_key,
+						call_args=list(args),
+						call_kwargs=kwargs,
+						max_stale_seconds=max_stale_seconds,
+					)
+				return _with_meta(entry, now, state, refreshing=True)
+
+			# Miss, expired or forced: one caller computes, the rest wait for it.
+			if not _acquire(cache, lock_key, lock_seconds):
+				started = time.time()
+				deadline = started + min(WAIT_SECONDS, lock_seconds)
+				while time.time() < deadline:
+					time.sleep(WAIT_POLL_SECONDS)
+					waited = cache.get_value(key)
+					if waited and waited["computed_at"] >= started:
+						return _with_meta(waited, time.time(), "fresh", refreshing=False)
+				# The winner is slow or died — don't leave this caller empty-handed.
+				payload = func(*args, **kwargs)
+				if not _cacheable(payload):
+					return payload
+				return _with_meta(_store(cache, key, payload, max_stale_seconds), time.time(), "fresh", False)
+
+			try:
+				payload = func(*args, **kwargs)
+				if not _cacheable(payload):
+					return payload
+				entry = _store(cache, key, payload, max_stale_seconds)
+			finally:
+				_release(cache, lock_key)
+			return _with_meta(entry, time.time(), "fresh", refreshing=False)
+
+		return wrapper
+
+	return decorator
+
+
+def refresh_entry(path, key, lock_key, call_args, call_kwargs, max_stale_seconds):
+	"""Background job: recompute one stale entry, then drop the refresh lock."""
+	cache = frappe.cache()
+	try:
+		func = _REGISTRY.get(path)
+		if func is None:
+			# A fresh worker hasn't imported the endpoint module yet — importing
+			# it runs the decorator, which registers the body.
+			frappe.get_attr(path)
+			func = _REGISTRY[path]
+		payload = func(*call_args, **call_kwargs)
+		if _cacheable(payload):
+			_store(cache, key, payload, max_stale_seconds)
+	finally:
+		_release(cache, lock_key)
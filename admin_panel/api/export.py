@@ -0,0 +1,231 @@
+"""Streaming CSV / Parquet exports for finance.
+
+Before this, the only way to get census rows out was the browser pulling
+`get_latest_census` in full and building a CSV client-side, and the queues
+had no export at all. Each endpoint here returns a werkzeug Response over a
+generator (export_core), which Frappe hands to the WSGI server as is, so
+rows are encoded and sent one chunk at a time:
+
+  * export_census — a completed snapshot's rows, optionally one bucket,
+    parsed incrementally out of the stored (compressed) payload
+    (census_core.iter_payload_items), never decoded as a whole.
+  * export_cashouts / export_bridge_transfers — the queue tables, oldest
+    first, read EXPORT_PAGE_ROWS at a time with keyset pagination on
+    (creation, name). The body streams after Frappe has torn the request
+    down (frappe.destroy), so the generator opens a connection of its own
+    (_export_connection) and reads every page in one read-only, consistent
+    snapshot transaction.
+
+`fmt=parquet` needs pyarrow (optional); without it the endpoints answer an
+error instead of a file.
+"""
+
+from contextlib import contextmanager
+
+import frappe
+from werkzeug.wrappers import Response
+
+from .auth import require_admin
+from .census import _latest_snapshot_name
+from .census_core import iter_payload_items
+from .common import handle_api_errors
+from .export_core import EXPORT_CHUNK_ROWS, csv_chunks, parquet_available, parquet_chunks
+
+# Rows per queue query; one chunk of output per page.
+EXPORT_PAGE_ROWS = EXPORT_CHUNK_ROWS
+
+EXPORT_FORMATS = {
+	"csv": (csv_chunks, "text/csv; charset=utf-8", "csv"),
+	"parquet": (parquet_chunks, "application/vnd.apache.parquet", "parquet"),
+}
+
+CENSUS_EXPORT_COLUMNS = [
+	("username", "string"),
+	("account_id", "string"),
+	("wallet_id", "string"),
+	("currency", "string"),
+	("balance", "float"),
+	("status", "string"),
+	("level", "string"),
+	("role", "string"),
+	("is_system", "bool"),
+	("migration_status", "string"),
+	("run_id", "string"),
+	("migrated", "bool"),
+	("is_default_wallet", "bool"),
+	("created_at", "string"),
+	("buckets", "string"),
+]
+
+CASHOUT_EXPORT_COLUMNS = [
+	("name", "string"),
+	("creation", "string"),
+	("status", "string"),
+	("customer", "string"),
+	("bank_account", "string"),
+	("transaction_id", "string"),
+	("currency", "string"),
+	("user_pays", "float"),
+	("flash_fee", "float"),
+	("user_receives", "float"),
+	("exchange_rate", "float"),
+	("wallet_id", "string"),
+	("flash_wallet", "string"),
+	("journal_entry", "string"),
+	("payment_journal_entry", "string"),
+	("docstatus", "int"),
+]
+
+# Amount fields are Data columns on Bridge Transfer Request, so strings here.
+BRIDGE_TRANSFER_EXPORT_COLUMNS = [
+	("name", "string"),
+	("creation", "string"),
+	("request_id", "string"),
+	("transaction_type", "string"),
+	("status", "string"),
+	("provider", "string"),
+	("asset", "string"),
+	("network", "string"),
+	("amount", "string"),
+	("currency", "string"),
+	("developer_fee", "string"),
+	("initial_amount", "string"),
+	("subtotal_amount", "string"),
+	("final_amount", "string"),
+	("processor_fee", "string"),
+	("flash_fee", "string"),
+	("account_id", "string"),
+	("wallet_id", "string"),
+	("bridge_customer_id", "string"),
+	("bridge_transfer_id", "string"),
+	("ibex_tx_hash", "string"),
+	("source_event_type", "string"),
+	("first_seen_at", "string"),
+	("last_seen_at", "string"),
+	("failure_reason", "string"),
+]
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def export_census(snapshot=None, bucket=None, fmt="csv"):
+	"""A completed census snapshot's rows (default: the latest), optionally one bucket."""
+	error = _format_error(fmt)
+	if error:
+		return error
+	name = snapshot or _latest_snapshot_name(status="Complete")
+	if not name:
+		return {"success": False, "error": "No completed census to export"}
+	stored = frappe.db.get_value("Wallet Census Snapshot", name, ["status", "rows_json"], as_dict=True)
+	if not stored or stored.status != "Complete":
+		return {"success": False, "error": f"Snapshot {name} is not a completed census"}
+	rows = iter_payload_items(stored.rows_json)
+	if bucket:
+		rows = (row for row in rows if bucket in (row.get("buckets") or ()))
+	rows = ({**row, "buckets": " ".join(row.get("buckets") or ())} for row in rows)
+	suffix = f"-{bucket}" if bucket else ""
+	return _stream(rows, CENSUS_EXPORT_COLUMNS, fmt, f"wallet-census-{name}{suffix}")
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def export_cashouts(status=None, fmt="csv"):
+	"""Every Cashout (optionally one doctype status), oldest first."""
+	error = _format_error(fmt)
+	if error:
+		return error
+	filters = {"status": status} if status else {}
+	rows = _iter_table("Cashout", CASHOUT_EXPORT_COLUMNS, filters)
+	return _stream(rows, CASHOUT_EXPORT_COLUMNS, fmt, "cashouts")
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def export_bridge_transfers(status=None, transaction_type=None, provider=None, fmt="csv"):
+	"""Every Bridge Transfer Request matching the filters, oldest first.
+
+	raw_payload_json is left out: it is large and the list already links
+	each row to its document.
+	"""
+	error = _format_error(fmt)
+	if error:
+		return error
+	filters = {"status": status, "transaction_type": transaction_type, "provider": provider}
+	filters = {field: value for field, value in filters.items() if value}
+	rows = _iter_table("Bridge Transfer Request", BRIDGE_TRANSFER_EXPORT_COLUMNS, filters)
+	return _stream(rows, BRIDGE_TRANSFER_EXPORT_COLUMNS, fmt, "bridge-transfer-requests")
+
+
+def _format_error(fmt):
+	if fmt not in EXPORT_FORMATS:
+		return {"success": False, "error": f"Unsupported export format: {fmt}"}
+	if fmt == "parquet" and not parquet_available():
+		return {"success": False, "error": "Parquet export needs pyarrow on the server; use fmt=csv"}
+	return None
+
+
+def _stream(rows, columns, fmt, basename):
+	writer, mimetype, extension = EXPORT_FORMATS[fmt]
+	stamp = frappe.utils.now_datetime().strftime("%Y%m%d-%H%M%S")
+	response = Response(writer(rows, columns), mimetype=mimetype, direct_passthrough=True)
+	response.headers["Content-Disposition"] = f'attachment; filename="{basename}-{stamp}.{extension}"'
+	response.headers["Cache-Control"] = "no-store"
+	return response
+
+
+def _iter_table(doctype, columns, filters):
+	"""Rows of `doctype` matching equality `filters`, oldest first, EXPORT_PAGE_ROWS per query.
+
+	Call while the request is live (it records the site); iterate afterwards.
+	"""
+	return _table_rows(frappe.local.site, frappe.local.sites_path, doctype, columns, filters)
+
+
+@contextmanager
+def _export_connection(site, sites_path):
+	"""A site connection for a streaming body, in one consistent read-only snapshot."""
+	frappe.init(site=site, sites_path=sites_path)
+	try:
+		frappe.connect()
+		frappe.db.sql("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+		frappe.db.sql("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+		yield
+	finally:
+		frappe.destroy()
+
+
+def _table_rows(site, sites_path, doctype, columns, filters):
+	with _export_connection(site, sites_path):
+		yield from _keyset_pages(doctype, columns, filters)
+
+
+def _keyset_pages(doctype, columns, filters):
+	fields = ", ".join(f"`{name}`" for name, _ in columns)
+	conditions = [f"`{field}` = %({field})s" for field in filters]
+	values = dict(filters, limit=EXPORT_PAGE_ROWS)
+	after = None
+	while True:
+		page_conditions = list(conditions)
+		if after:
+			page_conditions.append("(`creation`, `name`) > (%(after_creation)s, %(after_name)s)")
+			values["after_creation"], values["after_name"] = after
+		rows = frappe.db.sql(
+			f"""
+			SELECT {fields}
+			FROM `tab{doctype}`
+			{"WHERE " + " AND ".join(page_conditions) if page_conditions else ""}
+			ORDER BY `creation`, `name`
+			LIMIT %(limit)s
+			""",
+			values,
+			as_dict=True,
+		)
+		for row in rows:
+			row["creation"] = str(row["creation"])
+			yield row
+		if len(rows) < EXPORT_PAGE_ROWS:
+			return
+		after = (rows[-1]["creation"], rows[-1]["name"])
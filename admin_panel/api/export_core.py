@@ -0,0 +1,140 @@
+"""Pure chunked CSV / Parquet writers behind the streaming exports.
+
+No frappe or IO imports (unit-tested directly). Both writers take an
+iterable of row dicts and a list of (name, type) columns and yield encoded
+bytes one chunk of rows at a time, so an export holds one chunk in memory
+however many rows it has. `type` is one of COLUMN_TYPES; CSV ignores it,
+Parquet uses it for the schema (a column that is empty in the first chunk
+still gets its real type).
+
+Parquet needs `pyarrow`, which is optional: `parquet_available()` says
+whether this host can write it.
+"""
+
+import csv
+import importlib.util
+import io
+import itertools
+
+EXPORT_CHUNK_ROWS = 1000
+
+COLUMN_TYPES = ("string", "float", "int", "bool")
+
+# A cell starting with one of these is a formula to Excel / Sheets (the
+# census page's CSV export applies the same guard).
+_FORMULA_PREFIXES = ("=", "+", "-", "@")
+
+
+def csv_cell(value):
+	"""The CSV text of one value: "" for None, formula-shaped strings quoted."""
+	if value is None:
+		return ""
+	if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+		return "'" + value
+	return value
+
+
+def csv_chunks(rows, columns, chunk_rows=EXPORT_CHUNK_ROWS):
+	"""Yield the UTF-8 CSV of `rows`: the header, then one chunk per `chunk_rows` rows."""
+	names = [name for name, _ in columns]
+	buffer = io.StringIO()
+	writer = csv.writer(buffer, lineterminator="\n")
+	writer.writerow(names)
+	for chunk in _chunks(rows, chunk_rows):
+		writer.writerows([csv_cell(row.get(name)) for name in names] for row in chunk)
+		yield _drain(buffer).encode()
+	tail = _drain(buffer)
+	if tail:  # no rows: just the header
+		yield tail.encode()
+
+
+def parquet_available():
+	return importlib.util.find_spec("pyarrow") is not None
+
+
+def parquet_chunks(rows, columns, chunk_rows=EXPORT_CHUNK_ROWS):
+	"""Yield a Parquet file of `rows`, one row group per `chunk_rows` rows.
+
+	Raises ImportError when pyarrow isn't installed (see parquet_available).
+	"""
+	import pyarrow as pa
+	import pyarrow.parquet as pq
+
+	arrow_types = {"string": pa.string(), "float": pa.float64(), "int": pa.int64(), "bool": pa.bool_()}
+	schema = pa.schema([(name, arrow_types[kind]) for name, kind in columns])
+	casts = {name: _CASTS[kind] for name, kind in columns}
+	sink = _ChunkSink()
+	with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema) as writer:
+		for chunk in _chunks(rows, chunk_rows):
+			data = {name: [_cast(casts[name], row.get(name)) for row in chunk] for name in casts}
+			writer.write_table(pa.Table.from_pydict(data, schema=schema))
+			yield sink.take()
+	yield sink.take()  # footer
+
+
+def parse_bool(value):
+	"""A bool column value: "0" / "false" / "no" (any case) are False, not truthy strings."""
+	if isinstance(value, str):
+		text = value.strip().lower()
+		if text in _FALSE_TEXT:
+			return False
+		if text in _TRUE_TEXT:
+			return True
+		raise ValueError(f"not a boolean: {value!r}")
+	return bool(value)
+
+
+_FALSE_TEXT = {"0", "false", "no", "off"}
+_TRUE_TEXT = {"1", "true", "yes", "on"}
+
+_CASTS = {"string": str, "float": float, "int": int, "bool": parse_bool}
+
+
+def _cast(cast, value):
+	return None if value is None or value == "" else cast(value)
+
+
+def _chunks(rows, size):
+	rows = iter(rows)
+	while chunk := list(itertools.islice(rows, size)):
+		yield chunk
+
+
+def _drain(buffer):
+	text = buffer.getvalue()
+	buffer.seek(0)
+	buffer.truncate()
+	return text
+
+
+class _ChunkSink:
+	"""Write-only file that hands its bytes out by chunk.
+
+	`tell()` keeps counting across `take()`s: the Parquet footer records
+	absolute offsets of every row group.
+	"""
+
+	closed = False
+
+	def __init__(self):
+		self._parts = []
+		self._position = 0
+
+	def write(self, data):
+		self._parts.append(bytes(data))
+		self._position += len(data)
+		return len(data)
+
+	def tell(self):
+		return self._position
+
+	def flush(self):
+		pass
+
+	def close(self):
+		self.closed = True
+
+	def take(self):
+		data = b"".join(self._parts)
+		self._parts = []
+		return data
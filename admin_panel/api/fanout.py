@@ -0,0 +1,129 @@
+"""Run independent upstream reads side by side inside one request.
+
+Composite endpoints (referral overview, Bridge KYC overview, customer detail,
+the Banking tab) used to make their mongo / IBEX / Bridge calls one after
+another, so the page waited for the sum of them. `Fanout` starts each
+independent read on a small thread pool and lets the endpoint collect them
+by name, so it waits for the slowest branch instead:
+
+    with Fanout(timeout=15) as reads:
+        reads.submit("groups", load_invite_groups)
+        reads.submit("balance", _rewards_wallet_balance, timeout=5)
+        groups = reads.result("groups")          # re-raises the branch's error
+        balance = reads.get("balance")           # None if it failed / timed out
+        degraded = reads.failures()              # {"balance": "timed out after 5s"}
+
+Every branch has its own deadline, counted from submit. A branch that misses
+it is reported as `BranchTimeout` and abandoned — a thread can't be killed,
+but the mongo / requests clients carry their own socket timeouts, so it
+finishes on its own shortly after.
+
+Branches run in a copy of the submitting context, so `frappe.local` state
+that lives in context variables (site conf, cache, logger) is visible to
+them. The request's database connection is NOT safe to share: keep every
+`frappe.db` / `frappe.get_all` call on the request thread and submit only
+mongo and HTTP reads.
+
+Pure stdlib (no frappe import) so it is unit-testable on its own.
+"""
+
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+# Default per-branch deadline (seconds). Endpoints pass tighter ones for
+# best-effort extras such as a single balance lookup.
+DEFAULT_TIMEOUT = 20.0
+
+# Upper bound on threads per request; branches beyond it queue (their
+# deadline still runs from submit).
+MAX_WORKERS = 8
+
+
+class BranchTimeout(TimeoutError):
+	"""A branch did not finish within its deadline."""
+
+
+class Fanout:
+	"""Named, independently-timed parallel reads. Use as a context manager."""
+
+	def __init__(self, timeout=DEFAULT_TIMEOUT, max_workers=MAX_WORKERS):
+		self.timeout = timeout
+		self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="admin-fanout")
+		self._branches = {}
+		self._outcomes = {}
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+		return False
+
+	def close(self):
+		"""Stop accepting work; never blocks on a branch that overran."""
+		self._executor.shutdown(wait=False, cancel_futures=True)
+
+	def submit(self, name, fn, *args, timeout=None, **kwargs):
+		"""Start `fn(*args, **kwargs)` as branch `name` (names are unique)."""
+		if name in self._branches:
+			raise ValueError(f"duplicate fanout branch: {name}")
+		limit = self.timeout if timeout is None else timeout
+		# One context copy per branch — a Context can only be entered by one
+		# thread at a time.
+		ctx = contextvars.copy_context()
+		future = self._executor.submit(ctx.run, fn, *args, **kwargs)
+		self._branches[name] = (future, time.monotonic() + limit, limit)
+		return self
+
+	def done(self, *names):
+		"""Whether the named branches (default: all) have finished; never waits."""
+		return all(self._branches[name][0].done() for name in names or self._branches)
+
+	def _outcome(self, name):
+		"""(value, error) for one branch, waiting up to its deadline once."""
+		if name not in self._outcomes:
+			future, deadline, limit = self._branches[name]
+			try:
+				self._outcomes[name] = (future.result(timeout=max(deadline - time.monotonic(), 0.0)), None)
+			except FutureTimeout:
+				future.cancel()
+				self._outcomes[name] = (None, BranchTimeout(f"{name} timed out after {limit:g}s"))
+			except Exception as exc:
+				self._outcomes[name] = (None, exc)
+		return self._outcomes[name]
+
+	def result(self, name):
+		"""The branch's value; re-raises its exception (or BranchTimeout)."""
+		value, error = self._outcome(name)
+		if error is not None:
+			raise error
+		return value
+
+	def pop(self, name):
+		"""result(name), then forget the branch (keeps a long-lived fanout's
+		memory flat)."""
+		try:
+			return self.result(name)
+		finally:
+			self._branches.pop(name, None)
+			self._outcomes.pop(name, None)
+
+	def get(self, name, default=None):
+		"""The branch's value, or `default` if it failed or timed out."""
+		value, error = self._outcome(name)
+		return default if error is not None else value
+
+	def error(self, name):
+		"""The branch's exception (None on success)."""
+		return self._outcome(name)[1]
+
+	def failures(self):
+		"""{branch name: error message} for every failed / timed-out branch."""
+		out = {}
+		for name in self._branches:
+			error = self.error(name)
+			if error is not None:
+				out[name] = str(error) or type(error).__name__
+		return out
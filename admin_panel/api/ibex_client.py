@@ -17,8 +17,13 @@ Config (site_config.json / frappe.conf):
   ibex_environment                             (optional, "production" | "sandbox";
                                                 default "production" — URLs baked in)
   ibex_auth_domain, ibex_hub_url, ibex_audience(optional per-field overrides)
+
+One client may be shared by concurrent threads (e.g. Fanout branches): the
+token and the stats counters are guarded by a lock, and each thread sends
+through its own requests Session.
 """
 
+import threading
 import time
 
 import frappe
@@ -56,14 +61,16 @@ RATE_LIMIT_BACKOFF_SECONDS = 2.0
 # paging forever (10k pages * 100/page = 1M accounts, far above org size).
 MAX_PAGES = 10000
 
-_session = None
+# One Session (connection pool) per thread: requests does not promise a
+# Session is safe to share across threads.
+_sessions = threading.local()
 
 
 def _get_session() -> requests.Session:
-	global _session
-	if _session is None:
-		_session = requests.Session()
-	return _session
+	session = getattr(_sessions, "session", None)
+	if session is None:
+		session = _sessions.session = requests.Session()
+	return session
 
 
 class IbexError(Exception):
@@ -97,12 +104,29 @@ class IbexClient:
 		if missing:
 			raise ValueError(f"IBEX config missing from site_config.json: {', '.join(missing)}")
 
-		self._session = _get_session()
 		self._token = None
 		self._token_expires_at = 0.0
+		self._lock = threading.Lock()
+		# Upstream call counters, read by the census run metrics.
+		self.stats = {"requests": 0, "retries": 0, "rate_limited": 0}
+
+	@property
+	def _session(self) -> requests.Session:
+		return _get_session()
+
+	def ensure_token(self) -> None:
+		"""Fetch the access token now unless a valid one is cached.
+
+		Call before handing the client to parallel branches so they share one
+		token instead of racing to request their own. Thread-safe.
+		"""
+		self._get_token()
 
 	def _fetch_token(self) -> str:
-		"""Fetch a fresh client-credentials access token and cache it to its TTL."""
+		"""Fetch a fresh client-credentials access token and cache it to its TTL.
+
+		Callers hold self._lock.
+		"""
 		resp = self._session.post(
 			f"{self.auth_domain}/oauth/token",
 			data={
@@ -126,9 +150,22 @@ class IbexClient:
 		return token
 
 	def _get_token(self) -> str:
-		if not self._token or time.time() >= self._token_expires_at:
-			return self._fetch_token()
-		return self._token
+		with self._lock:
+			if not self._token or time.time() >= self._token_expires_at:
+				return self._fetch_token()
+			return self._token
+
+	def _refresh_token(self, rejected: str) -> str:
+		"""A new token after `rejected` got a 401 (only one thread refetches)."""
+		with self._lock:
+			if self._token == rejected:
+				return self._fetch_token()
+			return self._token
+
+	def _count(self, *names: str) -> None:
+		with self._lock:
+			for name in names:
+				self.stats[name] += 1
 
 	def _get(self, path: str, params: dict, allow_not_found: bool = False) -> requests.Response:
 		"""GET with a raw-token Authorization header.
@@ -138,13 +175,15 @@ class IbexClient:
 		caller instead of raising (drained IBEX accounts can 404 on reads).
 		"""
 		url = f"{self.hub_url}{path}"
-		resp = self._session.get(url, params=params, headers={"Authorization": self._get_token()}, timeout=30)
+		self._count("requests")
+		token = self._get_token()
+		resp = self._session.get(url, params=params, headers={"Authorization": token}, timeout=30)
 		if resp.status_code == 401:
-			self._fetch_token()
-			resp = self._session.get(
-				url, params=params, headers={"Authorization": self._get_token()}, timeout=30
-			)
+			token = self._refresh_token(token)
+			self._count("retries")
+			resp = self._session.get(url, params=params, headers={"Authorization": token}, timeout=30)
 		if resp.status_code == 429:
+			self._count("rate_limited", "retries")
 			time.sleep(RATE_LIMIT_BACKOFF_SECONDS)
 			resp = self._session.get(
 				url, params=params, headers={"Authorization": self._get_token()}, timeout=30
@@ -176,11 +215,11 @@ class IbexClient:
 		Never add a NEW write here without matching one of these two tiers.
 		"""
 		url = f"{self.hub_url}{path}"
-		headers = {"Authorization": self._get_token()}
+		token = self._get_token()
+		headers = {"Authorization": token}
 		resp = self._session.post(url, json=body, headers=headers, timeout=30)
 		if resp.status_code == 401:
-			self._fetch_token()
-			headers = {"Authorization": self._get_token()}
+			headers = {"Authorization": self._refresh_token(token)}
 			resp = self._session.post(url, json=body, headers=headers, timeout=30)
 		if resp.status_code == 429:
 			time.sleep(RATE_LIMIT_BACKOFF_SECONDS)
@@ -279,19 +318,28 @@ class IbexClient:
 		accounts_seen) is called after each page so the caller can persist
 		scan progress for the UI.
 		"""
+		seen = 0
+		for page, batch in self.iter_account_pages():
+			for account in batch:
+				seen += 1
+				yield account
+			if progress_cb:
+				progress_cb(page, seen)
+
+	def iter_account_pages(self, start_page=1, step=1):
+		"""Yield (page_number, batch) for every org account page from `start_page`.
+
+		The page-level form of iter_all_accounts, for callers that checkpoint
+		each page (the census resumes a crashed sweep part-way through) or
+		sweep one shard's stride of pages (`step`).
+		"""
 
 		def fetch(page):
-			if page > 1:
+			if page > start_page:
 				time.sleep(REQUEST_INTERVAL_SECONDS)
 			return self.list_accounts_page(page, PAGE_LIMIT)
 
-		seen = 0
 		try:
-			for page, batch in sweep_pages(fetch, MAX_PAGES):
-				for account in batch:
-					seen += 1
-					yield account
-				if progress_cb:
-					progress_cb(page, seen)
+			yield from sweep_pages(fetch, MAX_PAGES, start_page=start_page, step=step)
 		except PageLimitExceeded as exc:
 			raise IbexError(str(exc)) from exc
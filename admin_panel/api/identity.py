@@ -0,0 +1,172 @@
+"""Account identity resolution with a shared in-process cache.
+
+Account Hub, the transfer audit tabs, cashouts and the census detail panel
+all turn an operator-supplied handle into an account, each in its own way.
+This module is the one front door for them, backed by one multi-key cache
+(identity_core.IdentityCache) per worker process:
+
+  * resolve_account / resolve_accounts — mongo account docs by any handle
+    find_account accepts (_id, username, uuid, phone, wallet id), batched;
+    phones resolve through the normalized phone index (phone_index).
+  * resolve_payer_identities — the transfer-tab identity rows
+    (mongo_reader.load_payer_identities), batched.
+  * lookup_flash_account — Flash GraphQL AccountDetail by username /
+    phone / email / id (Account Hub smart search, cashout matching).
+
+Every handle a resolved account answers to points at the same entry, so a
+search by username also warms the phone, uuid and _id lookups. Only hits are
+cached. Endpoints that change an account in Flash call `invalidate` with its
+handles so the next read goes upstream — on every worker: invalidations are
+appended to a sequence-numbered log in redis, and each worker replays what it
+hasn't seen (one GET of the counter per lookup) before reading its own cache.
+"""
+
+import threading
+
+import frappe
+
+from .identity_core import IdentityCache, account_handles, flash_account_handles, pending_invalidations
+from .mongo_reader import find_accounts, load_payer_identities
+from .phone_index import flash_user_ids_for_phone
+
+# Mongo docs change rarely (bridgeCustomerId / erpParty get linked), GraphQL
+# account details carry status + level that operators edit from Account Hub.
+ACCOUNT_TTL_SECONDS = 120
+FLASH_TTL_SECONDS = 60
+MAX_ENTRIES = 5000
+
+_cache = IdentityCache(ttl_seconds=ACCOUNT_TTL_SECONDS, max_entries=MAX_ENTRIES)
+
+# Cross-worker invalidation log: a counter and a sorted set of "seq:handle"
+# members scored by seq. Entries live ACCOUNT_TTL_SECONDS at most, so only
+# recent invalidations matter; a worker that falls further behind than the
+# retained tail clears its cache instead.
+INVALIDATION_SEQ_KEY = "admin_panel:identity:invalidation_seq"
+INVALIDATION_LOG_KEY = "admin_panel:identity:invalidations"
+INVALIDATION_LOG_RETAIN = 1000
+
+_seen = None  # last invalidation seq applied to _cache
+_sync_lock = threading.Lock()
+
+_FLASH_LOOKUPS = {
+	"username": "get_account_by_username",
+	"phone": "get_account_by_phone",
+	"email": "get_account_by_email",
+	"id": "get_account_by_id",
+}
+
+
+def _clean(handle):
+	return str(handle).strip() if handle else ""
+
+
+def resolve_accounts(handles) -> dict:
+	"""{handle: mongo account doc} for every handle that resolves (read-only docs)."""
+	_sync_invalidations()
+	out, misses = {}, []
+	for handle in dict.fromkeys(_clean(h) for h in handles):
+		if not handle:
+			continue
+		account = _cache.get("mongo", handle)
+		if account is None:
+			misses.append(handle)
+		else:
+			out[handle] = account
+	if misses:
+		phone_owners = {}
+		for handle in misses:
+			owners = flash_user_ids_for_phone(handle)
+			if owners:
+				phone_owners[handle] = owners
+		for handle, account in find_accounts(misses, phone_owners=phone_owners).items():
+			# The query itself (a phone spelling or wallet id) becomes a key too.
+			_cache.put("mongo", [*account_handles(account), handle], account)
+			out[handle] = account
+	return out
+
+
+def resolve_account(handle):
+	"""Cached mongo_reader.find_account."""
+	handle = _clean(handle)
+	return resolve_accounts([handle]).get(handle) if handle else None
+
+
+def resolve_payer_identities(account_refs, usernames) -> dict:
+	"""Cached mongo_reader.load_payer_identities (same keys and values)."""
+	account_refs = [_clean(r) for r in account_refs or [] if _clean(r)]
+	usernames = [_clean(u) for u in usernames or [] if _clean(u)]
+	_sync_invalidations()
+	out = {}
+	for handle in (*account_refs, *usernames):
+		identity = _cache.get("payer", handle)
+		if identity is not None:
+			out[handle] = identity
+	miss_refs = [r for r in account_refs if r not in out]
+	miss_names = [u for u in usernames if u not in out]
+	if miss_refs or miss_names:
+		fresh = load_payer_identities(miss_refs, miss_names)
+		by_account = {}
+		for handle, identity in fresh.items():
+			by_account.setdefault(identity["account_id"], (identity, []))[1].append(handle)
+		for identity, handles in by_account.values():
+			_cache.put("payer", handles, identity)
+		out.update(fresh)
+	return out
+
+
+def lookup_flash_account(client, kind, value):
+	"""Cached GraphQLClient.get_account_by_<kind> (kind: username/phone/email/id)."""
+	value = _clean(value)
+	if not value:
+		return None
+	_sync_invalidations()
+	account = _cache.get("flash", value)
+	if account is not None:
+		return account
+	account = getattr(client, _FLASH_LOOKUPS[kind])(value)
+	if account:
+		_cache.put("flash", [*flash_account_handles(account), value], account, ttl_seconds=FLASH_TTL_SECONDS)
+	return account
+
+
+def invalidate(*handles):
+	"""Drop every cached entry answering to any of `handles` (after a write), on every worker."""
+	handles = [h for h in dict.fromkeys(_clean(h) for h in handles) if h]
+	if not handles:
+		return
+	for handle in handles:
+		_cache.invalidate(handle)
+	cache = frappe.cache()
+	last = cache.incrby(cache.make_key(INVALIDATION_SEQ_KEY), len(handles))
+	first = last - len(handles) + 1
+	log_key = cache.make_key(INVALIDATION_LOG_KEY)
+	pipe = cache.pipeline()
+	pipe.zadd(log_key, {f"{seq}:{handle}": seq for seq, handle in enumerate(handles, first)})
+	pipe.zremrangebyscore(log_key, "-inf", last - INVALIDATION_LOG_RETAIN)
+	pipe.execute()
+
+
+def _sync_invalidations():
+	"""Apply the invalidations other workers published since the last call."""
+	global _seen
+	cache = frappe.cache()
+	with _sync_lock:
+		current = int(cache.get(cache.make_key(INVALIDATION_SEQ_KEY)) or 0)
+		if current == _seen:
+			return
+		log = []
+		if _seen is not None and _seen < current:
+			members = cache.zrangebyscore(cache.make_key(INVALIDATION_LOG_KEY), _seen + 1, current)
+			log = [_log_entry(member) for member in members]
+		handles = pending_invalidations(_seen, current, log)
+		if handles is None:
+			_cache.clear()
+		else:
+			for handle in handles:
+				_cache.invalidate(handle)
+		_seen = current
+
+
+def _log_entry(member):
+	seq, handle = frappe.safe_decode(member).split(":", 1)
+	return int(seq), handle
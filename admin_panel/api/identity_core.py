@@ -0,0 +1,171 @@
+"""Pure account-handle resolution rules and the shared identity cache.
+
+No frappe or IO imports — find_account fetches every candidate in two batched
+mongo round trips and hands the plain docs here, where the historical
+resolution priority is applied in Python:
+
+  mongo _id (== IBEX account name) → username → account uuid (accounts.id)
+  → phone (the phone index, via kratosUserId) → wallet id (wallets.id)
+
+The first rule that matches wins, exactly as when each was a separate
+`find_one`.
+
+`IdentityCache` is the multi-key store behind the `identity` service;
+`pending_invalidations` replays the cross-worker invalidation log into it.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def pick_account(query, accounts, phone_owners=(), wallet=None, object_id=None):
+	"""Apply find_account's priority order to one batch of fetched docs.
+
+	Args:
+	    query: the stripped handle the operator typed.
+	    accounts: account docs matching any rule (order irrelevant).
+	    phone_owners: kratosUserIds whose phone matched the query (from the
+	        phone index), best match first.
+	    wallet: the wallets doc whose id == query ({account_id}), or None.
+	    object_id: str(ObjectId(query)) when the query is a valid ObjectId.
+
+	Returns the winning account doc, or None.
+	"""
+	if object_id:
+		for account in accounts:
+			if str(account["_id"]) == object_id:
+				return account
+	for field in ("username", "id"):
+		for account in accounts:
+			if account.get(field) == query:
+				return account
+	for kratos_id in phone_owners:
+		for account in accounts:
+			if account.get("kratosUserId") == kratos_id:
+				return account
+	if wallet and wallet.get("account_id"):
+		for account in accounts:
+			if str(account["_id"]) == str(wallet["account_id"]):
+				return account
+	return None
+
+
+def account_handles(account):
+	"""Every handle a mongo account doc answers to (find_account rules)."""
+	return [h for h in (str(account["_id"]), account.get("username"), account.get("id")) if h]
+
+
+def flash_account_handles(account):
+	"""Every handle a Flash GraphQL AccountDetail answers to."""
+	owner = account.get("owner") or {}
+	email = owner.get("email") or {}
+	return [
+		h
+		for h in (
+			account.get("id"),
+			account.get("uuid"),
+			account.get("username"),
+			owner.get("phone"),
+			email.get("address"),
+		)
+		if h
+	]
+
+
+def pending_invalidations(seen, current, log):
+	"""Handles a worker must drop to catch up with the shared invalidation log.
+
+	Args:
+	    seen: the last sequence number this worker applied (None: never synced).
+	    current: the log's latest sequence number.
+	    log: [(seq, handle)] still retained with seen < seq <= current.
+
+	Returns the handles to invalidate (possibly []), or None when the worker
+	must clear its whole cache: it has never synced, the counter went back
+	(redis was flushed), or entries it hasn't applied are missing (trimmed,
+	or not written yet).
+	"""
+	if seen is None or current < seen:
+		return None
+	if current == seen:
+		return []
+	if len({seq for seq, _ in log}) != current - seen:
+		return None
+	return list(dict.fromkeys(handle for _, handle in sorted(log)))
+
+
+class IdentityCache:
+	"""Multi-key, TTL- and size-bounded cache of resolved accounts.
+
+	One entry per account per namespace ("mongo", "payer", "flash" — the
+	shapes differ); every handle the account answers to points at that same
+	entry, so a lookup by username warms the phone / uuid / _id lookups too.
+	Least-recently-used entries are evicted past `max_entries`. Misses are
+	never stored — a new account must be findable immediately.
+
+	Values are shared, not copied: callers must treat them as read-only.
+	Thread-safe (Fanout branches resolve accounts too).
+	"""
+
+	def __init__(self, ttl_seconds=120, max_entries=5000, clock=time.monotonic):
+		self.ttl_seconds = ttl_seconds
+		self.max_entries = max_entries
+		self._clock = clock
+		self._entries = OrderedDict()  # entry id -> (value, expires_at, keys)
+		self._index = {}  # (namespace, handle) -> entry id
+		self._next_id = 0
+		self._lock = threading.Lock()
+
+	def __len__(self):
+		return len(self._entries)
+
+	def get(self, namespace, handle):
+		with self._lock:
+			entry_id = self._index.get((namespace, handle))
+			if entry_id is None:
+				return None
+			value, expires_at, _ = self._entries[entry_id]
+			if self._clock() >= expires_at:
+				self._drop(entry_id)
+				return None
+			self._entries.move_to_end(entry_id)
+			return value
+
+	def put(self, namespace, handles, value, ttl_seconds=None):
+		"""Store `value` under every handle (blank handles are skipped)."""
+		keys = {(namespace, h) for h in handles if h}
+		if not keys:
+			return
+		ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+		with self._lock:
+			# A handle can only point at one account: re-pointing it retires
+			# the previous entry (renamed username, re-issued phone).
+			for key in keys:
+				if key in self._index:
+					self._drop(self._index[key])
+			entry_id = self._next_id
+			self._next_id += 1
+			self._entries[entry_id] = (value, self._clock() + ttl, keys)
+			for key in keys:
+				self._index[key] = entry_id
+			while len(self._entries) > self.max_entries:
+				self._drop(next(iter(self._entries)))
+
+	def invalidate(self, handle):
+		"""Forget every entry (any namespace) that answers to `handle`."""
+		with self._lock:
+			for key in [k for k in self._index if k[1] == handle]:
+				if key in self._index:
+					self._drop(self._index[key])
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self._index.clear()
+
+	def _drop(self, entry_id):
+		_, _, keys = self._entries.pop(entry_id)
+		for key in keys:
+			if self._index.get(key) == entry_id:
+				del self._index[key]
@@ -1,9 +1,11 @@
 """Read-only reader for the customer MongoDB (Galoy `galoy` database).
 
 Loads the three collections the wallet census joins against IBEX accounts:
-`wallets`, `accounts`, and `cashwalletmigrations`. Everything is bulk-loaded
-into plain dicts keyed by the join field so the pure `census.build_census`
-function can run without any IO.
+`wallets`, `accounts`, and `cashwalletmigrations`, into plain dicts keyed by
+the join field so the pure `census.build_census` function can run without
+any IO. The census job reads wallets and accounts by id, only for the rows
+IBEX returned (`load_wallets_by_ids` / `load_accounts_by_ids`, chunked `$in`
+queries); the full-collection loaders remain for other callers.
 
 Verified join keys (see census.py):
   IBEX account.id   == wallets.id
@@ -15,12 +17,15 @@ Config (site_config.json / frappe.conf):
   customer_mongo_db    (optional) — database name, defaults to "galoy"
 """
 
-import re
-
 import frappe
 
+from .identity_core import pick_account
+
 _client = None
 
+# Ids per `$in` query (and cursor batch size) for the targeted loaders.
+IN_CHUNK_SIZE = 1000
+
 
 def _get_db():
 	uri = frappe.conf.get("customer_mongo_uri")
@@ -46,11 +51,29 @@ def _latest_status(status_history):
 	return status_history[-1].get("status")
 
 
-def load_wallets() -> dict:
-	"""wallet id -> {account_id, currency, type}."""
-	db = _get_db()
-	out = {}
-	cursor = db.wallets.find({}, {"id": 1, "_accountId": 1, "currency": 1, "type": 1})
+_WALLET_FIELDS = {"id": 1, "_accountId": 1, "currency": 1, "type": 1}
+_ACCOUNT_FIELDS = {
+	"_id": 1,
+	"username": 1,
+	"level": 1,
+	"role": 1,
+	"statusHistory": 1,
+	"defaultWalletId": 1,
+	"created_at": 1,
+	"npub": 1,
+}
+# What a totals-only census needs: role and the latest status entry, plus
+# the username its top funded list shows.
+_ACCOUNT_STATUS_FIELDS = {"_id": 1, "username": 1, "role": 1, "statusHistory": {"$slice": -1}}
+
+
+def _chunks(values, size):
+	values = list(values)
+	for start in range(0, len(values), size):
+		yield values[start : start + size]
+
+
+def _wallet_entries(cursor, out):
 	for doc in cursor:
 		wid = doc.get("id")
 		if not wid:
@@ -63,23 +86,7 @@ def load_wallets() -> dict:
 	return out
 
 
-def load_accounts() -> dict:
-	"""str(account _id) -> {username, level, status, role, created_at, default_wallet_id, npub}."""
-	db = _get_db()
-	out = {}
-	cursor = db.accounts.find(
-		{},
-		{
-			"_id": 1,
-			"username": 1,
-			"level": 1,
-			"role": 1,
-			"statusHistory": 1,
-			"defaultWalletId": 1,
-			"created_at": 1,
-			"npub": 1,
-		},
-	)
+def _account_entries(cursor, out):
 	for doc in cursor:
 		out[str(doc["_id"])] = {
 			"username": doc.get("username"),
@@ -93,6 +100,54 @@ def load_accounts() -> dict:
 	return out
 
 
+def load_wallets() -> dict:
+	"""wallet id -> {account_id, currency, type}."""
+	db = _get_db()
+	return _wallet_entries(db.wallets.find({}, _WALLET_FIELDS), {})
+
+
+def load_wallets_by_ids(wallet_ids, chunk_size=IN_CHUNK_SIZE, batch_size=IN_CHUNK_SIZE) -> dict:
+	"""load_wallets for just the given wallet ids (one `$in` query per chunk)."""
+	db = _get_db()
+	out = {}
+	for chunk in _chunks(dict.fromkeys(w for w in wallet_ids if w), chunk_size):
+		_wallet_entries(db.wallets.find({"id": {"$in": chunk}}, _WALLET_FIELDS).batch_size(batch_size), out)
+	return out
+
+
+def count_btc_wallets() -> int:
+	"""BTC wallets (they never appear in IBEX), counted server-side."""
+	db = _get_db()
+	return db.wallets.count_documents({"currency": {"$regex": "^btc$", "$options": "i"}})
+
+
+def load_accounts() -> dict:
+	"""str(account _id) -> {username, level, status, role, created_at, default_wallet_id, npub}."""
+	db = _get_db()
+	return _account_entries(db.accounts.find({}, _ACCOUNT_FIELDS), {})
+
+
+def load_accounts_by_ids(account_ids, chunk_size=IN_CHUNK_SIZE, batch_size=IN_CHUNK_SIZE) -> dict:
+	"""load_accounts for just the given account ids (one `$in` query per chunk)."""
+	return _load_accounts_by_ids(account_ids, _ACCOUNT_FIELDS, chunk_size, batch_size)
+
+
+def load_account_statuses_by_ids(account_ids, chunk_size=IN_CHUNK_SIZE, batch_size=IN_CHUNK_SIZE) -> dict:
+	"""load_accounts_by_ids reading only username, role and the latest status (other fields None)."""
+	return _load_accounts_by_ids(account_ids, _ACCOUNT_STATUS_FIELDS, chunk_size, batch_size)
+
+
+def _load_accounts_by_ids(account_ids, fields, chunk_size, batch_size):
+	from bson import ObjectId
+
+	object_ids = [ObjectId(ref) for ref in dict.fromkeys(account_ids) if ref and ObjectId.is_valid(ref)]
+	db = _get_db()
+	out = {}
+	for chunk in _chunks(object_ids, chunk_size):
+		_account_entries(db.accounts.find({"_id": {"$in": chunk}}, fields).batch_size(batch_size), out)
+	return out
+
+
 def load_migrations() -> dict:
 	"""accountId -> {status, run_id, completed_at}. Keeps the most recent run per account."""
 	db = _get_db()
@@ -158,56 +213,184 @@ def load_bridge_accounts() -> list:
 	return out
 
 
-def find_account(query: str):
+# Indexes the identity lookups (find_account, load_payer_identities) rely on,
+# by collection; phones resolve through the local phone index, with one exact
+# users.phone probe on an index miss (find_user_ids_by_phone). Each entry must
+# lead some index; owned by the flash backend
+# — this reader never creates indexes, it only reports missing ones
+# (check_lookup_indexes).
+LOOKUP_INDEXES = {
+	"accounts": ([("username", 1)], [("id", 1)], [("kratosUserId", 1)]),
+	"users": ([("kratosUserId", 1)], [("phone", 1)]),
+	"wallets": ([("id", 1)], [("_accountId", 1)]),
+}
+
+
+def find_account(query: str, phone_owners=None):
 	"""Resolve a single account doc by accountId / username / phone / wallet id.
 
-	Resolution order: mongo _id (== IBEX account name) → username → phone
-	(via the users collection + kratosUserId) → wallet id. Returns the raw
-	account doc or None.
+	Resolution order: mongo _id (== IBEX account name) → username → account
+	uuid → phone → wallet id. Phones are not searched here: the caller passes
+	the kratosUserIds the phone index matched (`phone_owners`). Returns the raw
+	account doc or None. Uncached — request code should go through
+	identity.resolve_account, which also consults the phone index.
 	"""
-	from bson import ObjectId
-
-	db = _get_db()
 	query = (query or "").strip()
 	if not query:
 		return None
+	owners = {query: phone_owners} if phone_owners else None
+	return find_accounts([query], phone_owners=owners).get(query)
 
-	if ObjectId.is_valid(query):
-		acct = db.accounts.find_one({"_id": ObjectId(query)})
-		if acct:
-			return acct
-
-	acct = db.accounts.find_one({"username": query})
-	if acct:
-		return acct
-
-	# GraphQL exposes the account uuid (accounts.id), not the mongo _id —
-	# accept it so callers can pass either.
-	acct = db.accounts.find_one({"id": query})
-	if acct:
-		return acct
-
-	# Support pastes of formatted numbers ("876 555-1234", "(876) 5551234"):
-	# try the raw query, a compacted form, and a "+"-prefixed compacted form.
-	compact = re.sub(r"[\s\-().]", "", query)
-	candidates = [query, compact]
-	if compact and not compact.startswith("+"):
-		candidates.append("+" + compact)
-	user = None
-	for candidate in dict.fromkeys(c for c in candidates if c):
-		user = db.users.find_one({"phone": candidate})
-		if user:
-			break
-	if user and user.get("kratosUserId"):
-		acct = db.accounts.find_one({"kratosUserId": user["kratosUserId"]})
-		if acct:
-			return acct
 
-	wallet = db.wallets.find_one({"id": query})
-	if wallet and wallet.get("_accountId"):
-		return db.accounts.find_one({"_id": wallet["_accountId"]})
+def find_accounts(queries, phone_owners=None) -> dict:
+	"""Batch find_account: {query: account doc} for every query that resolves.
+
+	Two round trips however many queries: one wallets probe (ids), then one
+	`$or` over accounts covering every rule for every query. `phone_owners`
+	maps a query to the kratosUserIds its phone matched in the phone index.
+	The priority is applied per query in Python (identity_core.pick_account).
+	"""
+	from bson import ObjectId
+
+	queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+	if not queries:
+		return {}
+	phone_owners = phone_owners or {}
+	db = _get_db()
+
+	wallets = {
+		w["id"]: {"account_id": w.get("_accountId")}
+		for w in db.wallets.find({"id": {"$in": queries}}, {"_id": 0, "id": 1, "_accountId": 1})
+	}
+
+	object_ids = {q: ObjectId(q) for q in queries if ObjectId.is_valid(q)}
+	ors = [{"username": {"$in": queries}}, {"id": {"$in": queries}}]
+	account_oids = list(object_ids.values()) + [w["account_id"] for w in wallets.values() if w["account_id"]]
+	if account_oids:
+		ors.append({"_id": {"$in": account_oids}})
+	kratos_ids = list(dict.fromkeys(k for q in queries for k in phone_owners.get(q, ())))
+	if kratos_ids:
+		ors.append({"kratosUserId": {"$in": kratos_ids}})
+
+	accounts = list(db.accounts.find({"$or": ors}))
+	out = {}
+	for query in queries:
+		oid = object_ids.get(query)
+		account = pick_account(
+			query,
+			accounts,
+			phone_owners=phone_owners.get(query, ()),
+			wallet=wallets.get(query),
+			object_id=str(oid) if oid else None,
+		)
+		if account is not None:
+			out[query] = account
+	return out
+
+
+def iter_user_phones(after_id=None, batch_size=5000):
+	"""Yield {user_id, kratos_user_id, phone} for every user, in _id order.
+
+	`after_id` (a str(_id) watermark) resumes after the last user a previous
+	incremental phone-index sync saw. Feeds admin_panel.api.phone_index.
+	"""
+	from bson import ObjectId
+
+	db = _get_db()
+	query = {"_id": {"$gt": ObjectId(after_id)}} if after_id else {}
+	cursor = (
+		db.users.find(query, {"_id": 1, "kratosUserId": 1, "phone": 1}).sort("_id", 1).batch_size(batch_size)
+	)
+	for doc in cursor:
+		yield {
+			"user_id": str(doc["_id"]),
+			"kratos_user_id": doc.get("kratosUserId"),
+			"phone": doc.get("phone"),
+		}
+
+
+def find_user_ids_by_phone(phone) -> list:
+	"""[{kratos_user_id, phone}] of the users whose stored phone is exactly `phone`.
+
+	The phone index's fallback for a number it hasn't picked up yet (the
+	sync runs on a schedule); `phone` is the E.164 form Flash stores.
+	"""
+	db = _get_db()
+	return [
+		{"kratos_user_id": doc["kratosUserId"], "phone": doc.get("phone")}
+		for doc in db.users.find({"phone": phone}, {"_id": 0, "kratosUserId": 1, "phone": 1}).limit(10)
+		if doc.get("kratosUserId")
+	]
+
+
+def iter_account_handles(created_since=None, batch_size=5000):
+	"""Yield the searchable handles of every account, in _id order.
+
+	{account_id, uuid, username, kratos_user_id, level, status}. With
+	`created_since` (a datetime) only accounts created at or after it — the
+	_id carries its creation time, so this is an _id range on the primary key.
+	"""
+	from bson import ObjectId
+
+	db = _get_db()
+	query = {"_id": {"$gte": ObjectId.from_datetime(created_since)}} if created_since else {}
+	cursor = (
+		db.accounts.find(
+			query,
+			{"_id": 1, "id": 1, "username": 1, "kratosUserId": 1, "level": 1, "statusHistory": 1},
+		)
+		.sort("_id", 1)
+		.batch_size(batch_size)
+	)
+	for doc in cursor:
+		yield {
+			"account_id": str(doc["_id"]),
+			"uuid": doc.get("id"),
+			"username": doc.get("username"),
+			"kratos_user_id": doc.get("kratosUserId"),
+			"level": doc.get("level"),
+			"status": _latest_status(doc.get("statusHistory")),
+		}
 
-	return None
+
+def missing_indexes(required=None) -> list:
+	"""Required indexes no existing index leads with, as "collection(field, …)".
+
+	`required` maps collection -> key lists (default: LOOKUP_INDEXES plus the
+	invite-row indexes). An index satisfies a requirement when its leading
+	keys equal the required keys, direction included.
+	"""
+	if required is None:
+		required = dict(LOOKUP_INDEXES, invites=INVITE_ROW_INDEXES)
+	db = _get_db()
+	missing = []
+	for collection, specs in required.items():
+		existing = [list(info["key"]) for info in db[collection].index_information().values()]
+		for spec in specs:
+			spec = [tuple(k) for k in spec]
+			if not any([tuple(k) for k in keys[: len(spec)]] == spec for keys in existing):
+				fields = ", ".join(f"{name}:{direction}" for name, direction in spec)
+				missing.append(f"{collection}({fields})")
+	return missing
+
+
+def check_lookup_indexes() -> list:
+	"""Diagnostic: log (and return) the identity/invite indexes mongo lacks.
+
+	Runs after every migrate and from the console:
+	    bench --site <site> execute admin_panel.api.mongo_reader.check_lookup_indexes
+	Best-effort — an unconfigured or unreachable mongo is logged, not raised.
+	"""
+	if not frappe.conf.get("customer_mongo_uri"):
+		return []
+	try:
+		missing = missing_indexes()
+	except Exception as exc:
+		frappe.logger().warning(f"mongo index check skipped: {exc}")
+		return []
+	for name in missing:
+		frappe.logger().warning(f"mongo index missing (lookups will scan): {name}")
+	return missing
 
 
 def customer_bundle(account: dict) -> dict:
@@ -334,6 +517,60 @@ def load_payer_identities(account_refs, usernames) -> dict:
 	return out
 
 
+# Projection shared by every invite loader — the reward-payout fields plus
+# the lifecycle fields the table renders.
+_INVITE_FIELDS = {
+	"_id": 1,
+	"contact": 1,
+	"method": 1,
+	"inviterId": 1,
+	"redeemedById": 1,
+	"status": 1,
+	"createdAt": 1,
+	"expiresAt": 1,
+	"redeemedAt": 1,
+	"rewardStatus": 1,
+	"rewardSeq": 1,
+	"rewardAmountCents": 1,
+	"rewardedAt": 1,
+	"inviterRewardedAt": 1,
+	"inviteeRewardedAt": 1,
+	"rewardError": 1,
+}
+
+# Indexes the paged invite-row query (referral_rewards.get_referral_rows) is
+# shaped for: the status chips, the inviter filter and the tier filter each
+# lead an index that ends in the createdAt sort key. Owned by the flash
+# backend — this reader never creates indexes.
+INVITE_ROW_INDEXES = (
+	[("status", 1), ("rewardStatus", 1), ("createdAt", -1)],
+	[("inviterId", 1), ("createdAt", -1)],
+	[("rewardAmountCents", 1), ("createdAt", -1)],
+	[("createdAt", -1)],
+)
+
+
+def _invite_from_doc(doc) -> dict:
+	return {
+		"invite_id": str(doc["_id"]),
+		"contact": doc.get("contact"),
+		"method": doc.get("method"),
+		"inviter_id": str(doc["inviterId"]) if doc.get("inviterId") else None,
+		"redeemed_by_id": str(doc["redeemedById"]) if doc.get("redeemedById") else None,
+		"status": doc.get("status"),
+		"created_at": _iso(doc.get("createdAt")),
+		"expires_at": _iso(doc.get("expiresAt")),
+		"redeemed_at": _iso(doc.get("redeemedAt")),
+		"reward_status": doc.get("rewardStatus"),
+		"reward_seq": doc.get("rewardSeq"),
+		"reward_amount_cents": doc.get("rewardAmountCents"),
+		"rewarded_at": _iso(doc.get("rewardedAt")),
+		"inviter_rewarded_at": _iso(doc.get("inviterRewardedAt")),
+		"invitee_rewarded_at": _iso(doc.get("inviteeRewardedAt")),
+		"reward_error": doc.get("rewardError"),
+	}
+
+
 def load_invites() -> list:
 	"""Referral invites with their reward-payout fields.
 
@@ -342,50 +579,58 @@ def load_invites() -> list:
 	JSON serialization can't choke on a raw ObjectId/datetime.
 	"""
 	db = _get_db()
-	out = []
-	cursor = db.invites.find(
-		{},
+	return [_invite_from_doc(doc) for doc in db.invites.find({}, _INVITE_FIELDS)]
+
+
+def load_invite_groups() -> list:
+	"""Invite counts grouped the way `referral_rewards_core.build_summary` reads them.
+
+	One `$group` on the server, so the summary costs a handful of result
+	documents however many invites exist. Mirrors `group_invites`: a party
+	counts as paid when its reward timestamp is set.
+	"""
+	db = _get_db()
+	pipeline = [
 		{
-			"_id": 1,
-			"contact": 1,
-			"method": 1,
-			"inviterId": 1,
-			"redeemedById": 1,
-			"status": 1,
-			"createdAt": 1,
-			"expiresAt": 1,
-			"redeemedAt": 1,
-			"rewardStatus": 1,
-			"rewardSeq": 1,
-			"rewardAmountCents": 1,
-			"rewardedAt": 1,
-			"inviterRewardedAt": 1,
-			"inviteeRewardedAt": 1,
-			"rewardError": 1,
-		},
-	)
-	for doc in cursor:
-		out.append(
-			{
-				"invite_id": str(doc["_id"]),
-				"contact": doc.get("contact"),
-				"method": doc.get("method"),
-				"inviter_id": str(doc["inviterId"]) if doc.get("inviterId") else None,
-				"redeemed_by_id": str(doc["redeemedById"]) if doc.get("redeemedById") else None,
-				"status": doc.get("status"),
-				"created_at": _iso(doc.get("createdAt")),
-				"expires_at": _iso(doc.get("expiresAt")),
-				"redeemed_at": _iso(doc.get("redeemedAt")),
-				"reward_status": doc.get("rewardStatus"),
-				"reward_seq": doc.get("rewardSeq"),
-				"reward_amount_cents": doc.get("rewardAmountCents"),
-				"rewarded_at": _iso(doc.get("rewardedAt")),
-				"inviter_rewarded_at": _iso(doc.get("inviterRewardedAt")),
-				"invitee_rewarded_at": _iso(doc.get("inviteeRewardedAt")),
-				"reward_error": doc.get("rewardError"),
+			"$group": {
+				"_id": {
+					"status": "$status",
+					"reward_status": "$rewardStatus",
+					"reward_amount_cents": {"$ifNull": ["$rewardAmountCents", 0]},
+					"inviter_paid": {"$gt": ["$inviterRewardedAt", None]},
+					"invitee_paid": {"$gt": ["$inviteeRewardedAt", None]},
+				},
+				"count": {"$sum": 1},
 			}
-		)
-	return out
+		}
+	]
+	return [dict(doc["_id"], count=doc["count"]) for doc in db.invites.aggregate(pipeline)]
+
+
+def load_invites_page(query: dict, pipeline: list) -> tuple[list, int]:
+	"""One page of invites plus the count matching `query` (see build_rows_query).
+
+	`pipeline` selects and orders the page (see build_rows_pipeline); it sorts
+	on a computed key, so the sort may spill to disk on a large match.
+	"""
+	db = _get_db()
+	cursor = db.invites.aggregate([*pipeline, {"$project": _INVITE_FIELDS}], allowDiskUse=True)
+	invites = [_invite_from_doc(doc) for doc in cursor]
+	return invites, db.invites.count_documents(query)
+
+
+def load_account_usernames(account_ids) -> dict:
+	"""str(account _id) -> {username} for just the given ids (one `$in` query)."""
+	from bson import ObjectId
+
+	object_ids = [ObjectId(ref) for ref in dict.fromkeys(account_ids or []) if ref and ObjectId.is_valid(ref)]
+	if not object_ids:
+		return {}
+	db = _get_db()
+	return {
+		str(doc["_id"]): {"username": doc.get("username")}
+		for doc in db.accounts.find({"_id": {"$in": object_ids}}, {"_id": 1, "username": 1})
+	}
 
 
 def load_reward_counter() -> int:
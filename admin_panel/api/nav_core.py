@@ -145,6 +145,8 @@ NAV_GROUPS = (
 # here or in NAV_GROUPS instead of silently going missing.
 UNLISTED = {
 	"admin-dashboard": "This page. The directory does not list itself.",
+	"bridge-customer-mirror": "Sync cache behind the Bridge KYC page, which is the place to browse it.",
+	"phone-index-entry": "Lookup table behind phone search; maintained by a scheduled sync, not browsed.",
 }
 
 
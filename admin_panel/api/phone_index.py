@@ -0,0 +1,256 @@
+"""Normalized phone lookup table (`Phone Index Entry`).
+
+Phone search used to try the operator's spelling against mongo `users.phone`
+one variant at a time, and the cashout search ran `mobile_no LIKE '%digits%'`
+on ERPNext Customer (a scan). This module keeps one row per phone from both
+sources with two indexed keys (see phone_index_core): canonical E.164 and a
+last-7-digits suffix, so a lookup is an exact match however the number was
+typed or stored.
+
+Kept current by:
+  * sync_phone_index — scheduled, incremental: mongo users past the last
+    seen _id, ERPNext Customers modified since the last run.
+  * rebuild_phone_index — scheduled daily full pass over both sources
+    (catches phone edits on existing users, which carry no change stamp,
+    and drops entries whose source is gone).
+  * index_customer / unindex_customer — Customer doc_events write-through.
+  * index_flash_user — write-through after an Account Hub phone change.
+  * flash_user_ids_for_phone — on an index miss for a full number, one
+    exact users.phone query; a hit is queued for indexing
+    (index_flash_users, `short` queue), so lookups themselves never write.
+"""
+
+import frappe
+
+from .mongo_reader import find_user_ids_by_phone, iter_user_phones
+from .phone_index_core import index_entry, plan_index_sync, plan_lookup
+
+ENTRY_DOCTYPE = "Phone Index Entry"
+SOURCE_FLASH_USER = "Flash User"
+SOURCE_CUSTOMER = "Customer"
+
+# Global defaults holding the incremental watermarks.
+_USERS_WATERMARK_KEY = "phone_index_users_after_id"
+_CUSTOMERS_WATERMARK_KEY = "phone_index_customers_modified"
+
+# Rows per bulk insert.
+_INSERT_CHUNK = 1000
+
+# Above this many touched keys an incremental batch compares against the
+# whole source instead of an IN (...) list.
+_KEYED_EXISTING_LIMIT = 1000
+
+_INSERT_FIELDS = (
+	"name",
+	"entry_key",
+	"source",
+	"source_ref",
+	"raw_phone",
+	"phone_e164",
+	"phone_suffix",
+	"owner",
+	"modified_by",
+	"creation",
+	"modified",
+)
+
+
+def lookup_phone(query, source=None) -> list:
+	"""source_refs whose phone matches a typed number, exact-match only.
+
+	A number with enough digits to be canonical matches on E.164; a short
+	local number falls back to the subscriber suffix (which may match more
+	than one ref). Returns [] for anything that isn't phone-shaped.
+	"""
+	plan = plan_lookup(query)
+	if plan is None:
+		return []
+	column, value = plan
+	filters = {f"phone_{column}": value}
+	if source:
+		filters["source"] = source
+	return frappe.get_all(ENTRY_DOCTYPE, filters=filters, pluck="source_ref", order_by="source_ref asc")
+
+
+def flash_user_ids_for_phone(query) -> list:
+	"""kratosUserIds owning a typed phone, for account resolution.
+
+	A suffix-only match (short local number) counts only when it is
+	unambiguous — resolving to an arbitrary one of several accounts would be
+	worse than no match. A full number the index doesn't know yet (a user
+	who signed up or changed phone since the last sync) is checked against
+	mongo once and indexed.
+	"""
+	plan = plan_lookup(query)
+	if plan is None:
+		return []
+	owners = lookup_phone(query, source=SOURCE_FLASH_USER)
+	if plan[0] == "suffix" and len(owners) > 1:
+		return []
+	if not owners and plan[0] == "e164":
+		owners = _live_flash_user_ids(plan[1])
+	return owners
+
+
+def _live_flash_user_ids(e164):
+	"""kratosUserIds whose mongo users.phone is `e164`; hits are queued for indexing."""
+	if not frappe.conf.get("customer_mongo_uri"):
+		return []
+	users = find_user_ids_by_phone(e164)
+	if users:
+		frappe.enqueue(
+			"admin_panel.api.phone_index.index_flash_users",
+			queue="short",
+			job_id=f"admin_panel:phone_index:{e164}",
+			deduplicate=True,
+			users=[(user["kratos_user_id"], user["phone"]) for user in users],
+		)
+	return sorted(dict.fromkeys(user["kratos_user_id"] for user in users))
+
+
+def _existing(source, keys=None):
+	"""{entry_key: raw_phone} stored for a source (optionally just `keys`)."""
+	filters = {"source": source}
+	if keys is not None:
+		if not keys:
+			return {}
+		filters["name"] = ("in", list(keys))
+	return dict(frappe.get_all(ENTRY_DOCTYPE, filters=filters, fields=["name", "raw_phone"], as_list=True))
+
+
+def _stored_for(source, full, entries, dropped):
+	"""What plan_index_sync compares against: the whole source on a full pass
+	or a large catch-up, otherwise only the rows this batch touches."""
+	keys = [e["entry_key"] for e in entries] + list(dropped)
+	if full or len(keys) > _KEYED_EXISTING_LIMIT:
+		return _existing(source)
+	return _existing(source, keys)
+
+
+def _apply(inserts, updates, deletes):
+	now = frappe.utils.now_datetime()
+	user = frappe.session.user
+	if inserts:
+		frappe.db.bulk_insert(
+			ENTRY_DOCTYPE,
+			_INSERT_FIELDS,
+			[
+				(
+					e["entry_key"],
+					e["entry_key"],
+					e["source"],
+					e["source_ref"],
+					e["raw_phone"],
+					e["phone_e164"],
+					e["phone_suffix"],
+					user,
+					user,
+					now,
+					now,
+				)
+				for e in inserts
+			],
+			ignore_duplicates=True,
+			chunk_size=_INSERT_CHUNK,
+		)
+	for e in updates:
+		frappe.db.set_value(
+			ENTRY_DOCTYPE,
+			e["entry_key"],
+			{"raw_phone": e["raw_phone"], "phone_e164": e["phone_e164"], "phone_suffix": e["phone_suffix"]},
+		)
+	if deletes:
+		frappe.db.delete(ENTRY_DOCTYPE, {"name": ("in", deletes)})
+	return {"inserted": len(inserts), "updated": len(updates), "deleted": len(deletes)}
+
+
+def _sync_source(source, rows, full):
+	"""Index (ref, phone) rows from one source; returns the change counts."""
+	entries, dropped = [], []
+	for ref, phone in rows:
+		entry = index_entry(source, ref, phone)
+		if entry:
+			entries.append(entry)
+		else:
+			dropped.append(f"{source}:{ref}")
+	stored = _stored_for(source, full, entries, dropped)
+	return _apply(*plan_index_sync(stored, entries, full, dropped))
+
+
+def _sync_users(full):
+	after_id = None if full else frappe.db.get_default(_USERS_WATERMARK_KEY)
+	rows, last_id = [], after_id
+	for user in iter_user_phones(after_id=after_id):
+		last_id = user["user_id"]
+		if user["kratos_user_id"]:
+			rows.append((user["kratos_user_id"], user["phone"]))
+	result = _sync_source(SOURCE_FLASH_USER, rows, full)
+	if last_id:
+		frappe.db.set_default(_USERS_WATERMARK_KEY, last_id)
+	return result
+
+
+def _sync_customers(full):
+	filters = {}
+	since = None if full else frappe.db.get_default(_CUSTOMERS_WATERMARK_KEY)
+	if since:
+		# >= so rows sharing the watermark's timestamp are never skipped;
+		# unchanged ones re-plan to no-ops.
+		filters["modified"] = (">=", since)
+	customers = frappe.get_all(
+		"Customer", filters=filters, fields=["name", "mobile_no", "modified"], order_by="modified asc"
+	)
+	result = _sync_source(SOURCE_CUSTOMER, [(c.name, c.mobile_no) for c in customers], full)
+	if customers:
+		frappe.db.set_default(_CUSTOMERS_WATERMARK_KEY, str(customers[-1].modified))
+	return result
+
+
+def _run_sync(full):
+	result = {SOURCE_CUSTOMER: _sync_customers(full)}
+	if frappe.conf.get("customer_mongo_uri"):
+		result[SOURCE_FLASH_USER] = _sync_users(full)
+	frappe.db.commit()
+	return result
+
+
+def sync_phone_index():
+	"""Scheduled incremental sync (new mongo users, recently modified Customers)."""
+	return _run_sync(full=False)
+
+
+def rebuild_phone_index():
+	"""Scheduled full rebuild of both sources."""
+	return _run_sync(full=True)
+
+
+def index_flash_user(kratos_user_id, phone):
+	"""Write-through for one Flash user's phone (e.g. after an admin edit)."""
+	if kratos_user_id:
+		_sync_source(SOURCE_FLASH_USER, [(kratos_user_id, phone)], full=False)
+
+
+def index_flash_users(users):
+	"""Background job: index [(kratos_user_id, phone)] found by a lookup fallback."""
+	_sync_source(SOURCE_FLASH_USER, [tuple(user) for user in users if user[0]], full=False)
+	frappe.db.commit()
+
+
+def index_customer(doc, method=None):
+	"""Customer doc_events hook: keep its index row in step with mobile_no.
+
+	Never blocks the Customer save — a failure is logged and the next
+	scheduled sync picks the change up.
+	"""
+	try:
+		_sync_source(SOURCE_CUSTOMER, [(doc.name, doc.get("mobile_no"))], full=False)
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Phone index write-through failed")
+
+
+def unindex_customer(doc, method=None):
+	"""Customer on_trash hook (best-effort, like index_customer)."""
+	try:
+		frappe.db.delete(ENTRY_DOCTYPE, {"name": f"{SOURCE_CUSTOMER}:{doc.name}"})
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Phone index write-through failed")
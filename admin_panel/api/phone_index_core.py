@@ -0,0 +1,108 @@
+"""Pure phone normalization and sync planning for the phone lookup index.
+
+No frappe or IO imports (unit-tested directly). Phones are stored however
+they were typed — "+18765551234" in mongo `users`, "876-555-1234" or
+"(876) 555 1234" on an ERPNext Customer — so a search only matched when the
+operator happened to type the same spelling. The `Phone Index Entry` table
+holds two normalized keys per phone instead:
+
+  phone_e164    canonical E.164 ("+18765551234") when the number carries
+                enough digits to know its country; NANP (+1, Flash's home
+                market) is assumed for bare 10-digit numbers.
+  phone_suffix  the last SUFFIX_DIGITS digits — the subscriber part, which
+                still matches a number typed without its area / country code.
+
+Both columns are indexed, so every lookup is an exact match.
+"""
+
+import re
+
+SUFFIX_DIGITS = 7
+
+# Country calling code assumed for a bare 10-digit (NANP) number.
+DEFAULT_COUNTRY_CODE = "1"
+
+_PHONE_SHAPED_RE = re.compile(r"^\+?[\d\s\-().]+$")
+_NON_DIGITS_RE = re.compile(r"\D")
+
+
+def normalize_phone(raw):
+	"""(e164, suffix) for a stored or typed phone; either may be None."""
+	raw = (raw or "").strip()
+	digits = _NON_DIGITS_RE.sub("", raw)
+	if raw.startswith("00"):
+		digits, raw = digits[2:], "+" + raw[2:]
+	if not digits:
+		return None, None
+
+	e164 = None
+	if raw.startswith("+"):
+		if 8 <= len(digits) <= 15:
+			e164 = "+" + digits
+	elif len(digits) == 10:
+		e164 = f"+{DEFAULT_COUNTRY_CODE}{digits}"
+	elif 11 <= len(digits) <= 15:
+		e164 = "+" + digits
+	suffix = digits[-SUFFIX_DIGITS:] if len(digits) >= SUFFIX_DIGITS else None
+	return e164, suffix
+
+
+def plan_lookup(query):
+	"""How to look a typed phone up: ("e164", value), ("suffix", value) or None.
+
+	None for anything not phone-shaped (usernames, ObjectIds, uuids) or too
+	short to identify a subscriber.
+	"""
+	query = (query or "").strip()
+	if not _PHONE_SHAPED_RE.match(query):
+		return None
+	e164, suffix = normalize_phone(query)
+	if e164:
+		return ("e164", e164)
+	if suffix:
+		return ("suffix", suffix)
+	return None
+
+
+def index_entry(source, source_ref, raw_phone):
+	"""The index row for one phone, or None when it holds no usable digits."""
+	e164, suffix = normalize_phone(raw_phone)
+	if not (e164 or suffix):
+		return None
+	return {
+		"entry_key": f"{source}:{source_ref}",
+		"source": source,
+		"source_ref": source_ref,
+		"raw_phone": raw_phone,
+		"phone_e164": e164,
+		"phone_suffix": suffix,
+	}
+
+
+def plan_index_sync(existing, entries, full, dropped=()):
+	"""Split incoming index rows into (inserts, updates, deletes).
+
+	Args:
+	    existing: {entry_key: raw_phone} currently stored for the source.
+	    entries: index_entry() rows read from the source.
+	    full: the entries cover the whole source, so stored keys absent
+	        from them are deleted too.
+	    dropped: keys of refs read from the source that no longer have a
+	        usable phone (deleted when stored).
+
+	Rows whose raw phone is unchanged are skipped.
+	"""
+	inserts, updates = [], []
+	seen = set()
+	for entry in entries:
+		key = entry["entry_key"]
+		seen.add(key)
+		if key not in existing:
+			inserts.append(entry)
+		elif existing[key] != entry["raw_phone"]:
+			updates.append(entry)
+	if full:
+		deletes = [key for key in existing if key not in seen]
+	else:
+		deletes = [key for key in dict.fromkeys(dropped) if key in existing and key not in seen]
+	return inserts, updates, deletes
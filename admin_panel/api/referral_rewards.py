@@ -1,20 +1,52 @@
 """Referral reward payout monitoring (live read).
 
-Reads the invite reward fields + the global referral counter from the customer
-mongo, joins usernames, optionally layers the funding wallet's live IBEX
-balance, and returns tiered-payout totals + a per-referral table. All the
-join / bucket / totals logic is the pure `referral_rewards_core.build_overview`.
+Two endpoints, so the page stays fast however many invites exist:
+  * get_referral_rewards — aggregates only: tiered-payout totals, tier state,
+    funnel and the funding wallet's live IBEX balance. The invite counts come
+    from a single mongo `$group` (never the invites themselves); the group,
+    the reward counter and the balance are read in parallel (`fanout`).
+  * get_referral_rows — one filtered, paginated page of the per-referral
+    table, pushed down to mongo as an indexed query; usernames are joined
+    for that page only.
+
+All the summary / row-shaping logic is pure (`referral_rewards_core`).
 """
 
+from datetime import datetime, time, timedelta
+
 import frappe
+from frappe.utils import cint, cstr, flt, getdate
 
 from .auth import require_admin
 from .common import handle_api_errors
+from .endpoint_cache import swr_cached
+from .fanout import Fanout
 from .ibex_client import IbexClient
-from .mongo_reader import load_accounts, load_invites, load_reward_counter
-from .referral_rewards_core import REWARD_TIERS, build_overview
+from .identity import resolve_account
+from .mongo_reader import (
+	load_account_usernames,
+	load_invite_groups,
+	load_invites_page,
+	load_reward_counter,
+)
+from .referral_rewards_core import (
+	REWARD_TIERS,
+	ROW_FILTERS,
+	build_overview,
+	build_row,
+	build_rows_pipeline,
+	build_rows_query,
+	build_summary,
+)
+
+__all__ = ["build_overview", "get_referral_rewards", "get_referral_rows"]
 
-__all__ = ["build_overview", "get_referral_rewards"]
+# Table page size bounds for get_referral_rows.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Deadline for the funding-wallet balance branch of the overview.
+BALANCE_TIMEOUT_SECONDS = 10
 
 # The backend payout funds from the rewards account's USDT wallet first, then
 # USD — the inline `rewardsWallets.find(Usdt) ?? find(Usd)` preference in
@@ -58,19 +90,87 @@ def _rewards_wallet_balance():
 @frappe.whitelist()
 @require_admin()
 @handle_api_errors
+@swr_cached(fresh_seconds=60)
 def get_referral_rewards():
-	"""Live referral-reward overview: totals, tier state, funnel, per-referral rows."""
+	"""Live referral-reward overview: totals, tier state and funnel (no rows)."""
 	if not frappe.conf.get("customer_mongo_uri"):
 		return {"success": False, "error": "customer_mongo_uri is not configured"}
 
-	invites = load_invites()
-	accounts = load_accounts()
-	counter_seq = load_reward_counter()
-	wallet_balance = _rewards_wallet_balance()
+	# The three reads are independent; the balance is best-effort, so it gets
+	# a short deadline and may drop out without failing the page.
+	with Fanout() as reads:
+		reads.submit("invites", load_invite_groups)
+		reads.submit("counter", load_reward_counter)
+		reads.submit("wallet_balance", _rewards_wallet_balance, timeout=BALANCE_TIMEOUT_SECONDS)
+		groups = reads.result("invites")
+		counter_seq = reads.result("counter")
+		wallet_balance = reads.get("wallet_balance")
+		degraded = reads.failures()
 
-	overview = build_overview(
-		invites, accounts, counter_seq, tiers=REWARD_TIERS, wallet_balance=wallet_balance
-	)
+	overview = build_summary(groups, counter_seq, tiers=REWARD_TIERS, wallet_balance=wallet_balance)
 	overview["success"] = True
+	if degraded:
+		overview["degraded"] = degraded
 	overview["now"] = frappe.utils.now_datetime().isoformat()
 	return overview
+
+
+def _day_start(value):
+	return datetime.combine(getdate(value), time.min)
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def get_referral_rows(
+	reward_status=None, tier=None, date_from=None, date_to=None, inviter=None, page=1, page_size=None
+):
+	"""One page of the per-referral table, most recently redeemed (else created) first.
+
+	Filters AND together and run server-side: `reward_status` is a table chip
+	key (see referral_rewards_core.ROW_FILTERS), `tier` the per-party amount in
+	dollars, `date_from` / `date_to` an inclusive createdAt date range, and
+	`inviter` any handle resolve_account resolves (username, phone, account id).
+	"""
+	if not frappe.conf.get("customer_mongo_uri"):
+		return {"success": False, "error": "customer_mongo_uri is not configured"}
+
+	reward_status = cstr(reward_status).strip() or None
+	if reward_status and reward_status != "all" and reward_status not in ROW_FILTERS:
+		frappe.throw(f"Unknown reward status filter: {reward_status}")
+	page = max(1, cint(page) or 1)
+	page_size = max(1, min(cint(page_size) or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+	tier_cents = int(round(flt(tier) * 100)) if cstr(tier).strip() else None
+	created_from = _day_start(date_from) if cstr(date_from).strip() else None
+	created_before = _day_start(date_to) + timedelta(days=1) if cstr(date_to).strip() else None
+
+	inviter_ids = None
+	inviter = cstr(inviter).strip()
+	if inviter:
+		account = resolve_account(inviter)
+		inviter_ids = [account["_id"]] if account else []
+
+	result = {
+		"success": True,
+		"page": page,
+		"page_size": page_size,
+		"now": frappe.utils.now_datetime().isoformat(),
+	}
+	if inviter_ids == []:
+		# An inviter handle that resolves to no account matches nothing.
+		result.update({"rows": [], "total": 0})
+		return result
+
+	query = build_rows_query(
+		reward_status=reward_status,
+		tier_cents=tier_cents,
+		created_from=created_from,
+		created_before=created_before,
+		inviter_ids=inviter_ids,
+	)
+	invites, total = load_invites_page(query, build_rows_pipeline(query, (page - 1) * page_size, page_size))
+	accounts = load_account_usernames(
+		[inv.get("inviter_id") for inv in invites] + [inv.get("redeemed_by_id") for inv in invites]
+	)
+	result.update({"rows": [build_row(inv, accounts) for inv in invites], "total": total})
+	return result
@@ -77,133 +77,146 @@ def _pct(n, d):
 	return round(100.0 * n / d, 1) if d else None
 
 
-def build_overview(invites, accounts, counter_seq, tiers=REWARD_TIERS, wallet_balance=None, max_rows=200):
-	"""Join invites to accounts and roll up the referral-reward picture.
+def _row_reward_status(status, reward_status):
+	"""The table's reward column for one invite.
 
-	Args:
-	    invites: list of invite dicts (see mongo_reader.load_invites) — snake_case.
-	    accounts: str(account _id) -> {username, ...} (mongo_reader.load_accounts).
-	    counter_seq: int, the global referral sequence so far.
-	    tiers: the reward schedule.
-	    wallet_balance: live USD balance of the funding wallet, or None.
-	    max_rows: cap on the returned row list (newest first). Actionable rows
-	        (anything except clean "paid" / "unrewarded") ALWAYS survive the cap —
-	        only paid/unrewarded rows are truncated — so every row ops must act on
-	        is reachable. The summary aggregates still cover every invite.
-	        None = no cap.
+	ACCEPTED (redeemed) rows carry the reward lifecycle; un-redeemed rows
+	(SENT/EXPIRED/anything else) surface the invite lifecycle instead —
+	lowercased, so an unknown backend status renders fail-visible (the page
+	tones unlisted values as warnings), matching the reward-status drift
+	philosophy.
+	"""
+	if status == "ACCEPTED":
+		return reward_status or "unrewarded"
+	if status == "SENT":
+		return "sent"
+	if status == "EXPIRED":
+		return "expired"
+	if status == "PENDING":
+		# "unsent", NOT "pending": the IBEX reward-status bucket already owns
+		# "pending" — a lifecycle collision would leak these rows into the
+		# money-moved reconciliation filter.
+		return "unsent"
+	return (status or "unknown").lower()
 
-	Returns {rows, summary, funnel}, all JSON-serializable.
+
+def build_row(inv, accounts):
+	"""One per-invite table row, usernames joined from `accounts`."""
+	status = inv.get("status")
+	amount_cents = inv.get("reward_amount_cents") or 0
+	inviter = accounts.get(inv.get("inviter_id")) or {}
+	if status == "ACCEPTED":
+		invitee = accounts.get(inv.get("redeemed_by_id")) or {}
+		row_invitee = invitee.get("username") or inv.get("contact") or "—"
+	else:
+		row_invitee = inv.get("contact") or "—"
+	return {
+		"invite_id": inv.get("invite_id"),
+		"invitee": row_invitee,
+		"inviter": inviter.get("username") or "—",
+		"status": status,
+		"reward_status": _row_reward_status(status, inv.get("reward_status")),
+		"reward_amount_dollars": (amount_cents / 100.0) if amount_cents else None,
+		"reward_seq": inv.get("reward_seq"),
+		"created_at": inv.get("created_at"),
+		"redeemed_at": inv.get("redeemed_at"),
+		"rewarded_at": inv.get("rewarded_at"),
+		"inviter_paid": bool(inv.get("inviter_rewarded_at")),
+		"invitee_paid": bool(inv.get("invitee_rewarded_at")),
+		"reward_error": inv.get("reward_error"),
+	}
+
+
+def group_invites(invites):
+	"""Collapse invites into the counted groups `build_summary` aggregates.
+
+	The group key is everything the summary reads from an invite — invite
+	status, reward status, amount and the two per-party paid flags — so the
+	same groups can come from this in-memory pass (fixtures, build_overview)
+	or from a mongo `$group` (mongo_reader.load_invite_groups) without the
+	summary ever seeing individual invites.
+	"""
+	counts = {}
+	for inv in invites:
+		key = (
+			inv.get("status"),
+			inv.get("reward_status"),
+			inv.get("reward_amount_cents") or 0,
+			bool(inv.get("inviter_rewarded_at")),
+			bool(inv.get("invitee_rewarded_at")),
+		)
+		counts[key] = counts.get(key, 0) + 1
+	return [
+		{
+			"status": status,
+			"reward_status": reward_status,
+			"reward_amount_cents": amount_cents,
+			"inviter_paid": inviter_paid,
+			"invitee_paid": invitee_paid,
+			"count": count,
+		}
+		for (status, reward_status, amount_cents, inviter_paid, invitee_paid), count in counts.items()
+	]
+
+
+def build_summary(groups, counter_seq, tiers=REWARD_TIERS, wallet_balance=None):
+	"""Roll invite groups (see group_invites) up into the summary + funnel.
+
+	Returns {summary, funnel}, all JSON-serializable. Covers every invite the
+	groups count — the row table is paged separately (build_rows_query).
 	"""
-	rows = []
 	status_counts = {status: 0 for status in KNOWN_REWARD_STATUSES}
 	unknown = 0
 	unrewarded = 0
 	invites_sent_open = 0  # SENT: delivered, awaiting redemption
 	invites_expired = 0  # EXPIRED: never redeemed (or revoked)
-	total_invites = len(invites)
+	total_invites = 0
 	sent = 0
 	accepted = 0
 	rewarded = 0
 	total_disbursed_cents = 0
 	by_tier = {}  # amount_cents -> {amount_dollars, count_parties, dollars}
 
-	for inv in invites:
-		status = inv.get("status")
-		reward_status = inv.get("reward_status")
+	for group in groups:
+		n = group.get("count") or 0
+		status = group.get("status")
+		reward_status = group.get("reward_status")
+		total_invites += n
 
 		# EXPIRED invites were (almost always) sent first — the backend flips
 		# SENT -> EXPIRED on a post-expiry redemption attempt or admin revoke —
 		# so they stay in the "sent" denominator to keep Accepted% honest. The
 		# rare PENDING -> EXPIRED admin-revoke slightly overcounts "sent".
 		if status in ("SENT", "ACCEPTED", "EXPIRED"):
-			sent += 1
+			sent += n
 		if status == "ACCEPTED":
-			accepted += 1
+			accepted += n
+			if not reward_status:
+				unrewarded += n
+		elif status == "SENT":
+			invites_sent_open += n
+		elif status == "EXPIRED":
+			invites_expired += n
 		if reward_status in REWARDED_STATUSES:
-			rewarded += 1
+			rewarded += n
 		if reward_status in status_counts:
-			status_counts[reward_status] += 1
+			status_counts[reward_status] += n
 		elif reward_status:
 			# A status this page doesn't know — backend drift. Fail-visible.
-			unknown += 1
+			unknown += n
 
-		amount_cents = inv.get("reward_amount_cents") or 0
-		inviter_paid = bool(inv.get("inviter_rewarded_at"))
-		invitee_paid = bool(inv.get("invitee_rewarded_at"))
-		parties_paid = (1 if inviter_paid else 0) + (1 if invitee_paid else 0)
+		amount_cents = group.get("reward_amount_cents") or 0
+		parties_paid = (1 if group.get("inviter_paid") else 0) + (1 if group.get("invitee_paid") else 0)
 		if parties_paid and amount_cents:
-			disbursed = amount_cents * parties_paid
+			disbursed = amount_cents * parties_paid * n
 			total_disbursed_cents += disbursed
 			bucket = by_tier.setdefault(
 				amount_cents,
 				{"amount_dollars": amount_cents / 100.0, "count_parties": 0, "dollars": 0.0},
 			)
-			bucket["count_parties"] += parties_paid
+			bucket["count_parties"] += parties_paid * n
 			bucket["dollars"] += disbursed / 100.0
 
-		# Every invite is a table row. ACCEPTED (redeemed) rows carry the reward
-		# lifecycle; un-redeemed rows (SENT/EXPIRED/anything else) surface the
-		# invite lifecycle in the reward column instead — lowercased, so an
-		# unknown backend status renders fail-visible (the page tones unlisted
-		# values as warnings), matching the reward-status drift philosophy.
-		inviter = accounts.get(inv.get("inviter_id")) or {}
-		if status == "ACCEPTED":
-			if not reward_status:
-				unrewarded += 1
-			invitee = accounts.get(inv.get("redeemed_by_id")) or {}
-			row_invitee = invitee.get("username") or inv.get("contact") or "—"
-			row_reward_status = reward_status or "unrewarded"
-		else:
-			row_invitee = inv.get("contact") or "—"
-			if status == "SENT":
-				invites_sent_open += 1
-				row_reward_status = "sent"
-			elif status == "EXPIRED":
-				invites_expired += 1
-				row_reward_status = "expired"
-			elif status == "PENDING":
-				# "unsent", NOT "pending": the IBEX reward-status bucket already
-				# owns "pending" — a lifecycle collision would leak these rows
-				# into the money-moved reconciliation filter.
-				row_reward_status = "unsent"
-			else:
-				row_reward_status = (status or "unknown").lower()
-		rows.append(
-			{
-				"invite_id": inv.get("invite_id"),
-				"invitee": row_invitee,
-				"inviter": inviter.get("username") or "—",
-				"status": status,
-				"reward_status": row_reward_status,
-				"reward_amount_dollars": (amount_cents / 100.0) if amount_cents else None,
-				"reward_seq": inv.get("reward_seq"),
-				"created_at": inv.get("created_at"),
-				"redeemed_at": inv.get("redeemed_at"),
-				"rewarded_at": inv.get("rewarded_at"),
-				"inviter_paid": inviter_paid,
-				"invitee_paid": invitee_paid,
-				"reward_error": inv.get("reward_error"),
-			}
-		)
-
-	rows.sort(key=lambda r: (r.get("redeemed_at") or r.get("created_at") or ""), reverse=True)
-	rows_total = len(rows)
-	if max_rows is not None and rows_total > max_rows:
-		# Actionable rows (failed/partial/pending/processing/unknown) must never
-		# be hidden by the cap — they are the rare rows ops has to reconcile.
-		# Only paid/unrewarded rows consume the cap budget; overall newest-first
-		# order is preserved by the single pass over the sorted list.
-		actionable_total = sum(1 for r in rows if _is_actionable(r))
-		budget = max(0, max_rows - actionable_total)
-		kept = []
-		for r in rows:
-			if _is_actionable(r):
-				kept.append(r)
-			elif budget > 0:
-				kept.append(r)
-				budget -= 1
-		rows = kept
-
 	current_tier_cents = current_tier(counter_seq, tiers)
 	current_tier_dollars = current_tier_cents / 100.0
 	runway = None
@@ -244,8 +257,6 @@ def build_overview(invites, accounts, counter_seq, tiers=REWARD_TIERS, wallet_ba
 		"referrals_until_next_tier": referrals_until_next_tier(counter_seq, tiers),
 		"wallet_balance_dollars": wallet_balance,
 		"wallet_runway_referrals": runway,
-		"rows_total": rows_total,
-		"rows_shown": len(rows),
 	}
 
 	funnel = [
@@ -255,4 +266,125 @@ def build_overview(invites, accounts, counter_seq, tiers=REWARD_TIERS, wallet_ba
 		{"stage": "Rewarded", "count": rewarded, "conversion": _pct(rewarded, accepted)},
 	]
 
-	return {"rows": rows, "summary": summary, "funnel": funnel}
+	return {"summary": summary, "funnel": funnel}
+
+
+def build_overview(invites, accounts, counter_seq, tiers=REWARD_TIERS, wallet_balance=None, max_rows=200):
+	"""Join invites to accounts and roll up the referral-reward picture.
+
+	In-memory variant over a full invite list — the endpoint pages rows from
+	mongo instead (build_rows_query) and feeds build_summary from a `$group`.
+
+	Args:
+	    invites: list of invite dicts (see mongo_reader.load_invites) — snake_case.
+	    accounts: str(account _id) -> {username, ...} (mongo_reader.load_accounts).
+	    counter_seq: int, the global referral sequence so far.
+	    tiers: the reward schedule.
+	    wallet_balance: live USD balance of the funding wallet, or None.
+	    max_rows: cap on the returned row list (newest first). Actionable rows
+	        (anything except clean "paid" / "unrewarded") ALWAYS survive the cap —
+	        only paid/unrewarded rows are truncated — so every row ops must act on
+	        is reachable. The summary aggregates still cover every invite.
+	        None = no cap.
+
+	Returns {rows, summary, funnel}, all JSON-serializable.
+	"""
+	rows = [build_row(inv, accounts) for inv in invites]
+	rows.sort(key=lambda r: (r.get("redeemed_at") or r.get("created_at") or ""), reverse=True)
+	rows_total = len(rows)
+	if max_rows is not None and rows_total > max_rows:
+		# Actionable rows (failed/partial/pending/processing/unknown) must never
+		# be hidden by the cap — they are the rare rows ops has to reconcile.
+		# Only paid/unrewarded rows consume the cap budget; overall newest-first
+		# order is preserved by the single pass over the sorted list.
+		actionable_total = sum(1 for r in rows if _is_actionable(r))
+		budget = max(0, max_rows - actionable_total)
+		kept = []
+		for r in rows:
+			if _is_actionable(r):
+				kept.append(r)
+			elif budget > 0:
+				kept.append(r)
+				budget -= 1
+		rows = kept
+
+	overview = build_summary(group_invites(invites), counter_seq, tiers=tiers, wallet_balance=wallet_balance)
+	overview["summary"]["rows_total"] = rows_total
+	overview["summary"]["rows_shown"] = len(rows)
+	overview["rows"] = rows
+	return overview
+
+
+# ── Paged row queries ──────────────────────────────────────────────────────
+
+# Table filter key -> the `invites` fields that select it. Keys are the row
+# `reward_status` values the page's chips filter on (see _row_reward_status),
+# plus "actionable" (everything _is_actionable keeps past the old row cap).
+# A missing field matches None in $in/$nin, so "unrewarded" covers both an
+# absent and a null rewardStatus.
+ROW_FILTERS = {
+	"paid": {"status": "ACCEPTED", "rewardStatus": "paid"},
+	"pending": {"status": "ACCEPTED", "rewardStatus": "pending"},
+	"partial": {"status": "ACCEPTED", "rewardStatus": "partial"},
+	"failed": {"status": "ACCEPTED", "rewardStatus": "failed"},
+	"processing": {"status": "ACCEPTED", "rewardStatus": "processing"},
+	"unrewarded": {"status": "ACCEPTED", "rewardStatus": {"$in": [None, ""]}},
+	"actionable": {"status": "ACCEPTED", "rewardStatus": {"$nin": [None, "", "paid"]}},
+	"sent": {"status": "SENT"},
+	"expired": {"status": "EXPIRED"},
+	"unsent": {"status": "PENDING"},
+}
+
+# Newest activity first: redemption time, falling back to creation time for
+# rows never redeemed (rows with neither sort last), with _id as the tiebreak
+# so skip/limit pages are stable. A computed key, so rows page through an
+# aggregation rather than find().sort().
+ROWS_SORT_KEY = {"$ifNull": ["$redeemedAt", "$createdAt"]}
+
+
+def build_rows_query(
+	reward_status=None, tier_cents=None, created_from=None, created_before=None, inviter_ids=None
+):
+	"""Mongo filter for one page of invite rows.
+
+	Every argument is optional and they AND together. Values are passed
+	through untouched (the caller supplies datetimes / ObjectIds), so this
+	stays IO-free.
+
+	Args:
+	    reward_status: a ROW_FILTERS key ("all"/None = no status filter).
+	    tier_cents: per-party reward amount, in cents.
+	    created_from / created_before: half-open createdAt range.
+	    inviter_ids: inviter account _ids; an empty list matches nothing.
+
+	Raises ValueError for an unknown reward_status.
+	"""
+	query = {}
+	if reward_status and reward_status != "all":
+		if reward_status not in ROW_FILTERS:
+			raise ValueError(f"unknown reward status filter: {reward_status}")
+		query.update(ROW_FILTERS[reward_status])
+	if tier_cents:
+		query["rewardAmountCents"] = tier_cents
+	created = {}
+	if created_from is not None:
+		created["$gte"] = created_from
+	if created_before is not None:
+		created["$lt"] = created_before
+	if created:
+		query["createdAt"] = created
+	if inviter_ids is not None:
+		query["inviterId"] = {"$in": list(inviter_ids)}
+	return query
+
+
+def build_rows_pipeline(query, skip, limit):
+	"""Aggregation stages for one page of invite rows matching `query`, in
+	ROWS_SORT_KEY order (see build_rows_query for the filter)."""
+	return [
+		{"$match": query},
+		{"$addFields": {"_sortAt": ROWS_SORT_KEY}},
+		{"$sort": {"_sortAt": -1, "_id": -1}},
+		{"$skip": skip},
+		{"$limit": limit},
+	]
@@ -20,6 +20,7 @@ import requests
 
 from .auth import audit_log, require_financial, require_roles
 from .common import handle_api_errors
+from .endpoint_cache import swr_cached
 from .ibex_client import IbexClient
 from .ibex_status import invoice_settled
 from .mongo_reader import load_accounts, load_wallets
@@ -197,9 +198,13 @@ def _outstanding_payables():
 @frappe.whitelist()
 @require_financial()
 @handle_api_errors
+@swr_cached(fresh_seconds=15, max_stale_seconds=300)
 def get_system_accounts():
 	"""Live treasury snapshot: every system/watchlist wallet with its IBEX
-	balance, plus payables coverage. Small N — fetched live, no snapshotting."""
+	balance, plus payables coverage. Small N — fetched live, no snapshotting;
+	concurrent page loads share one IBEX fan-out through swr_cached, and the
+	page forces a recompute after every mutation (refresh=1). Transfers never
+	read this cache — they re-resolve wallets themselves."""
 	client = IbexClient()
 	accounts = _resolve_system_accounts()
 
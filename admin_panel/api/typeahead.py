@@ -0,0 +1,195 @@
+"""Account typeahead: prefix search over usernames, phones and ids.
+
+Exact-match lookups (identity, phone_index) answer "who is this?"; operators
+typing into Account Hub want suggestions while they type. This keeps one
+typeahead_core.PrefixIndex over every account (mongo `accounts` joined to
+phones from the Flash User rows of `Phone Index Entry`):
+
+  * The full index state lives in the shared cache under STATE_KEY and is
+    only written by rebuild_typeahead_index. Records changed since then sit
+    in the DELTA_KEY hash (account_id -> record), and META_KEY holds the
+    refresh bookkeeping. VERSION_KEY is (base id, delta id): each worker
+    keeps its own rehydrated copy, re-reads STATE_KEY only when the base id
+    moves and re-applies the (small) delta hash when only the delta id
+    does, so a lookup is one redis GET of the version plus an in-memory
+    bisect, and a refresh writes only what changed.
+  * refresh_typeahead_index — scheduled, incremental: accounts created in
+    the last RECENT_ACCOUNT_HOURS (usernames are usually set shortly after
+    signup, so recent accounts are re-read, not just new ones) and phone
+    index rows modified since the last run.
+  * rebuild_typeahead_index — scheduled nightly full build (catches
+    username / level / status changes on older accounts, compacts terms left
+    behind by incremental updates and folds the deltas back into the state).
+
+A lookup never builds the index: on a cold cache (first deploy, redis flush
+or eviction) it enqueues one rebuild and answers "warming up" until the
+rebuild lands.
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+import frappe
+from frappe.utils import cint
+
+from .auth import require_admin
+from .common import handle_api_errors
+from .mongo_reader import iter_account_handles
+from .phone_index import ENTRY_DOCTYPE, SOURCE_FLASH_USER
+from .typeahead_core import DEFAULT_LIMIT, MAX_LIMIT, PrefixIndex, to_record
+
+STATE_KEY = "admin_panel:typeahead:base"
+DELTA_KEY = "admin_panel:typeahead:delta"
+META_KEY = "admin_panel:typeahead:meta"
+VERSION_KEY = "admin_panel:typeahead:versions"
+REBUILD_CLAIM_KEY = "admin_panel:typeahead:rebuild_queued"
+
+# How far back an incremental refresh re-reads accounts. A state older than
+# this can't be caught up incrementally and is rebuilt instead.
+RECENT_ACCOUNT_HOURS = 24
+
+# A cold-cache lookup enqueues at most one rebuild per this many seconds.
+REBUILD_CLAIM_SECONDS = 600
+
+_local = {"version": None, "index": None}
+_local_lock = threading.Lock()
+
+
+@frappe.whitelist()
+@require_admin()
+@handle_api_errors
+def search_accounts_typeahead(query=None, limit=DEFAULT_LIMIT):
+	"""Top `limit` accounts whose username, phone, uuid or _id starts with `query`."""
+	started = time.perf_counter()
+	limit = max(1, min(cint(limit) or DEFAULT_LIMIT, MAX_LIMIT))
+	index = _current_index()
+	if index is None:
+		return {"success": False, "error": "The account typeahead index is warming up", "matches": []}
+	matches = index.search(query or "", limit=limit)
+	return {
+		"success": True,
+		"matches": matches,
+		"took_ms": round((time.perf_counter() - started) * 1000, 2),
+	}
+
+
+def refresh_typeahead_index():
+	"""Scheduled incremental refresh (rebuilds when there is nothing to extend)."""
+	if not frappe.conf.get("customer_mongo_uri"):
+		return None  # no accounts to index on a site without mongo
+	cache = frappe.cache()
+	meta, version = cache.get_value(META_KEY), cache.get_value(VERSION_KEY)
+	now = frappe.utils.now_datetime()
+	if not meta or not version or now - meta["refreshed_at"] > timedelta(hours=RECENT_ACCOUNT_HOURS):
+		return rebuild_typeahead_index()
+	index = _load_index()
+	if index is None:
+		return rebuild_typeahead_index()
+
+	records = {}
+	for fields in iter_account_handles(created_since=now - timedelta(hours=RECENT_ACCOUNT_HOURS)):
+		known = index.get(fields["account_id"])
+		# Keep the phone already joined in; phone changes arrive below.
+		fields["phone"] = known[4] if known else None
+		records[fields["account_id"]] = to_record(fields)
+
+	phones = _flash_user_phones(modified_since=meta["phones_since"])
+	if phones:
+		by_kratos = {r[3]: r for r in index.records() if r[3]}
+		by_kratos.update({r[3]: r for r in records.values() if r[3]})
+		for kratos_id, phone in phones.items():
+			record = by_kratos.get(kratos_id)
+			if record:
+				records[record[0]] = record[:4] + (phone,) + record[5:]
+	# Accounts new to the index still need their phone joined in.
+	unphoned = {r[3]: r for r in records.values() if r[4] is None and r[3] and index.get(r[0]) is None}
+	if unphoned:
+		for kratos_id, phone in _flash_user_phones(kratos_ids=unphoned).items():
+			record = unphoned[kratos_id]
+			records[record[0]] = record[:4] + (phone,) + record[5:]
+
+	changed = [record for record in records.values() if index.get(record[0]) != record]
+	for record in changed:
+		cache.hset(DELTA_KEY, record[0], record)
+	cache.set_value(META_KEY, {"refreshed_at": now, "phones_since": now})
+	if changed:
+		cache.set_value(VERSION_KEY, (version[0], frappe.generate_hash(length=12)))
+	index.upsert(changed)
+	return {"accounts": len(index), "changed": len(changed)}
+
+
+def rebuild_typeahead_index():
+	"""Scheduled full rebuild from mongo accounts and the phone index."""
+	if not frappe.conf.get("customer_mongo_uri"):
+		return None
+	now = frappe.utils.now_datetime()
+	phones = _flash_user_phones()
+	records = []
+	for fields in iter_account_handles():
+		fields["phone"] = phones.get(fields["kratos_user_id"])
+		records.append(to_record(fields))
+	index = PrefixIndex(records)
+	cache = frappe.cache()
+	cache.set_value(STATE_KEY, index.state())
+	cache.delete_value([DELTA_KEY, REBUILD_CLAIM_KEY])
+	cache.set_value(META_KEY, {"refreshed_at": now, "phones_since": now})
+	cache.set_value(VERSION_KEY, (frappe.generate_hash(length=12), None))
+	return {"accounts": len(index), "changed": len(index)}
+
+
+def _flash_user_phones(modified_since=None, kratos_ids=None):
+	"""{kratosUserId: phone} from the phone index (canonical form when known)."""
+	filters = {"source": SOURCE_FLASH_USER}
+	if modified_since:
+		filters["modified"] = (">=", modified_since)
+	if kratos_ids is not None:
+		filters["source_ref"] = ("in", list(kratos_ids))
+	rows = frappe.get_all(ENTRY_DOCTYPE, filters=filters, fields=["source_ref", "phone_e164", "raw_phone"])
+	return {row.source_ref: row.phone_e164 or row.raw_phone for row in rows}
+
+
+def _load_index(base=None):
+	"""The shared index with its deltas applied (a copy of `base` when given), or None."""
+	cache = frappe.cache()
+	if base is None:
+		state = cache.get_value(STATE_KEY)
+		if state is None:
+			return None
+	else:
+		state = base.state()
+	index = PrefixIndex.from_state(state)
+	index.upsert((cache.hgetall(DELTA_KEY) or {}).values())
+	return index
+
+
+def _current_index():
+	"""This worker's copy of the index, refreshed when the shared version moves.
+
+	None on a cold cache, after enqueueing a rebuild (at most one per
+	REBUILD_CLAIM_SECONDS across workers).
+	"""
+	cache = frappe.cache()
+	version = cache.get_value(VERSION_KEY)
+	if version is not None and version == _local["version"]:
+		return _local["index"]
+	with _local_lock:
+		if version is not None and version == _local["version"]:
+			return _local["index"]
+		local = _local["version"]
+		# Same base: only deltas moved, so patch a copy of what this worker has.
+		base = _local["index"] if version and local and local[0] == version[0] else None
+		index = _load_index(base) if version is not None else None
+		if index is None:
+			_enqueue_rebuild()
+			return None
+		_local["index"], _local["version"] = index, version
+		return index
+
+
+def _enqueue_rebuild():
+	cache = frappe.cache()
+	if not frappe.conf.get("customer_mongo_uri"):
+		return
+	if cache.set(cache.make_key(REBUILD_CLAIM_KEY), 1, nx=True, ex=REBUILD_CLAIM_SECONDS):
+		frappe.enqueue("admin_panel.api.typeahead.rebuild_typeahead_index", queue="long", timeout=1800)
@@ -0,0 +1,148 @@
+"""Pure in-memory prefix index behind the account typeahead.
+
+No frappe or IO imports (unit-tested directly). Every account contributes a
+handful of lowercased terms — username, account uuid, mongo _id and its
+phone's digits (full international, national 10 and subscriber suffix) — to
+one sorted list. A lookup is a `bisect` to the first term >= the query and a
+forward scan while terms still start with it, so its cost depends on k, not
+on the number of accounts.
+
+Records are plain tuples (RECORD_FIELDS order) to keep the index small
+enough to hold per worker and to ship through redis as one value.
+
+Incremental updates (`upsert`) replace a record in its slot and merge its new
+terms in; terms it no longer has are left behind and skipped at lookup time,
+until the next full rebuild compacts them away.
+"""
+
+import re
+from bisect import bisect_left
+from heapq import merge
+
+from .phone_index_core import SUFFIX_DIGITS
+
+RECORD_FIELDS = ("account_id", "uuid", "username", "kratos_user_id", "phone", "level", "status")
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Shorter queries match too much of the index to be useful suggestions.
+MIN_QUERY_LENGTH = 2
+
+# National number length (NANP) indexed alongside the full E.164 digits.
+_NATIONAL_DIGITS = 10
+
+_PHONE_SHAPED_RE = re.compile(r"^\+?[\d\s\-().]+$")
+_NON_DIGITS_RE = re.compile(r"\D")
+
+
+def normalize_query(query):
+	"""The term prefix to look up: digits for a phone-shaped query, else lowercase."""
+	query = (query or "").strip()
+	if _PHONE_SHAPED_RE.match(query):
+		digits = _NON_DIGITS_RE.sub("", query)
+		if digits:
+			return digits
+	return query.lower()
+
+
+def to_record(fields):
+	"""A record tuple from a dict carrying (some of) RECORD_FIELDS."""
+	return tuple(fields.get(name) for name in RECORD_FIELDS)
+
+
+def record_terms(record):
+	"""Every distinct term a record is findable by."""
+	account_id, uuid, username, _, phone = record[:5]
+	terms = [str(v).strip().lower() for v in (username, uuid, account_id) if v]
+	digits = _NON_DIGITS_RE.sub("", phone or "")
+	if digits:
+		terms += [digits, digits[-_NATIONAL_DIGITS:], digits[-SUFFIX_DIGITS:]]
+	return list(dict.fromkeys(t for t in terms if t))
+
+
+class PrefixIndex:
+	"""Sorted term list over account records; see the module docstring."""
+
+	def __init__(self, records=()):
+		self._records = []
+		self._slots = {}  # account_id -> position in _records
+		self._terms = []
+		self._owners = []  # parallel to _terms: slot of the record owning each term
+		self.upsert(records)
+
+	def __len__(self):
+		return len(self._records)
+
+	@classmethod
+	def from_state(cls, state):
+		"""Rehydrate from `state()` without re-sorting."""
+		index = cls()
+		index._records = list(state["records"])
+		index._terms = list(state["terms"])
+		index._owners = list(state["owners"])
+		index._slots = {record[0]: slot for slot, record in enumerate(index._records)}
+		return index
+
+	def state(self):
+		"""Plain, picklable form of the index (for the shared cache)."""
+		return {"records": self._records, "terms": self._terms, "owners": self._owners}
+
+	def get(self, account_id):
+		slot = self._slots.get(account_id)
+		return None if slot is None else self._records[slot]
+
+	def records(self):
+		return list(self._records)
+
+	def upsert(self, records):
+		"""Add or replace records (keyed by account_id); returns how many changed."""
+		pairs, changed = [], 0
+		for record in records:
+			record = tuple(record)
+			slot = self._slots.get(record[0])
+			if slot is None:
+				slot = len(self._records)
+				self._records.append(record)
+				self._slots[record[0]] = slot
+			elif self._records[slot] == record:
+				continue
+			else:
+				self._records[slot] = record
+			changed += 1
+			pairs.extend((term, slot) for term in record_terms(record))
+		if pairs:
+			pairs.sort()
+			merged = list(merge(zip(self._terms, self._owners, strict=True), pairs))
+			self._terms = [term for term, _ in merged]
+			self._owners = [slot for _, slot in merged]
+		return changed
+
+	def search(self, query, limit=DEFAULT_LIMIT):
+		"""Up to `limit` records with a term starting with `query`.
+
+		Exact matches sort first (a term equal to the prefix precedes every
+		longer one), then lexicographic term order. Each record appears once.
+		"""
+		prefix = normalize_query(query)
+		if len(prefix) < MIN_QUERY_LENGTH:
+			return []
+		limit = max(1, min(int(limit), MAX_LIMIT))
+		out, seen = [], set()
+		terms, owners = self._terms, self._owners
+		position = bisect_left(terms, prefix)
+		while position < len(terms) and len(out) < limit:
+			term = terms[position]
+			if not term.startswith(prefix):
+				break
+			slot = owners[position]
+			position += 1
+			if slot in seen:
+				continue
+			record = self._records[slot]
+			# A term left behind by an upsert no longer belongs to the record.
+			if term not in record_terms(record):
+				continue
+			seen.add(slot)
+			out.append(dict(zip(RECORD_FIELDS, record, strict=True)))
+		return out
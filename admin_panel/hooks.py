@@ -240,6 +240,38 @@ app_include_js = "/assets/admin_panel/js/back_to_dashboard.js"
 
 after_migrate = ["admin_panel.admin_panel.setup.after_migrate"]
 
+scheduler_events = {
+	"cron": {
+		# Bridge KYC customer mirror: a cheap incremental top-up (stops at the
+		# first unchanged customer) plus an hourly full reconcile that catches
+		# edits to older customers and drops ones Bridge no longer returns.
+		# Account typeahead index: recent accounts + phone changes on the same
+		# 5-minute tick, a full rebuild after the nightly phone index rebuild.
+		# Wallet census: resume a run whose worker died from its checkpoint,
+		# and start a totals-only float refresh when `census_totals_minutes`
+		# says one is due.
+		"*/5 * * * *": [
+			"admin_panel.api.bridge_kyc.sync_customer_mirror",
+			"admin_panel.api.typeahead.refresh_typeahead_index",
+			"admin_panel.api.census.resume_stalled_census",
+			"admin_panel.api.census.run_scheduled_totals_census",
+		],
+		"17 * * * *": ["admin_panel.api.bridge_kyc.reconcile_customer_mirror"],
+		# Phone lookup index: new users / modified Customers every 10 minutes,
+		# a full rebuild nightly (user phone edits carry no change stamp).
+		"*/10 * * * *": ["admin_panel.api.phone_index.sync_phone_index"],
+		"40 3 * * *": ["admin_panel.api.phone_index.rebuild_phone_index"],
+		"55 3 * * *": ["admin_panel.api.typeahead.rebuild_typeahead_index"],
+	},
+}
+
+doc_events = {
+	"Customer": {
+		"on_update": "admin_panel.api.phone_index.index_customer",
+		"on_trash": "admin_panel.api.phone_index.unindex_customer",
+	},
+}
+
 doctype_dashboards = {
 	"Allowed Country": "admin_panel.admin_panel.doctype.allowed_country.allowed_country_dashboard",
 }
@@ -0,0 +1,27 @@
+import frappe
+
+from admin_panel.api.census_core import PAYLOAD_PREFIX, decode_payload, encode_payload
+
+# Rewrite Wallet Census Snapshot payloads stored as plain JSON into the
+# compressed envelope (census_core.encode_payload).
+#
+# Readers accept both forms, so this only reclaims space; it can run at any
+# point after the deploy and is safe to re-run (already-compressed fields are
+# skipped). One snapshot is rewritten and committed at a time — rows_json
+# holds a row per account, so loading every snapshot at once would not fit
+# comfortably in a migrate worker.
+
+FIELDS = ("totals_json", "bucket_counts_json", "rows_json")
+
+
+def execute():
+	for name in frappe.get_all("Wallet Census Snapshot", pluck="name"):
+		stored = frappe.db.get_value("Wallet Census Snapshot", name, FIELDS, as_dict=True)
+		updates = {
+			field: encode_payload(decode_payload(value))
+			for field, value in stored.items()
+			if value and not value.startswith(PAYLOAD_PREFIX)
+		}
+		if updates:
+			frappe.db.set_value("Wallet Census Snapshot", name, updates, update_modified=False)
+			frappe.db.commit()
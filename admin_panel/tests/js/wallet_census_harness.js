@@ -0,0 +1,97 @@
+/**
+ * Revalidation harness for the Wallet Census desk page.
+ *
+ * Loads the real wallet_census.js and drives WalletCensus.load_latest with a
+ * `fetch` that is answered by the real server endpoint: every request is
+ * written to stdout as one JSON line ({request: {url, headers}}), and the
+ * response is read back from stdin as one JSON line ({status, headers,
+ * body}). test_wallet_census_page_behavior.py runs get_latest_census for
+ * each request, so the ETag / If-None-Match / 304 round trip is exercised
+ * end to end. The observations go out last, as {done: ...}.
+ */
+
+const fs = require("fs");
+const path = require("path");
+const readline = require("readline");
+
+const PAGE_JS = path.join(
+	__dirname,
+	"..",
+	"..",
+	"admin_panel",
+	"page",
+	"wallet_census",
+	"wallet_census.js"
+);
+
+const lines = readline.createInterface({ input: process.stdin });
+const pending = [];
+lines.on("line", function (line) {
+	pending.shift()(JSON.parse(line));
+});
+
+function send(message) {
+	process.stdout.write(JSON.stringify(message) + "\n");
+}
+
+function fetchViaServer(url, options) {
+	return new Promise(function (resolve) {
+		pending.push(resolve);
+		send({ request: { url: url, headers: options.headers } });
+	}).then(function (answer) {
+		return {
+			status: answer.status,
+			ok: answer.status >= 200 && answer.status < 300,
+			headers: {
+				get: function (name) {
+					return answer.headers[name] || null;
+				},
+			},
+			json: function () {
+				return Promise.resolve(JSON.parse(answer.body));
+			},
+		};
+	});
+}
+
+const frappe = {
+	pages: { "wallet-census": {} },
+	csrf_token: "csrf-token",
+	utils: {
+		escape_html: function (text) {
+			return String(text);
+		},
+	},
+};
+
+const factory = new Function(
+	"frappe",
+	"fetch",
+	fs.readFileSync(PAGE_JS, "utf8") + "\nreturn WalletCensus;"
+);
+const WalletCensus = factory(frappe, fetchViaServer);
+
+// Skip the constructor (it builds the whole page); load_latest only needs
+// the render hooks, which record what they were handed instead.
+const page = Object.create(WalletCensus.prototype);
+const renders = [];
+const statuses = [];
+page.set_status = function (text) {
+	statuses.push(text);
+};
+page.render_summary = function () {
+	renders.push({ rows: this.rows.length, totals: this.totals });
+};
+page.render_distribution = page.render_buckets = page.render_table = function () {};
+
+async function main() {
+	const loads = Number(process.argv[2] || 2);
+	for (let i = 0; i < loads; i++) await page.load_latest();
+	send({ done: { renders: renders, statuses: statuses, etag: page.latest_etag || null } });
+	lines.close();
+}
+
+main().catch(function (err) {
+	process.stderr.write(String((err && err.stack) || err));
+	process.exit(1);
+});
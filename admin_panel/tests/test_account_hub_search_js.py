@@ -79,3 +79,14 @@ def test_graphql_client_lookups_tolerate_partial_responses():
 
 	assert "GraphQL partial response" in client_py
 	assert "if allow_not_found:" in client_py
+
+
+def test_typeahead_suggestions_run_behind_their_own_short_debounce():
+	"""Prefix suggestions come from the in-memory typeahead index on a short
+	debounce and are dropped when the operator has typed past their query."""
+	js = source()
+	assert "const debouncedTypeahead = debounce(" in js
+	assert "debouncedTypeahead();" in js
+	body = js.split("fetch_typeahead(query) {", 1)[1].split("\n\t}", 1)[0]
+	assert "admin_panel.api.typeahead.search_accounts_typeahead" in body
+	assert "this.$.searchInput.val().trim() !== query" in body
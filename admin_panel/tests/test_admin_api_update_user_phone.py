@@ -0,0 +1,96 @@
+"""Behavioral tests for update_user_phone_api's cache invalidation (admin_api).
+
+After a phone change the identity cache must forget the account under its
+uuid, username, the new number AND the number it had before — an entry still
+keyed on the old phone would keep resolving it to this account until its TTL
+ran out, on every worker. The old number is read before the mutation.
+"""
+
+import sys
+import types
+
+import pytest
+
+# admin_api pulls in frappe / jwt / requests (directly and via auth, common,
+# graphql_client, bridge_client, ibex_client); install stubs BEFORE
+# importing it, mirroring test_admin_api_id_document_url.py.
+
+
+def _ensure_module(name):
+	try:
+		__import__(name)
+	except ImportError:
+		sys.modules.setdefault(name, types.ModuleType(name))
+	return sys.modules[name]
+
+
+frappe = _ensure_module("frappe")
+if not hasattr(frappe, "whitelist"):
+	frappe.whitelist = lambda *args, **kwargs: (lambda func: func)
+if not hasattr(frappe, "ValidationError"):
+	frappe.ValidationError = type("ValidationError", (Exception,), {})
+if not hasattr(frappe, "PermissionError"):
+	frappe.PermissionError = type("PermissionError", (Exception,), {})
+
+_requests = _ensure_module("requests")
+if not hasattr(_requests, "exceptions"):
+	_requests.exceptions = types.SimpleNamespace(RequestException=type("RequestException", (Exception,), {}))
+
+_ensure_module("jwt")
+
+from admin_panel.api import admin_api
+
+UUID = "6a1e0f3c-uuid"
+OLD_PHONE = "+18765550000"
+NEW_PHONE = "+18765551234"
+
+
+@pytest.fixture()
+def api_env(monkeypatch):
+	events = []
+	monkeypatch.setattr(frappe, "response", {}, raising=False)
+	monkeypatch.setattr(frappe, "session", types.SimpleNamespace(user="Administrator"), raising=False)
+	monkeypatch.setattr(frappe, "logger", lambda: types.SimpleNamespace(error=events.append), raising=False)
+
+	class StubClient:
+		def update_user_phone(self, account_uuid, phone):
+			events.append(("update", account_uuid, phone))
+			return {"success": True}
+
+	def load_payer_identities(account_refs, usernames):
+		events.append(("read_phone", list(account_refs)))
+		return {UUID: {"account_id": "acc-1", "username": "jane", "phone": OLD_PHONE, "erp_party": None}}
+
+	monkeypatch.setattr(admin_api, "GraphQLClient", StubClient)
+	monkeypatch.setattr(admin_api, "load_payer_identities", load_payer_identities)
+	monkeypatch.setattr(admin_api, "invalidate", lambda *handles: events.append(("invalidate", *handles)))
+	monkeypatch.setattr(admin_api, "_reindex_account_phone", lambda *a: None)
+	monkeypatch.setattr(admin_api, "_update_local_upgrade_request_phone", lambda *a: 0)
+	return events
+
+
+def test_old_and_new_phone_are_both_invalidated(api_env):
+	result = admin_api.update_user_phone_api(account_uuid=UUID, phone=NEW_PHONE, username="jane")
+
+	assert result["success"] is True
+	assert api_env == [
+		("read_phone", [UUID]),  # before the mutation replaces it
+		("update", UUID, NEW_PHONE),
+		("invalidate", UUID, "jane", NEW_PHONE, OLD_PHONE),
+	]
+
+
+def test_failed_old_phone_lookup_does_not_block_the_update(api_env, monkeypatch):
+	def broken(account_refs, usernames):
+		raise RuntimeError("mongo down")
+
+	logged = []
+	monkeypatch.setattr(admin_api, "load_payer_identities", broken)
+	monkeypatch.setattr(frappe, "log_error", lambda *a, **k: logged.append(a), raising=False)
+	monkeypatch.setattr(frappe, "get_traceback", lambda *a, **k: "Traceback", raising=False)
+
+	result = admin_api.update_user_phone_api(account_uuid=UUID, phone=NEW_PHONE, username="jane")
+
+	assert result["success"] is True
+	assert ("invalidate", UUID, "jane", NEW_PHONE, None) in api_env
+	assert logged
@@ -12,6 +12,7 @@ from admin_panel.api.bridge_kyc_core import (
 	build_overview,
 	build_row,
 	flatten_missing,
+	plan_mirror_page,
 )
 
 BUSINESS_AWAITING_UBO = {
@@ -244,3 +245,46 @@ def test_build_detail_summarizes_each_endorsement():
 	assert base["complete_count"] == 2
 	assert "kyb_review" in base["missing"]
 	assert base["issues"] == ["aiprise_nature_of_business_needs_manual_review"]
+
+
+def _customer(customer_id, updated_at):
+	return {"id": customer_id, "status": "active", "updated_at": updated_at}
+
+
+def test_mirror_page_stops_at_first_unchanged_customer():
+	batch = [
+		_customer("new", "2026-10-19T10:00:00Z"),
+		_customer("edited", "2026-10-19T09:00:00Z"),
+		_customer("same", "2026-10-01T00:00:00Z"),
+		_customer("older", "2026-09-01T00:00:00Z"),
+	]
+	mirrored = {
+		"edited": "2026-10-18T00:00:00Z",
+		"same": "2026-10-01T00:00:00Z",
+		"older": "2026-08-01T00:00:00Z",
+	}
+
+	changed, reached = plan_mirror_page(batch, mirrored)
+	# Newest-first listing: past the first unchanged customer everything was
+	# seen by an earlier sync, so "older" is left to the full reconcile.
+	assert [c["id"] for c in changed] == ["new", "edited"]
+	assert reached is True
+
+
+def test_mirror_page_full_sweep_keeps_scanning():
+	batch = [
+		_customer("same", "2026-10-01T00:00:00Z"),
+		_customer("older", "2026-09-01T00:00:00Z"),
+	]
+	mirrored = {"same": "2026-10-01T00:00:00Z", "older": "2026-08-01T00:00:00Z"}
+
+	changed, reached = plan_mirror_page(batch, mirrored, stop_at_unchanged=False)
+	assert [c["id"] for c in changed] == ["older"]
+	assert reached is True
+
+
+def test_mirror_page_without_updated_at_is_always_rewritten():
+	batch = [{"id": "no-stamp", "status": "active"}]
+	changed, reached = plan_mirror_page(batch, {"no-stamp": None})
+	assert [c["id"] for c in changed] == ["no-stamp"]
+	assert reached is False
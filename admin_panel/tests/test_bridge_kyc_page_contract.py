@@ -28,11 +28,65 @@ WORKSPACE = json.loads(read(ADMIN_PANEL / "fixtures" / "workspace.json"))
 def test_endpoints_are_whitelisted_and_admin_gated():
 	"""Both endpoints carry the full decorator stack, in order — whitelist
 	alone would expose customer KYC PII to any logged-in user."""
-	for fn in ("get_kyc_overview", "get_kyc_customer"):
-		stack = f"@frappe.whitelist()\n@require_admin()\n@handle_api_errors\ndef {fn}("
+	cached = "@swr_cached(fresh_seconds=30)\n"
+	for fn, tail in (("get_kyc_overview", cached), ("get_kyc_customer", ""), ("sync_kyc_mirror", "")):
+		# The overview cache goes innermost so a cached hit still passes require_admin.
+		stack = f"@frappe.whitelist()\n@require_admin()\n@handle_api_errors\n{tail}def {fn}("
 		assert stack in BRIDGE_KYC_PY, f"{fn} is missing the whitelist/require_admin/handle_api_errors stack"
 
 
+def test_overview_reads_the_local_mirror_not_bridge():
+	"""Page loads must not sweep Bridge — only the mirror sync and the detail
+	endpoint talk to it."""
+	body = BRIDGE_KYC_PY.split("def get_kyc_overview", 1)[1].split("\n@frappe.whitelist", 1)[0]
+	assert "list_customers" not in body
+	assert "_mirrored_customers()" in body
+
+
+def test_first_run_reconcile_is_enqueued_not_run_inline():
+	"""A never-synced site must not sweep Bridge (and commit) inside the GET;
+	it enqueues the reconcile and answers `syncing`, which the page polls."""
+	body = BRIDGE_KYC_PY.split("def get_kyc_overview", 1)[1].split("\n@frappe.whitelist", 1)[0]
+	assert "_run_mirror_sync" not in body
+	assert "frappe.db.commit" not in body
+	assert '"admin_panel.api.bridge_kyc.reconcile_customer_mirror"' in body
+	assert "deduplicate=True" in body
+	assert 'overview["syncing"] = True' in body
+	assert "d.syncing" in PAGE_JS
+	assert "BK_SYNC_POLL_MS" in PAGE_JS
+
+
+def test_mirror_sync_is_scheduled():
+	hooks = read(ADMIN_PANEL / "hooks.py")
+	assert "admin_panel.api.bridge_kyc.sync_customer_mirror" in hooks
+	assert "admin_panel.api.bridge_kyc.reconcile_customer_mirror" in hooks
+
+
+def test_mirror_doctype_is_keyed_by_customer_id():
+	doctype = json.loads(
+		read(
+			ADMIN_PANEL / "admin_panel" / "doctype" / "bridge_customer_mirror" / "bridge_customer_mirror.json"
+		)
+	)
+	assert doctype["name"] == "Bridge Customer Mirror"
+	assert doctype["autoname"] == "field:customer_id"
+	assert doctype["track_changes"] == 0
+
+
+def test_raw_kyc_payload_is_system_manager_only():
+	"""The desk form must not hand the raw Bridge payload (KYC PII beyond what
+	the page shows) to the roles that only see the curated overview/detail."""
+	doctype = json.loads(
+		read(
+			ADMIN_PANEL / "admin_panel" / "doctype" / "bridge_customer_mirror" / "bridge_customer_mirror.json"
+		)
+	)
+	payload = next(f for f in doctype["fields"] if f["fieldname"] == "payload_json")
+	assert payload["permlevel"] == 1
+	raw_readers = [p["role"] for p in doctype["permissions"] if p.get("permlevel") == 1 and p.get("read")]
+	assert raw_readers == ["System Manager"]
+
+
 def test_bridge_client_is_read_only():
 	"""The Bridge client must never grow a write — KYC state is owned by the
 	flash backend + Bridge dashboard, this page only observes it."""
@@ -63,6 +117,7 @@ def test_common_error_handler_catches_bridge_errors():
 def test_js_wires_the_bridge_kyc_endpoints():
 	assert 'method: "admin_panel.api.bridge_kyc.get_kyc_overview"' in PAGE_JS
 	assert 'method: "admin_panel.api.bridge_kyc.get_kyc_customer"' in PAGE_JS
+	assert 'method: "admin_panel.api.bridge_kyc.sync_kyc_mirror"' in PAGE_JS
 
 
 def test_js_role_gates_up_front():
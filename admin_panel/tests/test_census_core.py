@@ -5,12 +5,15 @@ correctness risk lives in `build_census`, which is a pure function.
 """
 
 import sys
+import time
 from pathlib import Path
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(REPO_ROOT) not in sys.path:
 	sys.path.insert(0, str(REPO_ROOT))
 
+import pytest
+
 from admin_panel.api.census_core import build_census
 
 
@@ -146,11 +149,42 @@ def test_currency_falls_back_to_currency_id_when_wallet_missing():
 	assert rows["acc-orphan"]["username"] is None
 
 
-def test_rows_sorted_by_balance_desc():
-	rows = build_census(*_fixture())["rows"]
-	balances = [r["balance"] for r in rows]
+def test_top_funded_lists_the_richest_accounts_first():
+	totals = build_census(*_fixture())["totals"]
+	balances = [r["balance"] for r in totals["top_funded"]]
 	assert balances == sorted(balances, reverse=True)
-	assert rows[0]["account_id"] == "acc-dealer"  # 9000 is the largest
+	assert totals["top_funded"][0]["account_id"] == "acc-dealer"  # 9000 is the largest
+	assert len(totals["top_funded"]) == totals["funded"]
+
+
+def test_balance_quantiles_are_within_the_sketch_accuracy():
+	from admin_panel.api.census_core import SKETCH_RELATIVE_ACCURACY, BalanceSketch
+
+	sketch = BalanceSketch()
+	values = [1.5**i / 1000 for i in range(60)] * 3
+	for value in values:
+		sketch.add(value)
+	ordered = sorted(values)
+	for q in (0.5, 0.9, 0.99):
+		exact = ordered[int(q * (len(ordered) - 1))]
+		assert abs(sketch.quantile(q) - exact) <= exact * SKETCH_RELATIVE_ACCURACY + 0.005
+	assert sum(b["count"] for b in sketch.histogram()) == len(values)
+	assert BalanceSketch().quantile(0.5) is None
+
+
+def test_totals_carry_the_funded_distribution():
+	ibex = [
+		{"id": f"w{i}", "name": f"a{i}", "currencyId": 3, "balance": b}
+		for i, b in enumerate([0.5, 5, 50, 500, 0])
+	]
+	totals = build_census(ibex, {}, {}, {})["totals"]
+	assert totals["balance_quantiles"]["p50"] == pytest.approx(5, rel=0.011)  # lower median of 4
+	assert [(b["lower"], b["count"]) for b in totals["balance_histogram"]] == [
+		(0.1, 1),
+		(1, 1),
+		(10, 1),
+		(100, 1),
+	]
 
 
 def test_empty_input():
@@ -217,6 +251,65 @@ def test_sweep_pages_empty_first_page():
 	assert list(sweep_pages(lambda p: [], max_pages=5)) == []
 
 
+def test_sweep_pages_resumes_from_start_page():
+	from admin_panel.api.census_core import sweep_pages
+
+	pages = {3: ["c"], 4: ["d"], 5: []}
+	fetched = []
+
+	def fetch(page):
+		fetched.append(page)
+		return pages[page]
+
+	assert [p for p, _ in sweep_pages(fetch, max_pages=10, start_page=3)] == [3, 4]
+	assert fetched == [3, 4, 5]
+
+
+def test_shards_stride_the_page_space_and_cover_every_page():
+	from admin_panel.api.census_core import shard_start_page, sweep_pages
+
+	def fetch(page):
+		return [{"id": f"w{page}"}] if page <= 7 else []
+
+	swept = []
+	for shard in range(3):
+		start = shard_start_page(shard, 3)
+		swept += [p for p, _ in sweep_pages(fetch, max_pages=10, start_page=start, step=3)]
+	assert sorted(swept) == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_resumed_shard_skips_its_committed_pages():
+	from admin_panel.api.census_core import shard_start_page
+
+	assert shard_start_page(1, 3, committed_pages=[1, 2, 3, 5]) == 8
+	assert shard_start_page(0, 3, committed_pages=[2, 3, 5]) == 1
+
+
+def test_resume_point_stops_at_the_first_gap():
+	"""Pages past a gap were written out of order before a crash and are
+	fetched again rather than trusted."""
+	from admin_panel.api.census_core import resume_point
+
+	assert resume_point([]) == 0
+	assert resume_point([1, 2, 3]) == 3
+	assert resume_point([1, 2, 4, 5]) == 2
+	assert resume_point([2, 3]) == 0
+
+
+def test_merge_spooled_pages_dedupes_shifted_accounts():
+	"""A resumed sweep can see an account on two pages when new accounts
+	shifted the page boundaries; it must be counted once (fresher copy)."""
+	from admin_panel.api.census_core import merge_spooled_pages
+
+	pages = [
+		[{"id": "w1", "balance": 1}, {"id": "w2", "balance": 2}],
+		[{"id": "w2", "balance": 5}, {"id": "w3", "balance": 3}],
+	]
+	merged = merge_spooled_pages(pages)
+	assert [a["id"] for a in merged] == ["w1", "w2", "w3"]
+	assert merged[1]["balance"] == 5
+
+
 def test_rewards_role_is_system_not_customer():
 	"""A role='rewards' account is a Flash-internal system account, not a real
 	customer: it must land in the 'system' bucket, be flagged is_system, and
@@ -271,3 +364,400 @@ def test_micro_dust_is_not_funded():
 	assert row["buckets"] == ["active_zero"]
 	assert result["totals"]["funded"] == 0
 	assert result["bucket_counts"]["active_funded"] == 0
+
+
+def test_builder_fed_page_by_page_matches_build_census():
+	"""The job streams pages through CensusBuilder; its final result must be
+	exactly what build_census returns for the whole sweep."""
+	from admin_panel.api.census_core import CensusBuilder
+
+	ibex, wallets, accounts, migrations = _fixture()
+	builder = CensusBuilder(wallets, accounts, migrations)
+	for start in range(0, len(ibex), 2):
+		builder.add(ibex[start : start + 2])
+	assert builder.result() == build_census(ibex, wallets, accounts, migrations)
+
+
+def test_builder_partial_reports_running_totals_and_top_balances():
+	from admin_panel.api.census_core import PARTIAL_TOP_N, CensusBuilder
+
+	builder = CensusBuilder({}, {}, {})
+	builder.add([{"id": f"w{i}", "name": f"a{i}", "currencyId": 3, "balance": i} for i in range(1, 16)])
+	builder.add([{"id": "w1", "name": "a1", "currencyId": 3, "balance": 999}])  # re-seen: ignored
+	partial = builder.partial()
+	assert partial["totals"]["usd"]["balance"] == 120.0
+	assert partial["totals"]["accounts"] == 15
+	assert partial["bucket_counts"]["unmatched"] == 15
+	assert [r["balance"] for r in partial["top_funded"]] == [
+		float(b) for b in range(15, 15 - PARTIAL_TOP_N, -1)
+	]
+
+
+def test_builder_joined_batch_by_batch_matches_build_census():
+	from admin_panel.api.census_core import CensusBuilder, join_keys
+
+	ibex, wallets, accounts, migrations = _fixture()
+	btc = sum(1 for w in wallets.values() if (w.get("currency") or "").lower() == "btc")
+	builder = CensusBuilder({}, {}, migrations, btc_wallet_count=btc)
+	for batch in (ibex[:2], ibex[2:]):
+		wallet_ids, account_ids = join_keys(batch)
+		builder.join(
+			{w: wallets[w] for w in wallet_ids if w in wallets},
+			{a: accounts[a] for a in account_ids if a in accounts},
+		)
+		builder.add(batch)
+	assert builder.result() == build_census(ibex, wallets, accounts, migrations)
+
+
+def test_totals_only_builder_matches_full_totals_without_rows():
+	from admin_panel.api.census_core import CensusBuilder, join_keys
+
+	ibex, wallets, accounts, migrations = _fixture()
+	full = build_census(ibex, wallets, accounts, migrations)
+	builder = CensusBuilder({}, {}, {}, totals_only=True)
+	for batch in (ibex[:2], ibex[2:]):
+		_, account_ids = join_keys(batch)
+		# Only what mongo_reader.load_account_statuses_by_ids reads.
+		builder.join(
+			{},
+			{
+				a: {k: accounts[a].get(k) for k in ("username", "role", "status")}
+				for a in account_ids
+				if a in accounts
+			},
+		)
+		builder.add(batch)
+	result = builder.result()
+	assert result["rows"] == [] and result["account_rollup"] == []
+	for key in ("usd", "usdt", "accounts", "funded", "zero", "top_funded", "balance_quantiles"):
+		assert result["totals"][key] == full["totals"][key]
+	assert result["totals"]["btc"]["wallet_count"] is None
+	expected = {k: n for k, n in full["bucket_counts"].items() if k not in ("migrated", "non_default_wallet")}
+	assert result["bucket_counts"] == expected
+	assert len(builder.accounts) <= 4  # only the last batch's join is held
+
+
+def test_join_keys_dedupe_in_order():
+	from admin_panel.api.census_core import join_keys
+
+	batch = [{"id": "w2", "name": "a1"}, {"id": "w1", "name": "a1"}, {"id": "w2"}, {"name": None}]
+	assert join_keys(batch) == (["w2", "w1"], ["a1"])
+
+
+def test_payload_envelope_round_trips_and_reads_legacy_json():
+	import json
+
+	import pytest
+
+	from admin_panel.api.census_core import PAYLOAD_PREFIX, decode_payload, encode_payload
+
+	result = build_census(*_fixture())
+	stored = encode_payload(result["rows"])
+	assert stored.startswith(PAYLOAD_PREFIX)
+	assert len(stored) < len(json.dumps(result["rows"]))
+	assert decode_payload(stored) == result["rows"]
+	assert decode_payload(json.dumps(result["totals"])) == result["totals"]  # written before compression
+	assert decode_payload(None, []) == []
+	with pytest.raises(ValueError):
+		decode_payload("zz9:AAAA")
+
+
+def test_payload_items_stream_out_of_compressed_and_plain_payloads():
+	import json
+
+	from admin_panel.api.census_core import encode_payload, iter_payload_items
+
+	rows = build_census(*_fixture())["rows"] * 50
+	for chunk_chars in (4, 7, 1000):
+		assert list(iter_payload_items(encode_payload(rows), chunk_chars)) == rows
+		assert list(iter_payload_items(json.dumps(rows, indent=1), chunk_chars)) == rows
+	assert list(iter_payload_items("[1, 22, 333]", chunk_chars=2)) == [1, 22, 333]
+	assert list(iter_payload_items(None)) == []
+	with pytest.raises(ValueError):
+		list(iter_payload_items(encode_payload(rows)[:-40]))
+	with pytest.raises(ValueError):
+		list(iter_payload_items('{"a": 1}'))
+
+
+def test_decode_payload_sized_reports_the_json_length():
+	import json
+
+	from admin_panel.api.census_core import decode_payload_sized, encode_payload
+
+	rows = build_census(*_fixture())["rows"]
+	text = json.dumps(rows, separators=(",", ":"))
+	assert decode_payload_sized(encode_payload(rows)) == (rows, len(text))
+	assert decode_payload_sized(None, []) == ([], 0)
+
+
+def test_payload_lru_is_bounded_by_size_not_entry_count():
+	from admin_panel.api.census_core import PayloadLRU
+
+	lru = PayloadLRU(max_bytes=100, ttl_seconds=60)
+	lru.put(("rows", "a"), "A", 40)
+	lru.put(("summary", "a"), "a", 5)
+	lru.put(("rows", "b"), "B", 50)
+	assert lru.get(("rows", "a")) == "A"  # now most recently used
+	lru.put(("summary", "b"), "b", 10)  # 105 bytes: evicts the least recently used
+	assert lru.get(("summary", "a")) is None
+	assert lru.get(("rows", "a")) == "A"
+	assert lru.size == 100
+	lru.put(("rows", "huge"), "H", 101)  # larger than the budget: never kept
+	assert lru.get(("rows", "huge")) is None
+	assert lru.size == 100
+	lru.discard(("rows", "a"))
+	assert lru.get(("rows", "a")) is None
+	assert lru.size == 60
+
+
+def test_payload_lru_entries_expire():
+	from admin_panel.api.census_core import PayloadLRU
+
+	now = [0.0]
+	lru = PayloadLRU(max_bytes=100, ttl_seconds=10, clock=lambda: now[0])
+	lru.put("k", "v", 1)
+	now[0] = 10.0
+	assert lru.get("k") is None
+	assert lru.size == 0
+
+
+def _diff_row(wallet_id, balance, buckets=("active_funded",), currency="Usd"):
+	return {
+		"wallet_id": wallet_id,
+		"account_id": f"acc-{wallet_id}",
+		"username": None,
+		"currency": currency,
+		"balance": balance,
+		"buckets": list(buckets),
+	}
+
+
+def test_diff_census_reports_new_closed_movers_and_transitions():
+	from admin_panel.api.census_core import diff_census
+
+	before = [
+		_diff_row("w1", 10.0),
+		_diff_row("w2", 5.0),
+		_diff_row("w3", 8.0, ("closed_with_dust",)),
+		_diff_row("w-gone", 2.0),
+	]
+	after = [
+		_diff_row("w1", 25.0),
+		_diff_row("w2", 1.0),
+		_diff_row("w3", 0.0, ("active_zero",)),
+		_diff_row("w-new", 4.0, currency="Usdt"),
+	]
+	diff = diff_census(before, after)
+	assert diff["counts"] == {"new": 1, "closed": 1, "gainers": 1, "losers": 2}
+	assert [m["wallet_id"] for m in diff["gainers"]] == ["w1"]
+	assert diff["gainers"][0]["delta"] == 15.0
+	assert [m["wallet_id"] for m in diff["losers"]] == ["w3", "w2"]  # largest drop first
+	assert diff["new"][0] == {**diff["new"][0], "wallet_id": "w-new", "before": None, "after": 4.0}
+	assert diff["closed"][0]["wallet_id"] == "w-gone"
+	assert diff["bucket_transitions"] == {"closed_with_dust->active_zero": 1}
+	assert diff["float_delta"] == {"usd": 1.0, "usdt": 4.0}
+
+
+def test_diff_census_keeps_only_the_top_n_of_each_list():
+	from admin_panel.api.census_core import diff_census
+
+	before = [_diff_row(f"w{i}", 0.0) for i in range(100)]
+	after = [_diff_row(f"w{i}", float(i)) for i in range(100)]
+	diff = diff_census(before, after, top_n=3)
+	assert diff["counts"]["gainers"] == 99
+	assert [m["wallet_id"] for m in diff["gainers"]] == ["w99", "w98", "w97"]
+
+
+def test_account_rollup_sums_wallets_and_default_share():
+	ibex = [
+		{"id": "w-usd", "name": "acc-1", "currencyId": 3, "balance": 30.0},
+		{"id": "w-usdt", "name": "acc-1", "currencyId": 29, "balance": 10.0},
+		{"id": "w-other", "name": "acc-2", "currencyId": 3},
+	]
+	accounts = {
+		"acc-1": {"username": "jane", "status": "active", "default_wallet_id": "w-usd"},
+		"acc-2": {"username": "joe", "status": "active", "default_wallet_id": "w-other"},
+	}
+	rollup = build_census(ibex, {}, accounts, {})["account_rollup"]
+	assert [a["account_id"] for a in rollup] == ["acc-1", "acc-2"]
+	jane, joe = rollup
+	assert (jane["wallet_count"], jane["balance"], jane["usd"], jane["usdt"]) == (2, 40.0, 30.0, 10.0)
+	assert jane["default_wallet_share"] == 0.75
+	assert joe["balance"] == 0.0 and joe["default_wallet_share"] is None
+
+
+def _group_row(level, currency, balance, buckets=(), created_at="2026-03-04T10:00:00"):
+	return {
+		"level": level,
+		"status": "active",
+		"role": "user",
+		"currency": currency,
+		"balance": balance,
+		"buckets": list(buckets),
+		"migration_status": None,
+		"created_at": created_at,
+	}
+
+
+def test_group_census_counts_sums_and_averages_per_group():
+	from admin_panel.api.census_core import group_census
+
+	rows = [
+		_group_row(1, "Usd", 10.0),
+		_group_row(1, "Usd", 0.0),
+		_group_row(2, "Usdt", 30.0, created_at="2026-04-01T00:00:00"),
+	]
+	assert group_census(rows, ["level", "currency"]) == [
+		{
+			"level": 2,
+			"currency": "Usdt",
+			"count": 1,
+			"funded_count": 1,
+			"sum_balance": 30.0,
+			"avg_balance": 30.0,
+		},
+		{
+			"level": 1,
+			"currency": "Usd",
+			"count": 2,
+			"funded_count": 1,
+			"sum_balance": 10.0,
+			"avg_balance": 5.0,
+		},
+	]
+	assert group_census(rows, ["created_month"], ["count"]) == [
+		{"created_month": "2026-04", "count": 1},
+		{"created_month": "2026-03", "count": 2},
+	]
+	assert group_census(rows, ["level"], ["count"], funded_only=True) == [
+		{"level": 2, "count": 1},
+		{"level": 1, "count": 1},
+	]
+
+
+def test_group_census_counts_a_row_in_each_of_its_buckets():
+	from admin_panel.api.census_core import group_census
+
+	rows = [_group_row(1, "Usd", 5.0, ("active_funded", "migrated")), _group_row(1, "Usd", 0.0)]
+	counts = {g["bucket"]: g["count"] for g in group_census(rows, ["bucket"], ["count"])}
+	assert counts == {"active_funded": 1, "migrated": 1, "none": 1}
+
+
+def test_group_census_rejects_unknown_fields():
+	from admin_panel.api.census_core import group_census
+
+	with pytest.raises(ValueError, match="balance"):
+		group_census([], ["balance"])
+	with pytest.raises(ValueError, match="median"):
+		group_census([], ["level"], ["median"])
+	with pytest.raises(ValueError, match="duplicate"):
+		group_census([], ["level", "level"])
+
+
+def test_group_cube_rolls_up_to_the_same_groups_as_the_rows():
+	from admin_panel.api.census_core import (
+		build_group_cube,
+		decode_payload,
+		encode_payload,
+		group_census,
+		group_cube,
+	)
+
+	rows = [
+		_group_row(i % 3, ("Usd", "Usdt")[i % 2], float(i % 7), ("active_funded", "migrated")[: i % 3])
+		for i in range(2_000)
+	]
+	cube = decode_payload(encode_payload(build_group_cube(rows)), [])  # as stored
+	assert len(cube) < 20
+	funded = {
+		g["bucket"]: (g["count"], g["sum_balance"])
+		for g in group_cube(cube, ["bucket"], ["count", "sum_balance"], funded_only=True)
+	}
+	for bucket in ("none", "active_funded", "migrated"):
+		members = [r for r in rows if bucket in (r["buckets"] or ["none"]) and r["balance"] > 0]
+		assert funded[bucket] == (len(members), sum(r["balance"] for r in members))
+	for dimensions in (["level"], ["bucket", "currency"], ["created_month", "bucket", "level"]):
+		for funded_only in (False, True):
+			assert group_cube(cube, dimensions, funded_only=funded_only) == group_census(
+				rows, dimensions, funded_only=funded_only
+			)
+	with pytest.raises(ValueError, match="median"):
+		group_cube(cube, ["level"], ["median"])
+
+
+def test_group_census_over_100k_rows_is_sub_second():
+	from admin_panel.api.census_core import group_census
+
+	rows = [
+		_group_row(
+			i % 3,
+			("Usd", "Usdt")[i % 2],
+			float(i % 50),
+			("active_funded",) if i % 50 else ("active_zero",),
+			f"2025-{i % 12 + 1:02d}-01T00:00:00",
+		)
+		for i in range(100_000)
+	]
+	started = time.perf_counter()
+	groups = group_census(rows, ["level", "currency", "bucket", "created_month"])
+	elapsed = time.perf_counter() - started
+	assert sum(g["count"] for g in groups) == 100_000
+	assert elapsed < 1.0, f"group-by took {elapsed * 1000:.0f} ms"
+
+
+def test_retention_plan_deletes_past_keep_without_an_archive():
+	from admin_panel.api.census_core import retention_plan
+
+	snapshots = [
+		("c5", "Running"),
+		("c4", "Complete"),
+		("c3", "Failed"),
+		("c2", "Complete"),
+		("c1", "Archived"),
+	]
+	assert retention_plan(snapshots, keep=2) == ([], ["c3", "c2", "c1"])
+
+
+def test_retention_plan_archives_complete_snapshots_up_to_archive_keep():
+	from admin_panel.api.census_core import retention_plan
+
+	snapshots = [
+		("c6", "Complete"),
+		("c5", "Complete"),
+		("c4", "Failed"),
+		("c3", "Complete"),
+		("c2", "Archived"),
+		("c1", "Archived"),
+	]
+	archive, delete = retention_plan(snapshots, keep=1, archive_keep=3)
+	assert archive == ["c5", "c3"]
+	assert delete == ["c4", "c1"]
+	# Already archived snapshots don't count against `keep`.
+	assert retention_plan([("c2", "Archived"), ("c1", "Complete")], keep=1, archive_keep=1) == ([], [])
+
+
+def test_run_metrics_accumulate_interleaved_phases():
+	from admin_panel.api.census_core import RunMetrics
+
+	ticks = iter([0.0, 1.0, 1.0, 1.5, 2.0, 4.0])
+	metrics = RunMetrics(clock=lambda: next(ticks))
+	with metrics.phase("ibex"):
+		pass
+	with metrics.phase("build"):
+		pass
+	with metrics.phase("ibex"):
+		pass
+	metrics.count("ibex_requests", 3)
+	metrics.count("ibex_requests")
+	assert metrics.as_dict() == {"phases": {"ibex": 3.0, "build": 0.5}, "counters": {"ibex_requests": 4}}
+
+
+def test_flag_slow_runs_compares_against_the_median_of_the_rest():
+	from admin_panel.api.census_core import flag_slow_runs
+
+	runs = [{"duration_seconds": d} for d in (400, 250, 260, None, 240)]
+	assert [r["slow"] for r in flag_slow_runs(runs)] == [True, False, False, False, False]
+	assert [r["slow"] for r in flag_slow_runs([{"duration_seconds": 900}, {"duration_seconds": 100}])] == [
+		False,
+		False,
+	]
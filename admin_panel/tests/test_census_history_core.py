@@ -0,0 +1,61 @@
+"""Unit tests for the columnar census history file format.
+
+A history file is written once per completed census and read back through
+memoryviews (an mmap in production), so these pin the round trip, the
+funded-only rule, per-account lookups and mmap-backed reads.
+"""
+
+import mmap
+
+from admin_panel.api.census_core import build_census
+from admin_panel.api.census_history_core import HistoryFile, encode_history, read_header
+
+ROWS = [
+	{"account_id": "acc-b", "wallet_id": "w-b-usd", "currency": "Usd", "balance": 10.5},
+	{"account_id": "acc-a", "wallet_id": "w-a-usdt", "currency": "Usdt", "balance": 3.0},
+	{"account_id": "acc-a", "wallet_id": "w-a-usd", "currency": "Usd", "balance": 7.25},
+	{"account_id": "acc-c", "wallet_id": "w-c-usd", "currency": "Usd", "balance": 0.0},
+	{"account_id": "acc-d", "wallet_id": "w-d", "currency": None, "balance": 1.0},
+]
+META = {"snapshot": "WCS-0001", "completed_at": "2026-10-19 03:00:00", "totals": {"funded": 4}}
+
+
+def test_header_carries_meta_and_only_funded_rows_are_stored():
+	data = encode_history(ROWS, META)
+	header, _ = read_header(data)
+	assert header["snapshot"] == "WCS-0001"
+	assert header["totals"] == {"funded": 4}
+	assert header["count"] == 4  # acc-c's zero wallet is left out
+
+
+def test_lookup_returns_every_funded_wallet_of_an_account():
+	with HistoryFile(encode_history(ROWS, META)) as history:
+		assert history.lookup("acc-a") == [
+			{"wallet_id": "w-a-usd", "currency": "Usd", "balance": 7.25},
+			{"wallet_id": "w-a-usdt", "currency": "Usdt", "balance": 3.0},
+		]
+		assert history.lookup("acc-d") == [{"wallet_id": "w-d", "currency": None, "balance": 1.0}]
+		assert history.lookup("acc-c") == []
+		assert history.lookup("nobody") == []
+
+
+def test_empty_census_round_trips():
+	with HistoryFile(encode_history([], META)) as history:
+		assert len(history) == 0
+		assert history.lookup("acc-a") == []
+
+
+def test_reads_through_an_mmap_and_releases_it(tmp_path):
+	ibex = [
+		{"id": f"w{i:05d}", "name": f"acc{i % 500:04d}", "currencyId": 3, "balance": i % 7}
+		for i in range(2000)
+	]
+	rows = build_census(ibex, {}, {}, {})["rows"]
+	path = tmp_path / "history.cnh"
+	path.write_bytes(encode_history(rows, META))
+	with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+		with HistoryFile(mapped) as history:
+			wallets = history.lookup("acc0042")
+	expected = sorted(r["wallet_id"] for r in rows if r["account_id"] == "acc0042" and r["balance"] > 0)
+	assert [w["wallet_id"] for w in wallets] == expected
+	assert mapped.closed
@@ -0,0 +1,107 @@
+"""Behavioral tests for the census checkpoint spool.
+
+A resumed census trusts whatever the spool says was committed, so these pin
+the crash-safety contract: page files appear atomically, mongo inputs
+round-trip, shard markers add up, and the heartbeat tracks the last write.
+
+census_spool imports frappe at module level (only for the site path); stub
+it BEFORE importing, mirroring test_fee_discount_contract.py.
+"""
+
+import os
+import sys
+import time
+import types
+
+
+def _ensure_module(name):
+	try:
+		__import__(name)
+	except ImportError:
+		sys.modules.setdefault(name, types.ModuleType(name))
+	return sys.modules[name]
+
+
+_ensure_module("frappe")
+
+from admin_panel.api.census_core import merge_spooled_pages, resume_point
+from admin_panel.api.census_spool import CensusSpool
+
+
+def test_pages_round_trip_and_count(tmp_path):
+	spool = CensusSpool(tmp_path / "snap-1")
+	assert not spool.exists()
+	assert spool.committed_pages() == []
+	spool.heartbeat()
+	spool.write_page(1, [{"id": "w1"}, {"id": "w2"}])
+	spool.write_page(2, [{"id": "w3"}])
+	assert spool.committed_pages() == [1, 2]
+	assert list(spool.read_pages([1, 2])) == [[{"id": "w1"}, {"id": "w2"}], [{"id": "w3"}]]
+
+
+def test_resume_ignores_a_half_written_page(tmp_path):
+	"""A crash mid-write leaves only the temp file, which is not a page."""
+	spool = CensusSpool(tmp_path / "snap-1")
+	spool.heartbeat()
+	spool.write_page(1, [{"id": "w1"}])
+	(tmp_path / "snap-1" / "page-00002.json.gz.tmp").write_bytes(b"\x1f\x8b partial")
+	assert resume_point(spool.committed_pages()) == 1
+	assert merge_spooled_pages(spool.read_pages([1])) == [{"id": "w1"}]
+
+
+def test_inputs_round_trip(tmp_path):
+	spool = CensusSpool(tmp_path / "snap-1")
+	assert spool.load_inputs() is None
+	spool.heartbeat()
+	spool.save_inputs({"migrations": {"a1": {"status": "completed"}}, "btc_wallet_count": 7})
+	assert spool.load_inputs() == {"migrations": {"a1": {"status": "completed"}}, "btc_wallet_count": 7}
+
+
+def test_heartbeat_and_resume_count(tmp_path):
+	spool = CensusSpool(tmp_path / "snap-1")
+	assert spool.seconds_since_heartbeat() is None
+	spool.heartbeat()
+	os.utime(tmp_path / "snap-1" / "heartbeat", (0, 0))
+	assert spool.seconds_since_heartbeat() > 300
+	assert spool.record_resume() == 1
+	assert spool.seconds_since_heartbeat() < 60
+	spool.write_page(1, [{"id": "w1"}])
+	assert spool.meta()["resumes"] == 1  # page writes keep the count
+
+
+def test_keep_alive_heartbeats_without_resurrecting_a_removed_spool(tmp_path):
+	spool = CensusSpool(tmp_path / "snap-1")
+	spool.heartbeat()
+	os.utime(tmp_path / "snap-1" / "heartbeat", (0, 0))
+	with spool.keep_alive(interval=0.01):
+		time.sleep(0.1)
+		assert spool.seconds_since_heartbeat() < 60
+		spool.remove()
+		time.sleep(0.05)
+	spool.touch()
+	assert not spool.exists()
+
+
+def test_shard_markers_and_meta(tmp_path):
+	spool = CensusSpool(tmp_path / "snap-1")
+	assert spool.meta()["shard_count"] == 1
+	spool.update_meta(shard_count=3)
+	assert spool.seconds_since_heartbeat() is None  # queued, not yet started
+	spool.mark_shard_done(2)
+	spool.mark_shard_done(0)
+	assert spool.shards_done() == {0, 2}
+	assert spool.meta() == {"resumes": 0, "shard_count": 3}
+
+
+def test_remove(tmp_path):
+	spool = CensusSpool(tmp_path / "snap-1")
+	spool.heartbeat()
+	spool.write_page(1, [])
+	spool.remove()
+	assert not spool.exists()
+	spool.remove()  # idempotent
+	try:
+		spool.write_page(2, [])  # a late shard must not resurrect the spool
+	except FileNotFoundError:
+		pass
+	assert not spool.exists()
@@ -0,0 +1,184 @@
+"""Behavioral tests for the stale-while-revalidate endpoint cache.
+
+``swr_cached`` sits in front of the Bridge KYC, Referral Rewards and System
+Accounts overviews. These tests drive it against an in-memory stand-in for
+frappe's RedisWrapper (get_value / set_value / set nx / delete) and a
+recording ``frappe.enqueue``, with time pinned, so a dropped single-flight
+lock, a duplicate background refresh or a cached failure shows up here.
+
+endpoint_cache imports frappe and frappe.utils.cint at module level; install
+stubs BEFORE importing it, mirroring test_fee_discount_contract.py.
+"""
+
+import sys
+import types
+
+import pytest
+
+
+def _ensure_module(name):
+	try:
+		__import__(name)
+	except ImportError:
+		sys.modules.setdefault(name, types.ModuleType(name))
+	return sys.modules[name]
+
+
+def _cint(value):
+	try:
+		return int(float(value))
+	except (TypeError, ValueError):
+		return 0
+
+
+_frappe = _ensure_module("frappe")
+_frappe_utils = _ensure_module("frappe.utils")
+if not hasattr(_frappe, "utils"):
+	_frappe.utils = _frappe_utils
+if not hasattr(_frappe_utils, "cint"):
+	_frappe_utils.cint = _cint
+
+from admin_panel.api import endpoint_cache
+
+
+class _FakeCache:
+	"""Just the RedisWrapper surface endpoint_cache touches. No TTL expiry."""
+
+	def __init__(self):
+		self.values = {}
+		self.raw = {}
+
+	def make_key(self, key):
+		return f"site|{key}"
+
+	def get_value(self, key):
+		return self.values.get(key)
+
+	def set_value(self, key, value, expires_in_sec=None):
+		self.values[key] = value
+
+	def set(self, key, value, nx=False, ex=None):
+		if nx and key in self.raw:
+			return None
+		self.raw[key] = value
+		return True
+
+	def delete(self, key):
+		self.raw.pop(key, None)
+
+
+@pytest.fixture()
+def runtime(monkeypatch):
+	state = types.SimpleNamespace(cache=_FakeCache(), jobs=[], now=1_000_000.0, form_dict={})
+	monkeypatch.setattr(_frappe, "cache", lambda: state.cache, raising=False)
+	monkeypatch.setattr(
+		_frappe, "enqueue", lambda method, **kw: state.jobs.append((method, kw)), raising=False
+	)
+	monkeypatch.setattr(_frappe, "form_dict", state.form_dict, raising=False)
+	# A private clock for the module under test — patching the real time
+	# module would skew pytest's own timing.
+	clock = types.SimpleNamespace(
+		time=lambda: state.now, sleep=lambda s: setattr(state, "now", state.now + s)
+	)
+	monkeypatch.setattr(endpoint_cache, "time", clock)
+	monkeypatch.setattr(endpoint_cache, "_REGISTRY", {})
+	return state
+
+
+def _counted(result=None, **cache_kwargs):
+	calls = []
+
+	@endpoint_cache.swr_cached(**cache_kwargs)
+	def endpoint():
+		calls.append(1)
+		return dict(result or {"success": True, "n": len(calls)})
+
+	return endpoint, calls
+
+
+def test_entry_state_bands():
+	entry = {"computed_at": 100.0}
+	assert endpoint_cache.entry_state(None, 100.0, 30, 600) == "miss"
+	assert endpoint_cache.entry_state(entry, 129.9, 30, 600) == "fresh"
+	assert endpoint_cache.entry_state(entry, 130.0, 30, 600) == "stale"
+	assert endpoint_cache.entry_state(entry, 700.0, 30, 600) == "expired"
+
+
+def test_fresh_entry_is_served_without_recompute(runtime):
+	endpoint, calls = _counted(fresh_seconds=30)
+	first = endpoint()
+	runtime.now += 10
+	second = endpoint()
+	assert len(calls) == 1
+	assert second["n"] == 1
+	assert second["cache"]["age_seconds"] == 10.0
+	assert second["cache"]["stale"] is False
+	assert not runtime.jobs
+	assert first["cache"]["refreshing"] is False
+
+
+def test_stale_entry_served_with_exactly_one_background_refresh(runtime):
+	endpoint, calls = _counted(fresh_seconds=30, max_stale_seconds=600)
+	endpoint()
+	runtime.now += 60
+	a = endpoint()
+	b = endpoint()
+	assert len(calls) == 1
+	assert a["cache"]["stale"] is True and a["cache"]["refreshing"] is True
+	assert b["n"] == 1
+	assert len(runtime.jobs) == 1
+	method, kwargs = runtime.jobs[0]
+	assert method == "admin_panel.api.endpoint_cache.refresh_entry"
+
+	# Running the job recomputes, stores, and frees the lock for the next cycle.
+	endpoint_cache.refresh_entry(**{k: v for k, v in kwargs.items() if k != "queue"})
+	assert len(calls) == 2
+	c = endpoint()
+	assert c["n"] == 2 and c["cache"]["stale"] is False
+	assert not runtime.cache.raw
+
+
+def test_forced_refresh_recomputes(runtime):
+	endpoint, calls = _counted(fresh_seconds=30)
+	endpoint()
+	runtime.form_dict["refresh"] = "1"
+	assert endpoint()["n"] == 2
+	assert len(calls) == 2
+
+
+def test_miss_waits_for_the_lock_holder_instead_of_recomputing(runtime):
+	endpoint, calls = _counted(fresh_seconds=30)
+	key = endpoint_cache._cache_key(f"{endpoint.__module__}.endpoint", (), {})
+	runtime.cache.set(runtime.cache.make_key(f"{key}:lock"), 1, nx=True)
+
+	# Another worker holds the lock and publishes its result a moment later.
+	real_sleep = endpoint_cache.time.sleep
+
+	def sleep_then_publish(seconds):
+		real_sleep(seconds)
+		runtime.cache.set_value(key, {"computed_at": runtime.now, "payload": {"success": True, "n": 99}})
+
+	endpoint_cache.time.sleep = sleep_then_publish
+	try:
+		out = endpoint()
+	finally:
+		endpoint_cache.time.sleep = real_sleep
+	assert out["n"] == 99
+	assert not calls
+
+
+def test_failures_are_not_cached(runtime):
+	endpoint, calls = _counted(result={"success": False, "error": "upstream down"}, fresh_seconds=30)
+	assert endpoint() == {"success": False, "error": "upstream down"}
+	endpoint()
+	assert len(calls) == 2
+	assert not runtime.cache.values
+	assert not runtime.cache.raw
+
+
+def test_syncing_placeholders_are_not_cached(runtime):
+	endpoint, calls = _counted(result={"success": True, "syncing": True, "rows": []}, fresh_seconds=30)
+	assert endpoint()["syncing"] is True
+	endpoint()
+	assert len(calls) == 2
+	assert not runtime.cache.values
@@ -0,0 +1,190 @@
+"""Behavioral tests for the streaming export endpoints.
+
+export_census must stream a completed snapshot's rows out of the stored
+payload (optionally one bucket) and refuse anything else; the queue exports
+must page through their table with keyset pagination on a connection of
+their own, opened only once the body is iterated. These drive the real
+endpoints against a stubbed frappe and read the response bodies back.
+
+export pulls in frappe / werkzeug / requests / jwt (directly and via census,
+auth, common and the API clients); install stubs BEFORE importing it,
+mirroring test_admin_api_send_user_alert.py.
+"""
+
+import csv
+import datetime
+import io
+import sys
+import types
+from contextlib import contextmanager
+
+import pytest
+
+
+def _ensure_module(name):
+	try:
+		__import__(name)
+	except ImportError:
+		sys.modules.setdefault(name, types.ModuleType(name))
+	return sys.modules[name]
+
+
+def _cint(value):
+	try:
+		return int(float(value))
+	except (TypeError, ValueError):
+		return 0
+
+
+class _StubResponse:
+	"""werkzeug.wrappers.Response, as far as export uses it."""
+
+	def __init__(self, response=None, mimetype=None, direct_passthrough=False):
+		self.response = response
+		self.mimetype = mimetype
+		self.headers = {}
+
+
+frappe = _ensure_module("frappe")
+_frappe_utils = _ensure_module("frappe.utils")
+if not hasattr(frappe, "utils"):
+	frappe.utils = _frappe_utils
+if not hasattr(_frappe_utils, "cint"):
+	_frappe_utils.cint = _cint
+if not hasattr(frappe, "whitelist"):
+	frappe.whitelist = lambda *args, **kwargs: (lambda func: func)
+for _exc in ("ValidationError", "PermissionError"):
+	if not hasattr(frappe, _exc):
+		setattr(frappe, _exc, type(_exc, (Exception,), {}))
+_requests = _ensure_module("requests")
+if not hasattr(_requests, "exceptions"):
+	_requests.exceptions = types.SimpleNamespace(RequestException=type("RequestException", (Exception,), {}))
+_ensure_module("jwt")
+_werkzeug_wrappers = _ensure_module("werkzeug.wrappers")
+if not hasattr(_werkzeug_wrappers, "Response"):
+	_werkzeug_wrappers.Response = _StubResponse
+
+from admin_panel.api import export
+from admin_panel.api.census_core import encode_payload
+
+ROWS = [
+	{"username": "alice", "balance": 100.5, "is_system": False, "buckets": ["active_funded", "migrated"]},
+	{"username": "=cmd", "balance": 0.0, "is_system": False, "buckets": ["active_zero"]},
+	{"username": "dealer", "balance": 7.0, "is_system": True, "buckets": ["system"]},
+]
+
+
+class _Site:
+	def __init__(self):
+		self.snapshots = {}
+		self.tables = {}
+		self.connections = []
+		self.queries = 0
+
+	def get_value(self, doctype, name, fields, as_dict=False):
+		snapshot = self.snapshots.get(name)
+		return types.SimpleNamespace(**{f: snapshot[f] for f in fields}) if snapshot else None
+
+	def sql(self, query, values=None, as_dict=False):
+		"""The keyset query _keyset_pages issues, over an in-memory table."""
+		assert self.connections and self.connections[-1] == "open", "queried outside the export connection"
+		self.queries += 1
+		doctype = query.split("FROM `tab", 1)[1].split("`", 1)[0]
+		rows = sorted(self.tables[doctype], key=lambda r: (r["creation"], r["name"]))
+		for field, value in values.items():
+			if f"`{field}` = %({field})s" in query:
+				rows = [r for r in rows if r[field] == value]
+		if "after_creation" in values and "%(after_creation)s" in query:
+			after = (values["after_creation"], values["after_name"])
+			rows = [r for r in rows if (r["creation"], r["name"]) > after]
+		return [dict(r) for r in rows[: values["limit"]]]
+
+
+@pytest.fixture()
+def site(monkeypatch):
+	site = _Site()
+	monkeypatch.setattr(frappe, "session", types.SimpleNamespace(user="Administrator"), raising=False)
+	monkeypatch.setattr(frappe, "response", {}, raising=False)
+	monkeypatch.setattr(frappe, "local", types.SimpleNamespace(site="s1", sites_path="."), raising=False)
+	monkeypatch.setattr(
+		frappe, "db", types.SimpleNamespace(get_value=site.get_value, sql=site.sql), raising=False
+	)
+	monkeypatch.setattr(frappe.utils, "now_datetime", lambda: datetime.datetime(2026, 10, 19), raising=False)
+	monkeypatch.setattr(export, "_latest_snapshot_name", lambda status=None: "WCS-LATEST")
+
+	@contextmanager
+	def connection(site_name, sites_path):
+		assert (site_name, sites_path) == ("s1", ".")
+		site.connections.append("open")
+		try:
+			yield
+		finally:
+			site.connections[-1] = "closed"
+
+	monkeypatch.setattr(export, "_export_connection", connection)
+	return site
+
+
+def _csv(response):
+	return list(csv.DictReader(io.StringIO(b"".join(response.response).decode())))
+
+
+def test_census_csv_streams_the_stored_rows(site):
+	site.snapshots["WCS-LATEST"] = {"status": "Complete", "rows_json": encode_payload(ROWS)}
+	response = export.export_census()
+
+	assert response.mimetype.startswith("text/csv")
+	assert (
+		'filename="wallet-census-WCS-LATEST-20261019-000000.csv"' in response.headers["Content-Disposition"]
+	)
+	rows = _csv(response)
+	assert [r["username"] for r in rows] == ["alice", "'=cmd", "dealer"]
+	assert rows[0]["buckets"] == "active_funded migrated"
+	assert rows[0]["balance"] == "100.5"
+
+
+def test_census_bucket_filter_keeps_only_that_bucket(site):
+	site.snapshots["WCS-7"] = {"status": "Complete", "rows_json": encode_payload(ROWS)}
+	response = export.export_census(snapshot="WCS-7", bucket="migrated")
+
+	assert [r["username"] for r in _csv(response)] == ["alice"]
+	assert "wallet-census-WCS-7-migrated-" in response.headers["Content-Disposition"]
+
+
+def test_census_parquet_keeps_declared_types(site):
+	pq = pytest.importorskip("pyarrow.parquet")
+	site.snapshots["WCS-LATEST"] = {"status": "Complete", "rows_json": encode_payload(ROWS)}
+	response = export.export_census(fmt="parquet")
+
+	table = pq.read_table(io.BytesIO(b"".join(response.response)))
+	assert table.column("username").to_pylist() == ["alice", "=cmd", "dealer"]
+	assert table.column("is_system").to_pylist() == [False, False, True]
+	assert str(table.schema.field("balance").type) == "double"
+
+
+def test_census_rejects_snapshots_that_are_not_complete(site):
+	site.snapshots["WCS-RUN"] = {"status": "Running", "rows_json": None}
+	assert export.export_census(snapshot="WCS-RUN") == {
+		"success": False,
+		"error": "Snapshot WCS-RUN is not a completed census",
+	}
+	assert export.export_census(snapshot="WCS-GONE")["success"] is False
+
+
+def test_unknown_format_is_refused(site):
+	assert export.export_census(fmt="xlsx") == {"success": False, "error": "Unsupported export format: xlsx"}
+
+
+def test_cashouts_page_by_keyset_on_their_own_connection(site, monkeypatch):
+	monkeypatch.setattr(export, "EXPORT_PAGE_ROWS", 2)
+	site.tables["Cashout"] = [
+		{"name": f"CO-{i}", "creation": f"2026-10-0{i // 2 + 1} 00:00:00", "status": status}
+		for i, status in enumerate(["Paid", "Pending", "Paid", "Paid", "Failed", "Paid", "Paid"])
+	]
+	response = export.export_cashouts(status="Paid")
+	assert site.connections == []  # nothing is read until the body streams
+
+	rows = _csv(response)
+	assert [r["name"] for r in rows] == ["CO-0", "CO-2", "CO-3", "CO-5", "CO-6"]
+	assert site.queries == 3
+	assert site.connections == ["closed"]
@@ -0,0 +1,93 @@
+"""Behavioral tests for the parallel upstream-read helper (api/fanout.py).
+
+fanout is pure stdlib, so these run real threads with short sleeps standing
+in for mongo / IBEX / Bridge round-trips.
+"""
+
+import contextvars
+import threading
+import time
+
+import pytest
+
+from admin_panel.api.fanout import BranchTimeout, Fanout
+
+
+def _sleepy(value, seconds):
+	time.sleep(seconds)
+	return value
+
+
+def _boom():
+	raise ValueError("upstream down")
+
+
+def test_branches_overlap_instead_of_adding_up():
+	started = time.monotonic()
+	with Fanout() as reads:
+		reads.submit("a", _sleepy, "A", 0.2)
+		reads.submit("b", _sleepy, "B", 0.2)
+		reads.submit("c", _sleepy, "C", 0.2)
+		assert [reads.result(n) for n in "abc"] == ["A", "B", "C"]
+	assert time.monotonic() - started < 0.5
+
+
+def test_failed_branch_is_reported_without_sinking_the_others():
+	with Fanout() as reads:
+		reads.submit("ok", _sleepy, 1, 0)
+		reads.submit("bad", _boom)
+		assert reads.result("ok") == 1
+		assert reads.get("bad", "fallback") == "fallback"
+		assert isinstance(reads.error("bad"), ValueError)
+		with pytest.raises(ValueError, match="upstream down"):
+			reads.result("bad")
+		assert reads.failures() == {"bad": "upstream down"}
+
+
+def test_each_branch_has_its_own_deadline():
+	release = threading.Event()
+	with Fanout(timeout=5) as reads:
+		reads.submit("slow", release.wait, 2, timeout=0.1)
+		reads.submit("fast", _sleepy, "done", 0)
+		started = time.monotonic()
+		with pytest.raises(BranchTimeout, match="slow timed out after 0.1s"):
+			reads.result("slow")
+		assert time.monotonic() - started < 1
+		assert reads.result("fast") == "done"
+		assert list(reads.failures()) == ["slow"]
+	release.set()
+
+
+def test_branches_see_the_submitting_context():
+	site = contextvars.ContextVar("site")
+	site.set("flash.local")
+	with Fanout() as reads:
+		reads.submit("site", site.get)
+		assert reads.result("site") == "flash.local"
+
+
+def test_duplicate_branch_names_are_rejected():
+	with Fanout() as reads:
+		reads.submit("x", _sleepy, 1, 0)
+		with pytest.raises(ValueError, match="duplicate"):
+			reads.submit("x", _sleepy, 2, 0)
+
+
+def test_done_polls_without_waiting():
+	with Fanout() as reads:
+		reads.submit("fast", _sleepy, 1, 0)
+		reads.submit("slow", _sleepy, 2, 0.2)
+		reads.result("fast")
+		assert reads.done("fast")
+		assert not reads.done()
+		assert reads.result("slow") == 2
+		assert reads.done()
+
+
+def test_pop_returns_the_value_and_forgets_the_branch():
+	with Fanout() as reads:
+		reads.submit("page-1", _sleepy, [1], 0)
+		assert reads.pop("page-1") == [1]
+		reads.submit("page-1", _sleepy, [2], 0)  # the name is free again
+		assert reads.pop("page-1") == [2]
+		assert reads.done()
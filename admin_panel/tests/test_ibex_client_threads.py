@@ -0,0 +1,139 @@
+"""Behavioral tests for sharing one IbexClient across threads.
+
+get_customer_detail hands a single client to its Fanout branches, so the
+token cache, the 401 refresh and the stats counters must hold up under
+concurrent use: one token request for the lot, one refresh per rejected
+token, exact counts, and a requests Session per thread. These drive the real
+client against a recording stand-in for requests.Session.
+
+ibex_client imports frappe (for its config) at module level; stub it BEFORE
+importing, mirroring test_census_spool.py.
+"""
+
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+
+def _ensure_module(name):
+	try:
+		__import__(name)
+	except ImportError:
+		sys.modules.setdefault(name, types.ModuleType(name))
+	return sys.modules[name]
+
+
+frappe = _ensure_module("frappe")
+_ensure_module("requests")
+
+from admin_panel.api import ibex_client
+
+THREADS = 16
+
+
+class _Response:
+	def __init__(self, status_code, body=None):
+		self.status_code = status_code
+		self.ok = 200 <= status_code < 300
+		self.text = ""
+		self._body = body or {}
+
+	def json(self):
+		return self._body
+
+
+class _Upstream:
+	"""Token endpoint + hub, shared by every thread's session."""
+
+	def __init__(self, reject_first_token=False):
+		self.lock = threading.Lock()
+		self.tokens_issued = 0
+		self.rejected = 0
+		self.sessions = set()
+		self.reject_first_token = reject_first_token
+
+	def session(self):
+		upstream = self
+
+		class Session:
+			def __init__(self):
+				with upstream.lock:
+					upstream.sessions.add(threading.get_ident())
+
+			def post(self, url, **kwargs):
+				time.sleep(0.01)  # widen the race window
+				with upstream.lock:
+					upstream.tokens_issued += 1
+					token = f"token-{upstream.tokens_issued}"
+				return _Response(200, {"access_token": token, "expires_in": 3600})
+
+			def get(self, url, headers=None, **kwargs):
+				if upstream.reject_first_token and headers["Authorization"] == "token-1":
+					with upstream.lock:
+						upstream.rejected += 1
+					return _Response(401)
+				return _Response(200, {"balance": 1})
+
+		return Session
+
+
+@pytest.fixture()
+def client(monkeypatch):
+	def make(upstream):
+		monkeypatch.setattr(ibex_client, "_sessions", threading.local())
+		monkeypatch.setattr(ibex_client.requests, "Session", upstream.session(), raising=False)
+		conf = {
+			"ibex_client_id": "id",
+			"ibex_client_secret": "secret",
+		}
+		monkeypatch.setattr(frappe, "conf", conf, raising=False)
+		return ibex_client.IbexClient()
+
+	return make
+
+
+def _in_threads(fn):
+	barrier = threading.Barrier(THREADS)
+	errors = []
+
+	def run():
+		barrier.wait()
+		try:
+			fn()
+		except Exception as exc:
+			errors.append(exc)
+
+	threads = [threading.Thread(target=run) for _ in range(THREADS)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert not errors, errors
+
+
+def test_concurrent_branches_share_one_token_and_count_exactly(client):
+	upstream = _Upstream()
+	ibex = client(upstream)
+
+	_in_threads(lambda: ibex.get_account_details("wallet"))
+
+	assert upstream.tokens_issued == 1
+	assert ibex.stats == {"requests": THREADS, "retries": 0, "rate_limited": 0}
+	assert len(upstream.sessions) == THREADS  # a Session per thread
+
+
+def test_a_rejected_token_is_refreshed_once(client):
+	upstream = _Upstream(reject_first_token=True)
+	ibex = client(upstream)
+	ibex.ensure_token()
+
+	_in_threads(lambda: ibex.get_account_details("wallet"))
+
+	# Every branch that went out with the stale token retried, but only the
+	# first of them fetched a replacement; the rest reused it.
+	assert upstream.rejected >= 1
+	assert upstream.tokens_issued == 2
+	assert ibex.stats == {"requests": THREADS, "retries": upstream.rejected, "rate_limited": 0}
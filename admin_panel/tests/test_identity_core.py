@@ -0,0 +1,135 @@
+"""Unit tests for identity_core: find_account's priority and the identity cache.
+
+find_account fetches every candidate doc in two batched round trips; the
+pick_account cases pin that the Python-side pick reproduces the old
+one-find_one-per-rule order: _id → username → uuid → phone → wallet id. The
+IdentityCache cases pin the multi-key / TTL / LRU behaviour the identity
+service relies on, and pending_invalidations the cross-worker log replay.
+"""
+
+from admin_panel.api.identity_core import (
+	IdentityCache,
+	account_handles,
+	flash_account_handles,
+	pending_invalidations,
+	pick_account,
+)
+
+OID = "65a1b2c3d4e5f6a7b8c9d0e1"
+
+
+def _acct(_id, **fields):
+	return {"_id": _id, **fields}
+
+
+def test_object_id_beats_every_other_rule():
+	by_id = _acct(OID)
+	by_name = _acct("other", username=OID)
+	assert pick_account(OID, [by_name, by_id], object_id=OID) is by_id
+
+
+def test_username_beats_uuid_and_phone():
+	by_name = _acct("a", username="5551234")
+	by_uuid = _acct("b", id="5551234")
+	by_phone = _acct("c", kratosUserId="k1")
+	owners = ["k1"]
+	assert pick_account("5551234", [by_phone, by_uuid, by_name], phone_owners=owners) is by_name
+	assert pick_account("5551234", [by_phone, by_uuid], phone_owners=owners) is by_uuid
+	assert pick_account("5551234", [by_phone], phone_owners=owners) is by_phone
+
+
+def test_phone_owners_are_tried_in_index_order():
+	first = _acct("first", kratosUserId="k-1")
+	second = _acct("second", kratosUserId="k-2")
+	assert pick_account("8765551234", [second, first], phone_owners=["k-1", "k-2"]) is first
+
+
+def test_phone_owner_without_account_falls_through_to_wallet():
+	owner = _acct("w-owner")
+	assert pick_account("q", [owner], phone_owners=["orphan"], wallet={"account_id": "w-owner"}) is owner
+
+
+def test_no_match_is_none():
+	assert pick_account("nobody", [_acct("x", username="somebody")]) is None
+
+
+class _Clock:
+	def __init__(self):
+		self.now = 0.0
+
+	def __call__(self):
+		return self.now
+
+
+def test_every_handle_maps_to_the_same_entry():
+	cache = IdentityCache(ttl_seconds=60, max_entries=10, clock=_Clock())
+	account = _acct(OID, username="jane", id="uuid-1")
+	cache.put("mongo", account_handles(account), account)
+	assert cache.get("mongo", "jane") is account
+	assert cache.get("mongo", OID) is account
+	assert cache.get("mongo", "uuid-1") is account
+	assert cache.get("flash", "jane") is None  # namespaces don't mix shapes
+	assert len(cache) == 1
+
+
+def test_flash_handles_include_owner_phone_and_email():
+	account = {
+		"id": "a1",
+		"uuid": "u1",
+		"username": "jane",
+		"owner": {"phone": "+18765551234", "email": {"address": "j@x.io"}},
+	}
+	assert flash_account_handles(account) == ["a1", "u1", "jane", "+18765551234", "j@x.io"]
+
+
+def test_entries_expire_after_ttl():
+	clock = _Clock()
+	cache = IdentityCache(ttl_seconds=60, max_entries=10, clock=clock)
+	cache.put("mongo", ["jane"], "A")
+	clock.now = 59
+	assert cache.get("mongo", "jane") == "A"
+	clock.now = 60
+	assert cache.get("mongo", "jane") is None
+	assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted_with_all_its_keys():
+	cache = IdentityCache(ttl_seconds=60, max_entries=2, clock=_Clock())
+	cache.put("mongo", ["a", "a-uuid"], "A")
+	cache.put("mongo", ["b"], "B")
+	cache.get("mongo", "a")  # touch A so B is the oldest
+	cache.put("mongo", ["c"], "C")
+	assert cache.get("mongo", "b") is None
+	assert cache.get("mongo", "a-uuid") == "A"
+	assert cache.get("mongo", "c") == "C"
+
+
+def test_repointed_handle_retires_the_old_entry():
+	cache = IdentityCache(ttl_seconds=60, max_entries=10, clock=_Clock())
+	cache.put("flash", ["old-uuid", "jane"], "old")
+	cache.put("flash", ["new-uuid", "jane"], "new")
+	assert cache.get("flash", "jane") == "new"
+	assert cache.get("flash", "old-uuid") is None
+
+
+def test_invalidate_drops_the_entry_in_every_namespace():
+	cache = IdentityCache(ttl_seconds=60, max_entries=10, clock=_Clock())
+	cache.put("mongo", ["uuid-1", "jane"], "doc")
+	cache.put("flash", ["uuid-1", "+1876"], "detail")
+	cache.put("flash", ["other"], "keep")
+	cache.invalidate("uuid-1")
+	assert cache.get("mongo", "jane") is None
+	assert cache.get("flash", "+1876") is None
+	assert cache.get("flash", "other") == "keep"
+
+
+def test_invalidation_log_replays_unseen_handles_once():
+	log = [(4, "jane"), (3, "uuid-1"), (5, "jane")]
+	assert pending_invalidations(2, 5, log) == ["uuid-1", "jane"]
+	assert pending_invalidations(5, 5, []) == []
+
+
+def test_invalidation_log_gap_or_reset_clears_everything():
+	assert pending_invalidations(None, 5, []) is None  # never synced
+	assert pending_invalidations(2, 5, [(4, "jane"), (5, "joe")]) is None  # seq 3 trimmed / in flight
+	assert pending_invalidations(7, 2, []) is None  # counter went back (redis flushed)
@@ -0,0 +1,76 @@
+"""Unit tests for phone normalization and phone-index sync planning.
+
+The index exists so that however a number was stored (mongo users keep
+"+1876…", ERPNext Customers hold whatever was typed) and however the
+operator types it, the lookup is one exact match on an indexed column.
+"""
+
+import pytest
+
+from admin_panel.api.phone_index_core import (
+	index_entry,
+	normalize_phone,
+	plan_index_sync,
+	plan_lookup,
+)
+
+
+@pytest.mark.parametrize(
+	"raw",
+	["+18765551234", "+1 (876) 555-1234", "18765551234", "876-555-1234", "(876) 555 1234", "0018765551234"],
+)
+def test_spellings_of_one_number_share_a_canonical_form(raw):
+	assert normalize_phone(raw) == ("+18765551234", "5551234")
+
+
+def test_foreign_numbers_keep_their_country_code():
+	assert normalize_phone("+44 20 7946 0958") == ("+442079460958", "9460958")
+
+
+def test_short_local_numbers_only_have_a_suffix():
+	assert normalize_phone("555-1234") == (None, "5551234")
+	assert normalize_phone("12") == (None, None)
+	assert normalize_phone("") == (None, None)
+
+
+def test_lookup_plan_prefers_e164_and_ignores_non_phones():
+	assert plan_lookup("876 555 1234") == ("e164", "+18765551234")
+	assert plan_lookup("555-1234") == ("suffix", "5551234")
+	assert plan_lookup("jane_doe") is None
+	assert plan_lookup("65a1b2c3d4e5f6a7b8c9d0e1") is None  # ObjectId with digits
+	assert plan_lookup("123") is None
+
+
+def test_index_entry_keys_by_source_and_ref():
+	entry = index_entry("Customer", "CUST-0001", "876-555-1234")
+	assert entry == {
+		"entry_key": "Customer:CUST-0001",
+		"source": "Customer",
+		"source_ref": "CUST-0001",
+		"raw_phone": "876-555-1234",
+		"phone_e164": "+18765551234",
+		"phone_suffix": "5551234",
+	}
+	assert index_entry("Customer", "CUST-0002", "n/a") is None
+
+
+def test_incremental_plan_touches_only_changed_rows():
+	existing = {"Customer:A": "876-555-0001", "Customer:B": "876-555-0002", "Customer:C": "876-555-0003"}
+	entries = [
+		index_entry("Customer", "A", "876-555-0001"),  # unchanged
+		index_entry("Customer", "B", "876-555-9999"),  # edited
+		index_entry("Customer", "D", "876-555-0004"),  # new
+	]
+	inserts, updates, deletes = plan_index_sync(
+		existing, entries, full=False, dropped=["Customer:C", "Customer:Z"]
+	)
+	assert [e["entry_key"] for e in inserts] == ["Customer:D"]
+	assert [e["entry_key"] for e in updates] == ["Customer:B"]
+	assert deletes == ["Customer:C"]
+
+
+def test_full_plan_drops_everything_the_source_no_longer_has():
+	existing = {"Flash User:k1": "+18765550001", "Flash User:k2": "+18765550002"}
+	entries = [index_entry("Flash User", "k1", "+18765550001")]
+	inserts, updates, deletes = plan_index_sync(existing, entries, full=True)
+	assert (inserts, updates, deletes) == ([], [], ["Flash User:k2"])
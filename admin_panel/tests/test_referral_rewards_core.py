@@ -14,8 +14,13 @@ if str(REPO_ROOT) not in sys.path:
 
 from admin_panel.api.referral_rewards_core import (
 	REWARD_TIERS,
+	ROW_FILTERS,
 	build_overview,
+	build_rows_pipeline,
+	build_rows_query,
+	build_summary,
 	current_tier,
+	group_invites,
 	referrals_until_next_tier,
 )
 
@@ -515,3 +520,160 @@ def test_unredeemed_lifecycle_rows_consume_cap_budget():
 	by_id = {r["invite_id"]: r for r in full["rows"]}
 	assert by_id["revoked-1"]["reward_status"] == "revoked"
 	assert by_id["sent-new"]["reward_status"] == "sent"
+
+
+# ── build_summary over grouped counts ──────────────────────────────────────
+
+
+def test_summary_from_groups_matches_overview():
+	# The endpoint feeds build_summary from a mongo $group; the in-memory
+	# grouping must yield exactly the summary build_overview reports.
+	invites, accounts = _fixture()
+	overview = build_overview(invites, accounts, counter_seq=150, wallet_balance=100.0)
+	grouped = build_summary(group_invites(invites), counter_seq=150, wallet_balance=100.0)
+
+	expected = dict(overview["summary"])
+	expected.pop("rows_total")
+	expected.pop("rows_shown")
+	assert grouped["summary"] == expected
+	assert grouped["funnel"] == overview["funnel"]
+
+
+def test_group_counts_multiply_through_summary():
+	# One group standing for 1,000 paid invites must count and disburse as
+	# 1,000 invites — the summary never sees the individual rows.
+	groups = [
+		{
+			"status": "ACCEPTED",
+			"reward_status": "paid",
+			"reward_amount_cents": 500,
+			"inviter_paid": True,
+			"invitee_paid": True,
+			"count": 1000,
+		},
+		{
+			"status": "ACCEPTED",
+			"reward_status": None,
+			"reward_amount_cents": 0,
+			"inviter_paid": False,
+			"invitee_paid": False,
+			"count": 7,
+		},
+	]
+	s = build_summary(groups, counter_seq=0)["summary"]
+
+	assert s["total_invites"] == 1007
+	assert s["paid"] == 1000
+	assert s["unrewarded"] == 7
+	assert s["total_disbursed_dollars"] == 10000.0
+	assert s["disbursed_by_tier"] == [{"amount_dollars": 5.0, "count_parties": 2000, "dollars": 10000.0}]
+
+
+# ── build_rows_query ───────────────────────────────────────────────────────
+
+
+def test_rows_query_unfiltered_is_empty():
+	assert build_rows_query() == {}
+	assert build_rows_query(reward_status="all") == {}
+
+
+def test_rows_query_status_chips_map_to_invite_fields():
+	assert build_rows_query(reward_status="failed") == {"status": "ACCEPTED", "rewardStatus": "failed"}
+	assert build_rows_query(reward_status="sent") == {"status": "SENT"}
+	# "unsent" is the PENDING invite lifecycle, never the IBEX "pending" reward.
+	assert build_rows_query(reward_status="unsent") == {"status": "PENDING"}
+	assert build_rows_query(reward_status="pending") == {"status": "ACCEPTED", "rewardStatus": "pending"}
+	assert build_rows_query(reward_status="unrewarded")["rewardStatus"] == {"$in": [None, ""]}
+
+
+def test_rows_query_filters_match_row_statuses():
+	# Every chip filter must select exactly the rows that render with that
+	# reward_status (plus "actionable" = what used to bypass the row cap).
+	invites, accounts = _fixture()
+	rows = {r["invite_id"]: r for r in build_overview(invites, accounts, counter_seq=0)["rows"]}
+
+	def matches(query, inv):
+		for field, cond in query.items():
+			value = {"status": inv["status"], "rewardStatus": inv["reward_status"]}[field]
+			if isinstance(cond, dict):
+				if "$in" in cond and value not in cond["$in"]:
+					return False
+				if "$nin" in cond and value in cond["$nin"]:
+					return False
+			elif value != cond:
+				return False
+		return True
+
+	for key, query in ROW_FILTERS.items():
+		selected = {inv["invite_id"] for inv in invites if matches(query, inv)}
+		if key == "actionable":
+			expected = {"i2", "i3", "i8"}
+		else:
+			expected = {i for i, r in rows.items() if r["reward_status"] == key}
+		assert selected == expected, key
+
+
+def test_rows_query_combines_tier_dates_and_inviter():
+	query = build_rows_query(
+		reward_status="paid",
+		tier_cents=250,
+		created_from="2026-07-01",
+		created_before="2026-08-01",
+		inviter_ids=["acc-alice"],
+	)
+	assert query == {
+		"status": "ACCEPTED",
+		"rewardStatus": "paid",
+		"rewardAmountCents": 250,
+		"createdAt": {"$gte": "2026-07-01", "$lt": "2026-08-01"},
+		"inviterId": {"$in": ["acc-alice"]},
+	}
+	# An open-ended range only bounds one side.
+	assert build_rows_query(created_before="2026-08-01") == {"createdAt": {"$lt": "2026-08-01"}}
+
+
+def test_rows_query_rejects_unknown_status():
+	try:
+		build_rows_query(reward_status="bogus")
+	except ValueError:
+		return
+	raise AssertionError("unknown reward_status filter should raise")
+
+
+def test_rows_pipeline_orders_by_redeemed_then_created_at():
+	# Same order the table had when it sorted client-side: redeemedAt, else
+	# createdAt, newest first; rows with neither go last. The stages are run
+	# here by a minimal interpreter of just the operators the pipeline uses.
+	docs = [
+		{"_id": 1, "createdAt": "2026-07-01", "redeemedAt": "2026-07-20"},
+		{"_id": 2, "createdAt": "2026-07-10", "redeemedAt": None},
+		{"_id": 3, "createdAt": "2026-07-15"},
+		{"_id": 4, "createdAt": None},
+		{"_id": 5, "createdAt": "2026-07-10"},
+	]
+
+	def run(pipeline):
+		out = [dict(d) for d in docs]
+		for stage in pipeline:
+			((op, arg),) = stage.items()
+			if op == "$match":
+				assert arg == {}
+			elif op == "$addFields":
+				for doc in out:
+					for field, expr in arg.items():
+						first, fallback = (doc.get(path[1:]) for path in expr["$ifNull"])
+						doc[field] = first if first is not None else fallback
+			elif op == "$sort":
+				for field, direction in reversed(arg.items()):
+					present = [d for d in out if d.get(field) is not None]
+					missing = [d for d in out if d.get(field) is None]
+					present.sort(key=lambda d: d[field], reverse=direction < 0)
+					out = present + missing if direction < 0 else missing + present
+			elif op == "$skip":
+				out = out[arg:]
+			elif op == "$limit":
+				out = out[:arg]
+		return [d["_id"] for d in out]
+
+	assert run(build_rows_pipeline({}, 0, 10)) == [1, 3, 5, 2, 4]
+	assert run(build_rows_pipeline({}, 1, 2)) == [3, 5]
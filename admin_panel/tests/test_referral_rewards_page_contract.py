@@ -48,10 +48,34 @@ def test_endpoint_decorator_stack_and_gating():
 	)
 
 
+def test_rows_endpoint_decorator_stack_and_paging_bounds():
+	api_py = read_text(ADMIN_PANEL / "api" / "referral_rewards.py")
+
+	assert "def get_referral_rows" in api_py
+	above = "\n".join(lines_above_def(api_py, "get_referral_rows"))
+	assert re.search(
+		r"@frappe\.whitelist\(\)\s*\n\s*@require_admin\(\)\s*\n\s*@handle_api_errors",
+		above,
+	)
+	# The page size is clamped server-side — a caller can't ask for every row.
+	assert "MAX_PAGE_SIZE" in api_py
+
+
+def test_overview_endpoint_returns_aggregates_only():
+	api_py = read_text(ADMIN_PANEL / "api" / "referral_rewards.py")
+	body = api_py.split("def get_referral_rewards")[1].split("\ndef ")[0]
+
+	# Aggregates come from the mongo $group, never a full invite load.
+	assert 'reads.submit("invites", load_invite_groups)' in body
+	assert "load_invites(" not in body
+	assert "build_summary(" in body
+
+
 def test_js_wires_endpoint_and_gates_roles():
 	js = read_text(PAGE_DIR / "referral_rewards.js")
 
 	assert 'method: "admin_panel.api.referral_rewards.get_referral_rewards"' in js
+	assert 'method: "admin_panel.api.referral_rewards.get_referral_rows"' in js
 	# role gate is present and up front (before the class is constructed)
 	assert "RR_ALLOWED_ROLES" in js
 	assert "Flash Admin" in js
@@ -21,8 +21,14 @@ IBEX_STATUS_PY = (ADMIN_PANEL / "api" / "ibex_status.py").read_text()
 
 
 def test_read_endpoints_carry_the_financial_gate():
-	for fn in ("get_system_accounts", "get_system_account_activity"):
-		stack = f"@frappe.whitelist()\n@require_financial()\n@handle_api_errors\ndef {fn}("
+	stacks = {
+		# The overview sits behind the shared SWR cache, innermost so the gate
+		# still runs on every call (a cached hit must not skip require_financial).
+		"get_system_accounts": "@handle_api_errors\n@swr_cached(fresh_seconds=15, max_stale_seconds=300)\n",
+		"get_system_account_activity": "@handle_api_errors\n",
+	}
+	for fn, tail in stacks.items():
+		stack = f"@frappe.whitelist()\n@require_financial()\n{tail}def {fn}("
 		assert stack in API_PY, f"{fn} must be whitelisted + require_financial + handle_api_errors"
 
 
@@ -0,0 +1,102 @@
+"""Unit tests for the account typeahead prefix index.
+
+Covers what operators type (partial usernames, phone digits in any
+spelling, id prefixes), the incremental upsert path, and the latency budget:
+a lookup over ~100k accounts has to stay well under 10 ms.
+"""
+
+import time
+
+from admin_panel.api.typeahead_core import PrefixIndex, normalize_query, to_record
+
+JANE = to_record(
+	{
+		"account_id": "65a1b2c3d4e5f6a7b8c9d0e1",
+		"uuid": "0c9f7e0a-1111-4a4a-9b9b-abcdefabcdef",
+		"username": "JaneDoe",
+		"kratos_user_id": "k-jane",
+		"phone": "+18765551234",
+		"level": "TWO",
+		"status": "active",
+	}
+)
+JANET = to_record({"account_id": "65a1b2c3d4e5f6a7b8c9d0e2", "username": "janet", "phone": "+18765550000"})
+
+
+def _names(matches):
+	return [m["username"] for m in matches]
+
+
+def test_query_normalization():
+	assert normalize_query(" JaneD ") == "janed"
+	assert normalize_query("+1 (876) 555") == "1876555"
+	assert normalize_query("65A1") == "65a1"
+
+
+def test_username_prefix_is_case_insensitive_and_exact_match_first():
+	index = PrefixIndex([JANET, JANE, to_record({"account_id": "x", "username": "jane"})])
+	assert _names(index.search("JANE")) == ["jane", "JaneDoe", "janet"]
+	assert _names(index.search("janed")) == ["JaneDoe"]
+
+
+def test_phone_matches_with_or_without_country_and_area_code():
+	index = PrefixIndex([JANE, JANET])
+	for typed in ("+1 876 555 12", "876-555-12", "55512"):
+		assert _names(index.search(typed)) == ["JaneDoe"]
+	assert sorted(_names(index.search("876555"))) == ["JaneDoe", "janet"]
+
+
+def test_uuid_and_account_id_prefixes():
+	index = PrefixIndex([JANE, JANET])
+	assert _names(index.search("0C9F7E")) == ["JaneDoe"]
+	assert _names(index.search("65a1b2c3d4e5f6a7b8c9d0e2")) == ["janet"]
+
+
+def test_each_account_is_returned_once_and_limit_applies():
+	index = PrefixIndex([to_record({"account_id": str(i), "username": f"user{i}"}) for i in range(30)])
+	matches = index.search("user", limit=5)
+	assert len(matches) == 5
+	assert len({m["account_id"] for m in matches}) == 5
+	assert index.search("u") == []  # below MIN_QUERY_LENGTH
+
+
+def test_upsert_replaces_terms_of_a_renamed_account():
+	index = PrefixIndex([JANE])
+	renamed = to_record({"account_id": JANE[0], "username": "jdoe", "phone": "+18765551234"})
+	assert index.upsert([renamed, JANET]) == 2
+	assert index.upsert([renamed]) == 0  # unchanged
+	assert index.search("janed") == []
+	assert _names(index.search("jdo")) == ["jdoe"]
+	assert len(index) == 2
+
+
+def test_state_round_trip():
+	index = PrefixIndex([JANE, JANET])
+	copy = PrefixIndex.from_state(index.state())
+	assert _names(copy.search("jan")) == _names(index.search("jan"))
+	assert copy.get(JANET[0]) == JANET
+
+
+def test_lookup_over_100k_accounts_stays_under_10ms():
+	records = [
+		to_record(
+			{
+				"account_id": f"{i:024x}",
+				"uuid": f"{i * 7919:08x}-0000-4000-8000-{i:012x}",
+				"username": f"user{i * 31 % 100_000:05d}x",
+				"phone": f"+1876{i:07d}",
+			}
+		)
+		for i in range(100_000)
+	]
+	index = PrefixIndex(records)
+	queries = ["us", "user1", "user123", "876", "8760012", "+1 876 001", "0000", "ab", "zz", "user99999x"]
+	timings = []
+	for _ in range(20):
+		for query in queries:
+			started = time.perf_counter()
+			index.search(query, limit=10)
+			timings.append(time.perf_counter() - started)
+	timings.sort()
+	p99 = timings[int(len(timings) * 0.99)]
+	assert p99 < 0.010, f"p99 lookup took {p99 * 1000:.2f} ms"
@@ -0,0 +1,80 @@
+"""Behavioral tests for search_accounts_typeahead's `limit` argument.
+
+`limit` arrives from the browser as a string; like the other list endpoints
+it is parsed with cint, falls back to DEFAULT_LIMIT and is clamped to
+MAX_LIMIT, so a junk or oversized value never turns into an error.
+
+typeahead pulls in frappe / requests / jwt (via auth, common, mongo_reader
+and phone_index); install stubs BEFORE importing it, mirroring
+test_admin_api_update_user_phone.py.
+"""
+
+import sys
+import types
+
+import pytest
+
+
+def _ensure_module(name):
+	try:
+		__import__(name)
+	except ImportError:
+		sys.modules.setdefault(name, types.ModuleType(name))
+	return sys.modules[name]
+
+
+def _cint(value):
+	try:
+		return int(float(value))
+	except (TypeError, ValueError):
+		return 0
+
+
+frappe = _ensure_module("frappe")
+_frappe_utils = _ensure_module("frappe.utils")
+if not hasattr(frappe, "utils"):
+	frappe.utils = _frappe_utils
+if not hasattr(_frappe_utils, "cint"):
+	_frappe_utils.cint = _cint
+if not hasattr(frappe, "whitelist"):
+	frappe.whitelist = lambda *args, **kwargs: (lambda func: func)
+for _exc in ("ValidationError", "PermissionError"):
+	if not hasattr(frappe, _exc):
+		setattr(frappe, _exc, type(_exc, (Exception,), {}))
+_requests = _ensure_module("requests")
+if not hasattr(_requests, "exceptions"):
+	_requests.exceptions = types.SimpleNamespace(RequestException=type("RequestException", (Exception,), {}))
+_ensure_module("jwt")
+
+from admin_panel.api import typeahead
+from admin_panel.api.typeahead_core import DEFAULT_LIMIT, MAX_LIMIT
+
+
+@pytest.fixture()
+def limits(monkeypatch):
+	seen = []
+
+	class Index:
+		def search(self, query, limit):
+			seen.append(limit)
+			return []
+
+	monkeypatch.setattr(frappe, "session", types.SimpleNamespace(user="Administrator"), raising=False)
+	monkeypatch.setattr(typeahead, "_current_index", Index)
+	return seen
+
+
+@pytest.mark.parametrize(
+	"limit, expected",
+	[
+		("5", 5),
+		(None, DEFAULT_LIMIT),
+		("", DEFAULT_LIMIT),
+		("abc", DEFAULT_LIMIT),
+		("-3", 1),
+		("9999", MAX_LIMIT),
+	],
+)
+def test_limit_is_parsed_and_clamped(limits, limit, expected):
+	assert typeahead.search_accounts_typeahead(query="al", limit=limit)["success"] is True
+	assert limits == [expected]
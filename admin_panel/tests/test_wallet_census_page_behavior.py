@@ -0,0 +1,204 @@
+"""End-to-end revalidation of the Wallet Census page's latest snapshot.
+
+get_latest_census answers a matching If-None-Match with a bodiless 304, and
+the page (WalletCensus.load_latest) is what has to send that header and
+reuse its copy. These run the real page code under Node (see
+js/wallet_census_harness.js) and answer each of its fetches by calling the
+real endpoint against a stubbed frappe (in-memory redis, one snapshot row),
+so the whole round trip is exercised: 200 with an ETag, then a 304 the page
+renders from memory, then a fresh 200 once a newer snapshot completes.
+
+census pulls in frappe / requests / jwt (via auth, common and the API
+clients); install stubs BEFORE importing it, mirroring
+test_admin_api_send_user_alert.py. Node is not a build dependency of the
+app, so the module skips when it is absent.
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+
+def _ensure_module(name):
+	try:
+		__import__(name)
+	except ImportError:
+		sys.modules.setdefault(name, types.ModuleType(name))
+	return sys.modules[name]
+
+
+def _cint(value):
+	try:
+		return int(float(value))
+	except (TypeError, ValueError):
+		return 0
+
+
+frappe = _ensure_module("frappe")
+_frappe_utils = _ensure_module("frappe.utils")
+if not hasattr(frappe, "utils"):
+	frappe.utils = _frappe_utils
+if not hasattr(_frappe_utils, "cint"):
+	_frappe_utils.cint = _cint
+if not hasattr(frappe, "whitelist"):
+	frappe.whitelist = lambda *args, **kwargs: (lambda func: func)
+for _exc in ("ValidationError", "PermissionError"):
+	if not hasattr(frappe, _exc):
+		setattr(frappe, _exc, type(_exc, (Exception,), {}))
+_requests = _ensure_module("requests")
+if not hasattr(_requests, "exceptions"):
+	_requests.exceptions = types.SimpleNamespace(RequestException=type("RequestException", (Exception,), {}))
+_ensure_module("jwt")
+
+from admin_panel.api import census
+from admin_panel.api.census_core import encode_payload
+
+HARNESS = Path(__file__).resolve().parent / "js" / "wallet_census_harness.js"
+NODE = shutil.which("node")
+
+pytestmark = pytest.mark.skipif(NODE is None, reason="node is required to drive the page harness")
+
+ENDPOINT = "/api/method/admin_panel.api.census.get_latest_census"
+
+
+class _FakeCache:
+	def __init__(self):
+		self.values = {}
+
+	def get_value(self, key):
+		return self.values.get(key)
+
+	def set_value(self, key, value, expires_in_sec=None):
+		self.values[key] = value
+
+
+class _Headers(dict):
+	def set(self, name, value):
+		self[name] = value
+
+
+class _Site:
+	"""The snapshot table and request plumbing get_latest_census reads."""
+
+	def __init__(self):
+		self.snapshots = []
+		self.cache = _FakeCache()
+
+	def complete(self, name, rows):
+		self.snapshots.insert(
+			0,
+			{
+				"name": name,
+				"status": "Complete",
+				"started_at": None,
+				"completed_at": "2026-10-19 04:00:00",
+				"totals_json": encode_payload({"usd": {"balance": sum(r["balance"] for r in rows)}}),
+				"bucket_counts_json": encode_payload({}),
+				"rows_json": encode_payload(rows),
+			},
+		)
+
+	def get_all(self, doctype, filters=None, order_by=None, limit=None, pluck=None, **kwargs):
+		names = [
+			s["name"] for s in self.snapshots if s["status"] == (filters or {}).get("status", s["status"])
+		]
+		return names[:limit]
+
+	def get_value(self, doctype, name, fields, as_dict=False):
+		snapshot = next(s for s in self.snapshots if s["name"] == name)
+		return {field: snapshot[field] for field in fields}
+
+	def serve(self, request):
+		"""One HTTP exchange, shaped the way frappe's /api/method would send it."""
+		frappe.response = {}
+		frappe.local = types.SimpleNamespace(response_headers=_Headers())
+		headers = {name.lower(): value for name, value in (request["headers"] or {}).items()}
+		frappe.get_request_header = lambda name, default=None: headers.get(name.lower(), default)
+		assert request["url"] == ENDPOINT
+		message = census.get_latest_census()
+		status = frappe.response.get("http_status_code", 200)
+		body = "" if status == 304 else json.dumps({"message": message})
+		return {"status": status, "headers": dict(frappe.local.response_headers), "body": body}
+
+
+@pytest.fixture()
+def site(monkeypatch):
+	site = _Site()
+	monkeypatch.setattr(frappe, "session", types.SimpleNamespace(user="Administrator"), raising=False)
+	# serve() replaces these per request; registering them here restores them after the test.
+	for name in ("response", "local", "get_request_header"):
+		monkeypatch.setattr(frappe, name, None, raising=False)
+	monkeypatch.setattr(frappe, "get_all", site.get_all, raising=False)
+	monkeypatch.setattr(frappe, "db", types.SimpleNamespace(get_value=site.get_value), raising=False)
+	monkeypatch.setattr(frappe, "cache", lambda: site.cache, raising=False)
+	monkeypatch.setattr(
+		frappe, "logger", lambda *a, **k: types.SimpleNamespace(error=lambda msg: None), raising=False
+	)
+	monkeypatch.setattr(census, "_snapshot_lru", census.PayloadLRU(max_bytes=1 << 20, ttl_seconds=60))
+	return site
+
+
+def _run_page(site, loads, between=None):
+	"""Run `loads` load_latest calls against `site`; `between(i)` runs before load i."""
+	proc = subprocess.Popen(
+		[NODE, str(HARNESS), str(loads)],
+		stdin=subprocess.PIPE,
+		stdout=subprocess.PIPE,
+		stderr=subprocess.PIPE,
+		text=True,
+	)
+	exchanges = []
+	try:
+		for line in proc.stdout:
+			message = json.loads(line)
+			if "done" in message:
+				break
+			if between:
+				between(len(exchanges))
+			response = site.serve(message["request"])
+			exchanges.append({"request": message["request"], "status": response["status"]})
+			proc.stdin.write(json.dumps(response) + "\n")
+			proc.stdin.flush()
+		else:
+			pytest.fail(f"harness exited early:\n{proc.stderr.read()}")
+	finally:
+		proc.stdin.close()
+		proc.wait(timeout=10)
+	assert proc.returncode == 0, proc.stderr.read()
+	return exchanges, message["done"]
+
+
+ROWS = [{"wallet_id": "w-1", "balance": 10.0}, {"wallet_id": "w-2", "balance": 5.0}]
+
+
+def test_unchanged_snapshot_revalidates_to_a_304_and_renders_the_kept_copy(site):
+	site.complete("WCS-1", ROWS)
+	exchanges, done = _run_page(site, loads=2)
+
+	first, second = exchanges
+	assert first["status"] == 200
+	assert "If-None-Match" not in first["request"]["headers"]
+	assert second["request"]["headers"]["If-None-Match"] == done["etag"]
+	assert second["status"] == 304
+	# Both loads rendered the full snapshot; the second from memory.
+	assert done["renders"] == [{"rows": 2, "totals": {"usd": {"balance": 15.0}}}] * 2
+	assert done["statuses"] == []
+
+
+def test_a_newer_snapshot_answers_200_with_a_new_etag(site):
+	site.complete("WCS-1", ROWS)
+
+	def between(i):
+		if i == 1:
+			site.complete("WCS-2", ROWS[:1])
+
+	exchanges, done = _run_page(site, loads=2, between=between)
+
+	assert [e["status"] for e in exchanges] == [200, 200]
+	assert exchanges[1]["request"]["headers"]["If-None-Match"] != done["etag"]
+	assert done["renders"][-1] == {"rows": 1, "totals": {"usd": {"balance": 10.0}}}